@@ -13,7 +13,12 @@
 # limitations under the License.
 
 from .base import Client, ClientPool, get_client_pool
-from .http import default_ark_client, load_request
+from .http import (
+    ArkClientPool,
+    default_ark_client,
+    get_ark_client_pool,
+    load_request,
+)
 from .redis import RedisClient
 from .sse import AsyncSSEDecoder
 
@@ -21,7 +26,9 @@ __all__ = [
     "Client",
     "ClientPool",
     "AsyncSSEDecoder",
+    "ArkClientPool",
     "default_ark_client",
+    "get_ark_client_pool",
     "load_request",
     "get_client_pool",
     "RedisClient",
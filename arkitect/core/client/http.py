@@ -12,12 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Type
+import atexit
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Type, Union
 
 import fastapi
-from httpx import Timeout
+import httpx
+from httpx import Limits, Timeout
 from pydantic import ValidationError
-from volcenginesdkarkruntime import AsyncArk
+from volcenginesdkarkruntime import Ark, AsyncArk
+from volcenginesdkarkruntime._constants import (
+    BASE_URL,
+    DEFAULT_CONNECTION_LIMITS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_TIMEOUT,
+)
 
 from arkitect.core.errors import InvalidParameter, parse_pydantic_error
 from arkitect.core.runtime import RequestType
@@ -43,6 +53,117 @@ def default_ark_client() -> AsyncArk:
     return client
 
 
+class ArkClientPool:
+    """
+    A thread safe pool of synchronous Ark clients.
+
+    Clients with the same base url, credentials, region, timeout and retries
+    share one httpx connection pool, so connections are kept alive across
+    calls and threads. Ark clients themselves are not thread safe and are
+    cached per thread on top of the shared connection pool.
+    """
+
+    def __init__(self, limits: Optional[Limits] = None) -> None:
+        self.limits = limits if limits is not None else DEFAULT_CONNECTION_LIMITS
+        self._lock = threading.Lock()
+        self._http_clients: Dict[Tuple[Any, ...], httpx.Client] = {}
+        self._local = threading.local()
+
+    def get_client(
+        self,
+        *,
+        base_url: Union[str, httpx.URL] = BASE_URL,
+        api_key: Optional[str] = None,
+        ak: Optional[str] = None,
+        sk: Optional[str] = None,
+        region: str = "cn-beijing",
+        timeout: Union[float, Timeout, None] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> Ark:
+        """
+        Get a client for the given configuration, credentials default to the
+        environment like ``Ark()`` does.
+        """
+        api_key = api_key if api_key is not None else os.environ.get("ARK_API_KEY")
+        ak = ak if ak is not None else os.environ.get("VOLC_ACCESSKEY")
+        sk = sk if sk is not None else os.environ.get("VOLC_SECRETKEY")
+        key = (
+            str(base_url),
+            api_key,
+            ak,
+            sk,
+            region,
+            _timeout_key(timeout),
+            max_retries,
+        )
+        clients: Dict[Tuple[Any, ...], Ark] = self._local.__dict__.setdefault(
+            "clients", {}
+        )
+        client = clients.get(key)
+        if client is not None and not client._client.is_closed:
+            return client
+
+        client = Ark(
+            base_url=base_url,
+            api_key=api_key,
+            ak=ak,
+            sk=sk,
+            region=region,
+            timeout=timeout,
+            max_retries=max_retries,
+            http_client=self._get_http_client(key, timeout),
+        )
+        clients[key] = client
+        return client
+
+    def _get_http_client(
+        self, key: Tuple[Any, ...], timeout: Union[float, Timeout, None]
+    ) -> httpx.Client:
+        with self._lock:
+            http_client = self._http_clients.get(key)
+            if http_client is None or http_client.is_closed:
+                http_client = httpx.Client(
+                    timeout=timeout, limits=self.limits, follow_redirects=True
+                )
+                self._http_clients[key] = http_client
+            return http_client
+
+    def close(self) -> None:
+        """
+        Close all connections. Clients handed out before are not usable
+        anymore, the next ``get_client`` creates new ones.
+        """
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+        for http_client in http_clients:
+            http_client.close()
+
+
+def _timeout_key(timeout: Union[float, Timeout, None]) -> Any:
+    if isinstance(timeout, Timeout):
+        return (timeout.connect, timeout.read, timeout.write, timeout.pool)
+    return timeout
+
+
+_ark_client_pool: Optional[ArkClientPool] = None
+_ark_client_pool_lock = threading.Lock()
+
+
+def get_ark_client_pool() -> ArkClientPool:
+    """
+    Get the process wide pool of sync Ark clients, which is closed on
+    interpreter shutdown.
+    """
+    global _ark_client_pool
+    if _ark_client_pool is None:
+        with _ark_client_pool_lock:
+            if _ark_client_pool is None:
+                _ark_client_pool = ArkClientPool()
+                atexit.register(_ark_client_pool.close)
+    return _ark_client_pool
+
+
 async def load_request(
     http_request: fastapi.Request,
     req_cls: Type[RequestType],
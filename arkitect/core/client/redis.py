@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Optional
+
 import redis.asyncio as redis
 from redis.asyncio.retry import Retry
 from redis.backoff import ExponentialBackoff
@@ -56,16 +58,17 @@ class RedisClient(Client):
         """
         return await self.client.get(key)
 
-    async def set(self, key: str, value: str) -> None:
+    async def set(self, key: str, value: str, px: Optional[int] = None) -> None:
         """
         Set the value of a key in the Redis database.
         Args:
         key (str): The key to set in the Redis database.
         value (str): The value to set for the key.
+        px (int): Expire the key after this many milliseconds, if set.
         Returns:
         None.
         """
-        await self.client.set(key, value)
+        await self.client.set(key, value, px=px)
 
     async def get_with_prefix(self, prefix: str) -> tuple[list[str], list[str]]:
         """
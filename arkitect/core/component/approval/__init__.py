@@ -0,0 +1,39 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from arkitect.core.component.approval.base_approval_broker import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+    make_approval_id,
+)
+from arkitect.core.component.approval.in_memory_approval_broker import (
+    InMemoryApprovalBroker,
+)
+from arkitect.core.component.approval.redis_approval_broker import (
+    RedisApprovalBroker,
+)
+from arkitect.core.component.approval.router import (
+    ApprovalDecision,
+    build_approval_router,
+)
+
+__all__ = [
+    "ApprovalDecision",
+    "ApprovalRequest",
+    "BaseApprovalBroker",
+    "InMemoryApprovalBroker",
+    "RedisApprovalBroker",
+    "build_approval_router",
+    "make_approval_id",
+]
@@ -0,0 +1,76 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+def make_approval_id(session_id: Optional[str], tool_call_id: str) -> str:
+    return f"{session_id}:{tool_call_id}" if session_id else tool_call_id
+
+
+class ApprovalRequest(BaseModel):
+    approval_id: str
+    tool_name: str = ""
+    arguments: str = ""
+    created: float = Field(default_factory=time.time)
+
+
+class BaseApprovalBroker(ABC):
+    """
+    Hands tool call approvals to an external decider without blocking the
+    event loop. Pending approvals are resolved with ``resolve``, typically
+    from the routes built by ``build_approval_router``.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        default_approved: bool = False,
+    ) -> None:
+        self.timeout = timeout
+        self.default_approved = default_approved
+
+    async def request_approval(
+        self,
+        request: ApprovalRequest,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Wait until the request is resolved, or return ``default_approved``
+        once the timeout expires.
+        """
+        try:
+            return await self._wait(
+                request, timeout if timeout is not None else self.timeout
+            )
+        except asyncio.TimeoutError:
+            return self.default_approved
+
+    @abstractmethod
+    async def _wait(self, request: ApprovalRequest, timeout: Optional[float]) -> bool:
+        pass
+
+    @abstractmethod
+    async def resolve(self, approval_id: str, approved: bool) -> bool:
+        """Resolve a pending approval, return False if it is not pending."""
+        pass
+
+    @abstractmethod
+    async def list_pending(self) -> list[ApprovalRequest]:
+        pass
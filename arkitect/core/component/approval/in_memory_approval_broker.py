@@ -0,0 +1,51 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Optional
+
+from arkitect.core.component.approval.base_approval_broker import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+)
+
+
+class InMemoryApprovalBroker(BaseApprovalBroker):
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        default_approved: bool = False,
+    ) -> None:
+        super().__init__(timeout=timeout, default_approved=default_approved)
+        self._pending: dict[str, tuple[asyncio.Future[bool], ApprovalRequest]] = {}
+
+    async def _wait(self, request: ApprovalRequest, timeout: Optional[float]) -> bool:
+        if request.approval_id in self._pending:
+            raise ValueError(f"Approval {request.approval_id} is already pending")
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending[request.approval_id] = (future, request)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request.approval_id, None)
+
+    async def resolve(self, approval_id: str, approved: bool) -> bool:
+        pending = self._pending.get(approval_id)
+        if pending is None or pending[0].done():
+            return False
+        pending[0].set_result(approved)
+        return True
+
+    async def list_pending(self) -> list[ApprovalRequest]:
+        return [request for _, request in self._pending.values()]
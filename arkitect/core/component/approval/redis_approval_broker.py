@@ -0,0 +1,112 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any, Optional
+
+from arkitect.core.client.redis import RedisClient
+from arkitect.core.component.approval.base_approval_broker import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+)
+
+_APPROVED = "1"
+_REJECTED = "0"
+
+
+class RedisApprovalBroker(BaseApprovalBroker):
+    """
+    Approval broker shared by several workers: the worker running the tool
+    call waits on a pub/sub channel, any worker may resolve it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        key_prefix: str = "approval",
+        ttl: int = 3600,
+        timeout: Optional[float] = None,
+        default_approved: bool = False,
+    ) -> None:
+        super().__init__(timeout=timeout, default_approved=default_approved)
+        self.redis_client = RedisClient(
+            host=host,
+            username=username,
+            password=password,
+        )
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+
+    def _pending_key(self, approval_id: str) -> str:
+        return f"{self.key_prefix}:pending:{approval_id}"
+
+    def _decision_key(self, approval_id: str) -> str:
+        return f"{self.key_prefix}:decision:{approval_id}"
+
+    def _channel(self, approval_id: str) -> str:
+        return f"{self.key_prefix}:channel:{approval_id}"
+
+    async def _wait(self, request: ApprovalRequest, timeout: Optional[float]) -> bool:
+        redis = self.redis_client.client
+        approval_id = request.approval_id
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(self._channel(approval_id))
+        try:
+            await redis.set(
+                self._pending_key(approval_id), request.model_dump_json(), ex=self.ttl
+            )
+            return await asyncio.wait_for(
+                self._next_decision(pubsub, approval_id), timeout
+            )
+        finally:
+            await pubsub.unsubscribe(self._channel(approval_id))
+            await pubsub.aclose()
+            await redis.delete(
+                self._pending_key(approval_id), self._decision_key(approval_id)
+            )
+
+    async def _next_decision(self, pubsub: Any, approval_id: str) -> bool:
+        # the decision may have been published before the subscription
+        decision = await self.redis_client.get(self._decision_key(approval_id))
+        if decision is not None:
+            return _is_approved(decision)
+        async for message in pubsub.listen():
+            if message.get("type") == "message":
+                return _is_approved(message.get("data"))
+        return self.default_approved
+
+    async def resolve(self, approval_id: str, approved: bool) -> bool:
+        redis = self.redis_client.client
+        if not await redis.exists(self._pending_key(approval_id)):
+            return False
+        decision = _APPROVED if approved else _REJECTED
+        await redis.set(self._decision_key(approval_id), decision, ex=self.ttl)
+        await redis.publish(self._channel(approval_id), decision)
+        return True
+
+    async def list_pending(self) -> list[ApprovalRequest]:
+        keys, values = await self.redis_client.get_with_prefix(self._pending_key("*"))
+        return [
+            ApprovalRequest.model_validate_json(value)
+            for value in values
+            if value is not None
+        ]
+
+
+def _is_approved(decision: Any) -> bool:
+    if isinstance(decision, bytes):
+        decision = decision.decode()
+    return decision == _APPROVED
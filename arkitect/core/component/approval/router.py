@@ -0,0 +1,48 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from arkitect.core.component.approval.base_approval_broker import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+)
+
+
+class ApprovalDecision(BaseModel):
+    approved: bool
+
+
+def build_approval_router(
+    broker: BaseApprovalBroker, prefix: str = "/approvals"
+) -> APIRouter:
+    """Routes to list and resolve the pending approvals of ``broker``."""
+    router = APIRouter(prefix=prefix)
+
+    @router.get("")
+    async def list_pending() -> list[ApprovalRequest]:
+        return await broker.list_pending()
+
+    @router.post("/{approval_id}")
+    async def resolve(approval_id: str, decision: ApprovalDecision) -> Any:
+        if not await broker.resolve(approval_id, decision.approved):
+            raise HTTPException(
+                status_code=404, detail=f"Approval {approval_id} is not pending"
+            )
+        return {"approval_id": approval_id, "approved": decision.approved}
+
+    return router
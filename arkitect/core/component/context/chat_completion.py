@@ -27,6 +27,7 @@ from volcenginesdkarkruntime.types.chat.chat_completion_message import (
 )
 
 from arkitect.core.component.tool.tool_pool import ToolPool
+from arkitect.utils.json import IncrementalJSONParser
 
 from .model import State
 
@@ -50,8 +51,7 @@ class _AsyncCompletions(AsyncCompletions):
             else {}
         )
         if tool_pool:
-            tools = await tool_pool.list_tools()
-            parameters["tools"] = [t.model_dump() for t in tools]
+            parameters["tools"] = await tool_pool.list_tool_schemas()
         resp = await super().create(
             model=model,
             messages=messages,
@@ -67,6 +67,7 @@ class _AsyncCompletions(AsyncCompletions):
 
             async def iterator() -> AsyncIterable[ChatCompletionChunk]:
                 final_tool_calls = {}
+                argument_parsers: dict[int, IncrementalJSONParser] = {}
                 chat_completion_messages = ChatCompletionMessage(
                     role="assistant",
                     content="",
@@ -84,11 +85,17 @@ class _AsyncCompletions(AsyncCompletions):
                                 index = tool_call.index
                                 if index not in final_tool_calls:
                                     final_tool_calls[index] = tool_call
-                                else:
-                                    final_tool_calls[
-                                        index
-                                    ].function.arguments += tool_call.function.arguments
+                                    argument_parsers[index] = IncrementalJSONParser()
+                                    if tool_call.id:
+                                        self._state.set_tool_arguments(
+                                            tool_call.id, argument_parsers[index]
+                                        )
+                                argument_parsers[index].feed(
+                                    tool_call.function.arguments
+                                )
                     yield chunk
+                for index, tool_call in final_tool_calls.items():
+                    tool_call.function.arguments = argument_parsers[index].text
                 chat_completion_messages.tool_calls = [
                     v.model_dump() for v in final_tool_calls.values()
                 ]
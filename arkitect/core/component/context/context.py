@@ -12,11 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
+import asyncio
 import json
 from typing import (
     Any,
     AsyncIterable,
+    AsyncIterator,
     Callable,
     Dict,
     List,
@@ -36,10 +37,15 @@ from volcenginesdkarkruntime.types.context import CreateContextResponse
 from arkitect.core.client import default_ark_client
 from arkitect.core.component.context.hooks import (
     HookInterruptException,
+    HookRunner,
     PostLLMCallHook,
+    PostLLMCallHookRunner,
     PostToolCallHook,
+    PostToolCallHookRunner,
     PreLLMCallHook,
+    PreLLMCallHookRunner,
     PreToolCallHook,
+    PreToolCallHookRunner,
 )
 from arkitect.core.component.tool.mcp_client import MCPClient
 from arkitect.core.component.tool.tool_pool import ToolPool, build_tool_pool
@@ -51,7 +57,9 @@ from arkitect.types.llm.model import (
 
 from .chat_completion import _AsyncChat
 from .context_completion import _AsyncContext
+from .history import HistoryPolicy
 from .model import ContextInterruption, State, ToolChunk
+from .tool_executor import ToolCallExecutor
 
 
 class _AsyncCompletions:
@@ -61,53 +69,142 @@ class _AsyncCompletions:
 
     # break loop if return False
     async def handle_tool_call(self) -> bool:
-        last_message = self._ctx.get_latest_message()
+        last_message = self._ctx.get_latest_message(role=None)
         if last_message is None or not last_message.get("tool_calls"):
             return False
         if self._ctx.tool_pool is None:
             return False
-        for tool_call in last_message.get("tool_calls"):
-            tool_name = tool_call.get("function", {}).get("name")
+        async for _ in self._run_tool_calls(stream=False):
+            pass
+        return True
 
-            if await self._ctx.tool_pool.contain(tool_name):
-                if self._ctx.pre_tool_call_hook:
-                    # pre tool call hooks
-                    self._ctx.state = await self._ctx.pre_tool_call_hook.pre_tool_call(
-                        tool_name,
-                        tool_call.get("function", {}).get("arguments", "{}"),
-                        self._ctx.state,
-                    )
-                tool_call_param = copy.deepcopy(tool_call)
-                parameters = tool_call_param.get("function", {}).get("arguments", "{}")
-                # tool execution
-                tool_resp = None
-                tool_exception = None
-                try:
-                    tool_resp = await self._ctx.tool_pool.execute_tool(
-                        tool_name=tool_name, parameters=json.loads(parameters)
+    async def _run_tool_calls(self, stream: bool) -> AsyncIterator[ToolChunk]:
+        """
+        Run the tool calls of the latest message, going through the pre hook,
+        the tool and the post hook of each call in turn. Hooks run one at a
+        time in the order of the calls, while each tool starts as soon as its
+        own pre hook passed, so the tools of the turn overlap.
+        """
+        tool_calls = self._ctx.get_latest_message(role=None).get("tool_calls")  # type: ignore
+        turn = self._ctx.tool_executor.start_turn()
+        hooks_lock = asyncio.Lock()
+        events: asyncio.Queue[ToolChunk | None] = asyncio.Queue()
+        # (tool_call_id, tool_name, arguments, updated_arguments, parameters,
+        # result) of the calls started, in order
+        started: asyncio.Queue[tuple | None] = asyncio.Queue()
+
+        async def start_calls() -> None:
+            try:
+                for tool_call in tool_calls:
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name")
+                    if not stream and not await self._ctx.tool_pool.contain(  # type: ignore
+                        tool_name
+                    ):
+                        continue
+                    arguments = tool_call.get("function", {}).get("arguments", "{}")
+                    if self._ctx.pre_tool_call_hook:
+                        async with hooks_lock:
+                            # pre tool call hooks
+                            self._ctx.state = (
+                                await self._ctx.pre_tool_call_hook.pre_tool_call(
+                                    tool_name, arguments, self._ctx.state
+                                )
+                            )
+                    updated_arguments = tool_call.get("function", {}).get(
+                        "arguments", "{}"
                     )
-                except Exception as e:
-                    tool_exception = e
-
-                self._ctx.state.messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call_param.get("id", ""),
-                        "content": tool_resp if tool_resp else str(tool_exception),
-                    }
-                )
-                if self._ctx.post_tool_call_hook:
-                    # post tool call hooks
-                    self._ctx.state = (
-                        await self._ctx.post_tool_call_hook.post_tool_call(
+                    parameters = self.load_arguments(tool_call_id, updated_arguments)
+                    if stream:
+                        events.put_nowait(
+                            ToolChunk(
+                                tool_call_id=tool_call_id,
+                                tool_name=tool_name,
+                                tool_arguments=updated_arguments,
+                                parsed_arguments=(
+                                    parameters if isinstance(parameters, dict) else None
+                                ),
+                            )
+                        )
+                    result = turn.start(tool_name, parameters, self.execute_tool)
+                    started.put_nowait(
+                        (
+                            tool_call_id,
                             tool_name,
+                            arguments,
+                            updated_arguments,
                             parameters,
-                            tool_resp,
-                            tool_exception,
-                            self._ctx.state,
+                            result,
                         )
                     )
-        return True
+            finally:
+                started.put_nowait(None)
+
+        async def finish_calls() -> None:
+            try:
+                while (call := await started.get()) is not None:
+                    (
+                        tool_call_id,
+                        tool_name,
+                        arguments,
+                        updated_arguments,
+                        parameters,
+                        result,
+                    ) = call
+                    tool_resp, tool_exception = await result
+                    if stream:
+                        events.put_nowait(
+                            ToolChunk(
+                                tool_call_id=tool_call_id,
+                                tool_name=tool_name,
+                                tool_arguments=updated_arguments,
+                                parsed_arguments=(
+                                    parameters if isinstance(parameters, dict) else None
+                                ),
+                                tool_exception=tool_exception,
+                                tool_response=tool_resp,
+                            )
+                        )
+                    async with hooks_lock:
+                        self._ctx.state.messages.append(
+                            {
+                                "role": "tool",
+                                "tool_call_id": tool_call_id,
+                                "content": (
+                                    tool_resp
+                                    if stream or tool_resp
+                                    else str(tool_exception)
+                                ),
+                            }
+                        )
+                        if self._ctx.post_tool_call_hook:
+                            # post tool call hooks
+                            self._ctx.state = (
+                                await self._ctx.post_tool_call_hook.post_tool_call(
+                                    name=tool_name,
+                                    arguments=arguments
+                                    if stream
+                                    else updated_arguments,
+                                    response=tool_resp,
+                                    exception=tool_exception,
+                                    state=self._ctx.state,
+                                )
+                            )
+            finally:
+                events.put_nowait(None)
+
+        starter = asyncio.ensure_future(start_calls())
+        finisher = asyncio.ensure_future(finish_calls())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await finisher
+            # a pre hook interruption, raised once the calls before it finished
+            await starter
+        finally:
+            starter.cancel()
+            finisher.cancel()
+            turn.cancel()
 
     @task()
     async def create(
@@ -140,7 +237,7 @@ class _AsyncCompletions:
                 resp = (
                     await self._ctx.chat.completions.create(
                         model=self.model,
-                        messages=self._ctx.state.messages,
+                        messages=self._ctx.get_request_messages(),
                         stream=stream,
                         tool_pool=self._ctx.tool_pool,
                         **kwargs,
@@ -218,7 +315,7 @@ class _AsyncCompletions:
                     resp = (
                         await self._ctx.chat.completions.create(
                             model=self.model,
-                            messages=self._ctx.state.messages,
+                            messages=self._ctx.get_request_messages(),
                             stream=stream,
                             tool_pool=self._ctx.tool_pool,
                             **kwargs,
@@ -272,19 +369,35 @@ class _AsyncCompletions:
 
     @task()
     async def execute_tool(
-        self, tool_name: str, parameters: str
+        self, tool_name: str, parameters: str | dict[str, Any]
     ) -> tuple[Any | None, Exception | None]:
         tool_resp, tool_exception = None, None
         try:
             tool_resp = await self._ctx.tool_pool.execute_tool(  # type: ignore
-                tool_name=tool_name, parameters=json.loads(parameters)
+                tool_name=tool_name,
+                parameters=(
+                    json.loads(parameters)
+                    if isinstance(parameters, str)
+                    else parameters
+                ),
             )
         except Exception as e:
             tool_exception = e
         return tool_resp, tool_exception
 
+    def load_arguments(self, tool_call_id: str, arguments: str) -> str | dict[str, Any]:
+        """
+        Reuse the object parsed while the arguments were streamed, unless
+        a hook rewrote them since.
+        """
+        parser = self._ctx.state.pop_tool_arguments(tool_call_id)
+        if parser is None or not parser.done or parser.text != arguments:
+            return arguments
+        parsed = parser.result
+        return parsed if isinstance(parsed, dict) else arguments
+
     def need_tool_call(self) -> bool:
-        last_message = self._ctx.get_latest_message()
+        last_message = self._ctx.get_latest_message(role=None)
         if (
             last_message is not None
             and last_message.get("tool_calls")
@@ -294,51 +407,7 @@ class _AsyncCompletions:
         return False
 
     def create_tool_call_stream(self) -> AsyncIterable[ToolChunk]:
-        async def tool_call_events() -> AsyncIterable[ToolChunk]:
-            tool_calls = self._ctx.get_latest_message().get("tool_calls")  # type: ignore
-            for tool_call in tool_calls:
-                tool_name = tool_call.get("function", {}).get("name")
-                arguments = tool_call.get("function", {}).get("arguments", "{}")
-                if self._ctx.pre_tool_call_hook:
-                    self._ctx.state = await self._ctx.pre_tool_call_hook.pre_tool_call(
-                        tool_name,
-                        arguments,
-                        self._ctx.state,
-                    )
-                updated_arguments = tool_call.get("function", {}).get("arguments", "{}")
-
-                yield ToolChunk(
-                    tool_call_id=tool_call.get("id", ""),
-                    tool_name=tool_name,
-                    tool_arguments=updated_arguments,
-                )
-                resp, exceptions = await self.execute_tool(tool_name, updated_arguments)
-                yield ToolChunk(
-                    tool_call_id=tool_call.get("id", ""),
-                    tool_name=tool_name,
-                    tool_arguments=updated_arguments,
-                    tool_exception=exceptions,
-                    tool_response=resp,
-                )
-                self._ctx.state.messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call.get("id", ""),
-                        "content": resp,
-                    }
-                )
-                if self._ctx.post_tool_call_hook:
-                    self._ctx.state = (
-                        await self._ctx.post_tool_call_hook.post_tool_call(
-                            name=tool_name,
-                            arguments=arguments,
-                            response=resp,
-                            exception=exceptions,
-                            state=self._ctx.state,
-                        )
-                    )
-
-        return tool_call_events()
+        return self._run_tool_calls(stream=True)
 
 
 class Context:
@@ -351,6 +420,8 @@ class Context:
         parameters: Optional[ArkChatParameters] = None,
         context_parameters: Optional[ArkContextParameters] = None,
         client: Optional[AsyncArk] = None,
+        tool_executor: Optional[ToolCallExecutor] = None,
+        history_policy: Optional[HistoryPolicy] = None,
     ):
         self.client = default_ark_client() if client is None else client
         self.state = (
@@ -368,6 +439,10 @@ class Context:
         if context_parameters is not None:
             self.context = _AsyncContext(client=self.client, state=self.state)
         self.tool_pool = build_tool_pool(tools)
+        self.tool_executor = (
+            tool_executor if tool_executor is not None else ToolCallExecutor()
+        )
+        self.history_policy = history_policy
         self.pre_tool_call_hook: PreToolCallHook | None = None
         self.post_tool_call_hook: PostToolCallHook | None = None
         self.pre_llm_call_hook: PreLLMCallHook | None = None
@@ -388,9 +463,16 @@ class Context:
         return
 
     def get_latest_message(
-        self, role: str = "assistant"
+        self, role: str | None = "assistant"
     ) -> Optional[ChatCompletionMessageParam]:
-        return self.state.messages[-1]
+        return self.state.message_store.latest(role)
+
+    def get_request_messages(self) -> List[ChatCompletionMessageParam]:
+        """Messages sent to the model, the whole state unless windowed."""
+        if self.history_policy is None:
+            # a plain list, the SDK only serializes lists to JSON
+            return list(self.state.messages)
+        return self.history_policy.select(self.state.messages)
 
     @property
     def completions(self) -> _AsyncCompletions:
@@ -407,3 +489,32 @@ class Context:
 
     def set_post_llm_call_hook(self, hook: PostLLMCallHook) -> None:
         self.post_llm_call_hook = hook
+
+    def add_pre_tool_call_hook(self, hook: PreToolCallHook) -> None:
+        self.pre_tool_call_hook = _add_hook(
+            self.pre_tool_call_hook, hook, PreToolCallHookRunner
+        )
+
+    def add_post_tool_call_hook(self, hook: PostToolCallHook) -> None:
+        self.post_tool_call_hook = _add_hook(
+            self.post_tool_call_hook, hook, PostToolCallHookRunner
+        )
+
+    def add_pre_llm_call_hook(self, hook: PreLLMCallHook) -> None:
+        self.pre_llm_call_hook = _add_hook(
+            self.pre_llm_call_hook, hook, PreLLMCallHookRunner
+        )
+
+    def add_post_llm_call_hook(self, hook: PostLLMCallHook) -> None:
+        self.post_llm_call_hook = _add_hook(
+            self.post_llm_call_hook, hook, PostLLMCallHookRunner
+        )
+
+
+def _add_hook(current: Any, hook: Any, runner_cls: type[HookRunner]) -> Any:
+    if current is None:
+        return hook
+    if isinstance(current, runner_cls):
+        current.add(hook)
+        return current
+    return runner_cls([current, hook])
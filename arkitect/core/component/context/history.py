@@ -0,0 +1,271 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+from typing import Any, Callable, List, Optional, Sequence
+
+from volcenginesdkarkruntime.types.chat import ChatCompletionMessageParam
+
+from .model import _get
+
+TokenEstimator = Callable[[Any], int]
+
+OMITTED_TOOL_RESULT = "[tool result omitted]"
+
+
+def estimate_tokens(message: Any) -> int:
+    """
+    Rough token count of a message, about four bytes of utf-8 per token
+    plus a fixed overhead for the role and separators.
+    """
+    size = 0
+    content = _get(message, "content")
+    if isinstance(content, str):
+        size += len(content.encode("utf-8"))
+    elif isinstance(content, list):
+        for part in content:
+            text = _get(part, "text")
+            # images and videos are billed by the model, count them as a block
+            size += len(text.encode("utf-8")) if isinstance(text, str) else 1024
+    for tool_call in _get(message, "tool_calls") or []:
+        function = _get(tool_call, "function")
+        size += len(str(_get(function, "name") or ""))
+        size += len(str(_get(function, "arguments") or "").encode("utf-8"))
+    return (size + 3) // 4 + 4
+
+
+def _is_tool_result(message: Any) -> bool:
+    return _get(message, "role") == "tool"
+
+
+def _system_prefix(messages: Sequence[Any]) -> int:
+    head = 0
+    while head < len(messages) and _get(messages[head], "role") == "system":
+        head += 1
+    return head
+
+
+def _group_start(messages: Sequence[Any], end: int, lo: int) -> int:
+    """
+    Start of the group ending at ``end``: tool results are grouped with
+    the assistant message issuing them, so a window never splits them.
+    """
+    start = end
+    while start > lo and _is_tool_result(messages[start]):
+        start -= 1
+    if _is_tool_result(messages[start]):
+        return start
+    if start < end and not _get(messages[start], "tool_calls"):
+        # orphan tool results, there is no call to keep them with
+        return start + 1
+    return start
+
+
+class HistoryPolicy(abc.ABC):
+    """
+    Decides which messages of the state are sent to the model.
+
+    Policies never modify the state, they return a new list which may
+    share message objects with it.
+    """
+
+    @abc.abstractmethod
+    def select(
+        self, messages: Sequence[ChatCompletionMessageParam]
+    ) -> List[ChatCompletionMessageParam]:
+        pass
+
+
+class LastNHistoryPolicy(HistoryPolicy):
+    """
+    Keep the leading system messages and at most the last ``max_messages``
+    others. A tool call and its results are kept or dropped together, and
+    the latest group is always kept.
+    """
+
+    def __init__(self, max_messages: int, keep_system: bool = True) -> None:
+        if max_messages < 1:
+            raise ValueError("max_messages should be at least 1")
+        self.max_messages = max_messages
+        self.keep_system = keep_system
+
+    def select(
+        self, messages: Sequence[ChatCompletionMessageParam]
+    ) -> List[ChatCompletionMessageParam]:
+        head = _system_prefix(messages) if self.keep_system else 0
+        start = end = len(messages) - 1
+        while end >= head:
+            group_start = _group_start(messages, end, head)
+            if start != end and len(messages) - group_start > self.max_messages:
+                break
+            start = group_start
+            end = group_start - 1
+        start = max(start, head)
+        return list(messages[:head]) + list(messages[start:])
+
+
+class TokenBudgetHistoryPolicy(HistoryPolicy):
+    """
+    Keep the leading system messages and as many of the latest messages as
+    fit in ``max_tokens``, without splitting tool calls from their results.
+
+    Token estimates are memoized per message object, so each request only
+    estimates the messages appended since the previous one. Messages are
+    assumed not to be edited in place once a request included them.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_system: bool = True,
+        estimator: Optional[TokenEstimator] = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.keep_system = keep_system
+        self.estimator = estimator or estimate_tokens
+        self._messages: List[Any] = []
+        self._tokens: List[int] = []
+        self._total = 0
+        self._tool_results: List[int] = []
+
+    def _reset(self) -> None:
+        self._messages, self._tokens, self._total = [], [], 0
+        self._tool_results = []
+
+    def _sync(self, messages: Sequence[Any]) -> None:
+        n = len(self._messages)
+        if not (
+            n <= len(messages)
+            and (
+                n == 0
+                or (
+                    messages[0] is self._messages[0]
+                    and messages[n - 1] is self._messages[n - 1]
+                )
+            )
+        ):
+            # history was rewritten, reuse the estimates of kept messages
+            known = {id(m): t for m, t in zip(self._messages, self._tokens)}
+            self._reset()
+            self._append(messages, known)
+            return
+        self._append(messages[n:], {})
+
+    def _append(self, messages: Sequence[Any], known: dict[int, int]) -> None:
+        for message in messages:
+            tokens = known.get(id(message))
+            if tokens is None:
+                tokens = self.estimator(message)
+            if _is_tool_result(message):
+                self._tool_results.append(len(self._messages))
+            self._messages.append(message)
+            self._tokens.append(tokens)
+            self._total += tokens
+
+    def cost(self, index: int) -> int:
+        return self._tokens[index]
+
+    def render(self, index: int, message: Any) -> Any:
+        return message
+
+    def select(
+        self, messages: Sequence[ChatCompletionMessageParam]
+    ) -> List[ChatCompletionMessageParam]:
+        self._sync(messages)
+        head = _system_prefix(messages) if self.keep_system else 0
+        budget = self.max_tokens - sum(self._tokens[:head])
+        self.fit(messages, head, budget)
+
+        start = end = len(messages) - 1
+        used = 0
+        while end >= head:
+            group_start = _group_start(messages, end, head)
+            group = sum(self.cost(i) for i in range(group_start, end + 1))
+            if start != end and used + group > budget:
+                break
+            used += group
+            start = group_start
+            end = group_start - 1
+        start = max(start, head)
+        return list(messages[:head]) + [
+            self.render(i, messages[i]) for i in range(start, len(messages))
+        ]
+
+    def fit(self, messages: Sequence[Any], head: int, budget: int) -> None:
+        """Hook for subclasses to shrink messages before windowing."""
+        pass
+
+
+class DropToolResultsHistoryPolicy(TokenBudgetHistoryPolicy):
+    """
+    Like ``TokenBudgetHistoryPolicy``, but first replaces the content of the
+    oldest tool results with a placeholder, and only drops whole messages
+    if that is not enough. Results of the latest tool calls are never
+    omitted.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_system: bool = True,
+        estimator: Optional[TokenEstimator] = None,
+        placeholder: str = OMITTED_TOOL_RESULT,
+    ) -> None:
+        super().__init__(max_tokens, keep_system=keep_system, estimator=estimator)
+        self.placeholder = placeholder
+        self._placeholder_tokens = self.estimator(
+            {"role": "tool", "content": placeholder}
+        )
+        # tool results before _omitted are sent as placeholders
+        self._omitted = 0
+        self._saved = 0
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._omitted, self._saved = 0, 0
+
+    def _placeholder_cost(self, index: int) -> int:
+        return min(self._tokens[index], self._placeholder_tokens)
+
+    def _is_omitted(self, index: int) -> bool:
+        return (
+            self._omitted > 0
+            and index <= self._tool_results[self._omitted - 1]
+            and _is_tool_result(self._messages[index])
+        )
+
+    def cost(self, index: int) -> int:
+        if self._is_omitted(index):
+            return self._placeholder_cost(index)
+        return self._tokens[index]
+
+    def render(self, index: int, message: Any) -> Any:
+        if self._is_omitted(index):
+            return {**message, "content": self.placeholder}
+        return message
+
+    def fit(self, messages: Sequence[Any], head: int, budget: int) -> None:
+        protected = len(messages)
+        while protected > head and _is_tool_result(messages[protected - 1]):
+            protected -= 1
+        head_tokens = sum(self._tokens[:head])
+        # the cut only moves forward as the history grows
+        while (
+            self._total - head_tokens - self._saved > budget
+            and self._omitted < len(self._tool_results)
+            and self._tool_results[self._omitted] < protected
+        ):
+            index = self._tool_results[self._omitted]
+            self._saved += self._tokens[index] - self._placeholder_cost(index)
+            self._omitted += 1
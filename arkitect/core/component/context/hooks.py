@@ -12,7 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import abc
-from typing import Any, Optional, Union
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional, Sequence, Union
+
+from arkitect.core.component.approval import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+    make_approval_id,
+)
+from arkitect.telemetry.logger import DEBUG
 
 from .model import State
 
@@ -29,7 +39,26 @@ class HookInterruptException(Exception):
         self.details = details
 
 
-class PreToolCallHook(abc.ABC):
+class BaseHook(abc.ABC):
+    # concurrent_safe hooks may run alongside other concurrent_safe hooks
+    # of the same life cycle, on their own copy of the state
+    concurrent_safe: bool = False
+    # hook_name of the hooks that must finish before this one starts
+    depends_on: Sequence[str] = ()
+    timeout: Optional[float] = None
+    _hook_name: Optional[str] = None
+
+    @property
+    def hook_name(self) -> str:
+        # set it to tell apart several instances of the same hook class
+        return self._hook_name or type(self).__name__
+
+    @hook_name.setter
+    def hook_name(self, hook_name: str) -> None:
+        self._hook_name = hook_name
+
+
+class PreToolCallHook(BaseHook):
     @abc.abstractmethod
     async def pre_tool_call(
         self,
@@ -40,7 +69,7 @@ class PreToolCallHook(abc.ABC):
         pass
 
 
-class PostToolCallHook(abc.ABC):
+class PostToolCallHook(BaseHook):
     @abc.abstractmethod
     async def post_tool_call(
         self,
@@ -53,7 +82,7 @@ class PostToolCallHook(abc.ABC):
         pass
 
 
-class PreLLMCallHook(abc.ABC):
+class PreLLMCallHook(BaseHook):
     @abc.abstractmethod
     async def pre_llm_call(
         self,
@@ -62,7 +91,7 @@ class PreLLMCallHook(abc.ABC):
         pass
 
 
-class PostLLMCallHook(abc.ABC):
+class PostLLMCallHook(BaseHook):
     @abc.abstractmethod
     async def post_llm_call(
         self,
@@ -75,33 +104,225 @@ Hook = Union[
     PreToolCallHook,
     PostToolCallHook,
     PreLLMCallHook,
+    PostLLMCallHook,
 ]
 
+_STATE_FIELDS = ("context_id", "parameters", "context_parameters", "details")
+
+
+class HookRunner:
+    """
+    Runs several hooks of one life cycle.
+
+    Hooks run in registration order unless ``depends_on`` says otherwise.
+    Consecutive ready hooks marked ``concurrent_safe`` run together, each on
+    a copy of the state; their changes are merged back in registration
+    order. The first exception in that order is raised, after the changes
+    of the hooks before it are merged.
+    """
+
+    def __init__(self, hooks: Optional[list[Any]] = None) -> None:
+        self.hooks: list[Any] = list(hooks or [])
+        # duration of the latest run of each hook, in seconds
+        self.timings: dict[str, float] = {}
+
+    def add(self, hook: Any) -> None:
+        self.hooks.append(hook)
+
+    async def run(
+        self,
+        call: Callable[[Any, State], Awaitable[State]],
+        state: State,
+    ) -> State:
+        remaining = list(self.hooks)
+        finished: set[str] = set()
+        while remaining:
+            ready = [h for h in remaining if all(d in finished for d in h.depends_on)]
+            if not ready:
+                raise ValueError(
+                    "Unresolvable hook dependencies: "
+                    + ", ".join(h.hook_name for h in remaining)
+                )
+            batch = []
+            for hook in ready:
+                if not hook.concurrent_safe:
+                    break
+                batch.append(hook)
+            if len(batch) <= 1:
+                batch = ready[:1]
+                state = await self._run_hook(batch[0], call, state)
+            else:
+                state = await self._run_concurrently(batch, call, state)
+            for hook in batch:
+                remaining.remove(hook)
+                finished.add(hook.hook_name)
+        return state
+
+    async def _run_hook(
+        self,
+        hook: Any,
+        call: Callable[[Any, State], Awaitable[State]],
+        state: State,
+    ) -> State:
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(call(hook, state), hook.timeout)
+        except asyncio.TimeoutError:
+            raise HookInterruptException(
+                reason=f"hook {hook.hook_name} timed out after {hook.timeout}s",
+                state=state,
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[hook.hook_name] = elapsed
+            DEBUG(f"hook {hook.hook_name} took {elapsed:.3f}s")
+
+    async def _run_concurrently(
+        self,
+        batch: list[Any],
+        call: Callable[[Any, State], Awaitable[State]],
+        state: State,
+    ) -> State:
+        base_messages = list(state.messages)
+        base_fields = {f: getattr(state, f) for f in _STATE_FIELDS}
+        results = await asyncio.gather(
+            *[
+                self._run_hook(
+                    hook,
+                    call,
+                    state.model_copy(update={"messages": state.message_store.fork()}),
+                )
+                for hook in batch
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            _merge_state(state, base_messages, base_fields, result)
+        return state
+
+
+def _merge_state(
+    state: State,
+    base_messages: list,
+    base_fields: dict[str, Any],
+    result: State,
+) -> None:
+    n = len(base_messages)
+    messages = result.messages
+    if len(messages) >= n and all(a is b for a, b in zip(messages, base_messages)):
+        # appended messages only
+        state.messages.extend(messages[n:])
+    else:
+        # the hook rewrote the history, later hooks in order win
+        state.messages = list(messages)
+    for field, value in base_fields.items():
+        new_value = getattr(result, field)
+        if new_value is not value:
+            setattr(state, field, new_value)
+
+
+class PreToolCallHookRunner(HookRunner, PreToolCallHook):
+    async def pre_tool_call(
+        self,
+        name: str,
+        arguments: str,
+        state: State,
+    ) -> State:
+        return await self.run(
+            lambda hook, s: hook.pre_tool_call(name, arguments, s), state
+        )
+
+
+class PostToolCallHookRunner(HookRunner, PostToolCallHook):
+    async def post_tool_call(
+        self,
+        name: str,
+        arguments: str,
+        response: Any,
+        exception: Optional[Exception],
+        state: State,
+    ) -> State:
+        return await self.run(
+            lambda hook, s: hook.post_tool_call(
+                name, arguments, response, exception, s
+            ),
+            state,
+        )
+
+
+class PreLLMCallHookRunner(HookRunner, PreLLMCallHook):
+    async def pre_llm_call(
+        self,
+        state: State,
+    ) -> State:
+        return await self.run(lambda hook, s: hook.pre_llm_call(s), state)
+
+
+class PostLLMCallHookRunner(HookRunner, PostLLMCallHook):
+    async def post_llm_call(
+        self,
+        state: State,
+    ) -> State:
+        return await self.run(lambda hook, s: hook.post_llm_call(s), state)
+
 
 class ApprovalHook(PreToolCallHook):
+    """
+    Ask for approval before each tool call.
+
+    With a broker the hook awaits an external decision keyed by context
+    and tool call id; without one it falls back to the console, read in
+    a worker thread so the event loop keeps serving other sessions.
+    """
+
+    def __init__(self, broker: Optional[BaseApprovalBroker] = None) -> None:
+        self.broker = broker
+
     async def pre_tool_call(
         self,
         name: str,
         arguments: str,
         state: State,
     ) -> State:
-        if len(state.messages) == 0:
-            return state
-        last_message = state.messages[-1]
-        if not last_message.get("tool_calls"):
+        # tool messages of the other calls of the turn may follow it
+        assistant_message = state.message_store.latest(role="assistant")
+        if assistant_message is None or not assistant_message.get("tool_calls"):
             return state
 
-        formated_output = []
-        for tool_call in last_message.get("tool_calls"):
-            tool_name = tool_call.get("function", {}).get("name")
-            tool_call_param = tool_call.get("function", {}).get("arguments", "{}")
-            formated_output.append(
-                f"tool_name: {tool_name}\ntool_call_param: {tool_call_param}\n"
+        if self.broker is None:
+            approved = await self._console_approval(name, arguments)
+        else:
+            # the first matching call not answered yet, in case a turn
+            # repeats a call
+            tool_call_id = next(
+                (
+                    tool_call.get("id")
+                    for tool_call in assistant_message.get("tool_calls")
+                    if tool_call.get("id")
+                    and tool_call.get("function", {}).get("name") == name
+                    and tool_call.get("function", {}).get("arguments") == arguments
+                    and state.message_store.get_tool_result(tool_call.get("id")) is None
+                ),
+                None,
             )
-        print("tool call parameters:")
-        print("".join(formated_output))
-        y_or_n = input("input Y to approve\n")
-        if y_or_n == "Y":
+            if tool_call_id is None:
+                # never share an approval, and its decision, with another call
+                tool_call_id = uuid.uuid4().hex
+            approved = await self.broker.request_approval(
+                ApprovalRequest(
+                    approval_id=make_approval_id(state.context_id, tool_call_id),
+                    tool_name=name,
+                    arguments=arguments,
+                )
+            )
+        if approved:
             return state
-        else:
-            raise HookInterruptException(reason="approval failed", state=state)
+        raise HookInterruptException(reason="approval failed", state=state)
+
+    async def _console_approval(self, name: str, arguments: str) -> bool:
+        print("tool call parameters:")
+        print(f"tool_name: {name}\ntool_call_param: {arguments}\n")
+        y_or_n = await asyncio.to_thread(input, "input Y to approve\n")
+        return y_or_n == "Y"
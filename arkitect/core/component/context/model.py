@@ -12,18 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, List, Literal, Optional
+from collections import ChainMap
+from collections.abc import MutableSequence
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    overload,
+)
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    ValidatorFunctionWrapHandler,
+    field_serializer,
+    field_validator,
+)
 from volcenginesdkarkruntime.types.chat import ChatCompletionMessageParam
 
 from arkitect.types.llm.model import ArkChatParameters, ArkContextParameters
+from arkitect.utils.json import IncrementalJSONParser
 
 
 class ToolChunk(BaseModel):
     tool_call_id: str
     tool_name: str
     tool_arguments: str
+    parsed_arguments: Optional[Dict[str, Any]] = None
     tool_exception: Optional[Exception] = None
     tool_response: Any | None = None
 
@@ -33,6 +56,216 @@ class ToolChunk(BaseModel):
         arbitrary_types_allowed = True
 
 
+def _get(message: Any, key: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(key)
+    return getattr(message, key, None)
+
+
+class MessageStore(MutableSequence):
+    """
+    Sequence of chat messages that can be forked in O(1).
+
+    Messages live in append-only segments: a fork freezes the current
+    segment, shares it with the new store and both stores append to
+    their own new segment from then on. Mutations other than appending
+    first copy the messages into a private segment (copy-on-write).
+
+    The index of the last message per role and of the messages issuing and
+    answering each tool call are kept up to date on append, so lookups do
+    not walk the history. Any other mutation marks the indexes stale and
+    they are rebuilt on the next lookup. Editing a message in place is not
+    tracked, and is visible from every store sharing the message.
+    """
+
+    # forks nest segments, flatten them once lookups get too deep
+    max_segments = 32
+
+    def __init__(self, messages: Iterable[Any] = ()) -> None:
+        self._segments: List[Tuple[List[Any], int]] = []
+        self._offset = 0
+        self._own: List[Any] = list(messages)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._last_by_role: Dict[Any, int] = {}
+        self._tool_calls: ChainMap[str, int] = ChainMap()
+        self._tool_results: ChainMap[str, int] = ChainMap()
+        self._stale = False
+        for i, message in enumerate(self):
+            self._index(i, message)
+
+    def _index(self, i: int, message: Any) -> None:
+        self._last_by_role[_get(message, "role")] = i
+        tool_call_id = _get(message, "tool_call_id")
+        if tool_call_id:
+            self._tool_results[tool_call_id] = i
+        tool_calls = _get(message, "tool_calls")
+        if tool_calls is not None and not isinstance(tool_calls, (list, tuple)):
+            # pydantic validates the Iterable tool_calls into a one-shot
+            # iterator, keep a list so that it can be read more than once
+            tool_calls = list(tool_calls)
+            if isinstance(message, dict):
+                message["tool_calls"] = tool_calls
+        for tool_call in tool_calls or []:
+            tool_call_id = _get(tool_call, "id")
+            if tool_call_id:
+                self._tool_calls[tool_call_id] = i
+
+    def _ensure_index(self) -> None:
+        if self._stale:
+            self._reindex()
+
+    def _materialize(self) -> None:
+        if self._segments:
+            self._own = list(self)
+            self._segments, self._offset = [], 0
+        self._stale = True
+
+    def fork(self) -> "MessageStore":
+        """Return a store with the same messages, sharing their storage."""
+        if self._own:
+            self._segments = self._segments + [(self._own, len(self._own))]
+            self._offset += len(self._own)
+            self._own = []
+        if len(self._segments) > self.max_segments:
+            messages = list(self)
+            self._segments = [(messages, len(messages))]
+        forked = MessageStore.__new__(MessageStore)
+        forked._segments = self._segments
+        forked._offset = self._offset
+        forked._own = []
+        forked._stale = self._stale
+        forked._last_by_role = dict(self._last_by_role)
+        for name in ("_tool_calls", "_tool_results"):
+            shared: ChainMap[str, int] = getattr(self, name)
+            if len(shared.maps) > self.max_segments:
+                shared = ChainMap(dict(shared))
+            setattr(self, name, shared.new_child())
+            setattr(forked, name, shared.new_child())
+        return forked
+
+    __copy__ = fork
+
+    def __len__(self) -> int:
+        return self._offset + len(self._own)
+
+    def __iter__(self) -> Iterator[Any]:
+        for segment, length in self._segments:
+            yield from islice(segment, length)
+        yield from self._own
+
+    def _item(self, index: int) -> Any:
+        if index >= self._offset:
+            return self._own[index - self._offset]
+        for segment, length in self._segments:
+            if index < length:
+                return segment[index]
+            index -= length
+        raise IndexError("list index out of range")
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]: ...
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and start >= self._offset:
+                return self._own[start - self._offset : stop - self._offset]
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("list index out of range")
+        return self._item(index)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._materialize()
+        self._own[index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        self._materialize()
+        del self._own[index]
+
+    def insert(self, index: int, message: Any) -> None:
+        self._materialize()
+        self._own.insert(index, message)
+
+    def append(self, message: Any) -> None:
+        self._own.append(message)
+        if not self._stale:
+            self._index(len(self) - 1, message)
+
+    def extend(self, messages: Iterable[Any]) -> None:
+        for message in list(messages):
+            self.append(message)
+
+    def __iadd__(self, messages: Iterable[Any]) -> "MessageStore":
+        self.extend(messages)
+        return self
+
+    def pop(self, index: int = -1) -> Any:
+        message = self[index]
+        del self[index]
+        return message
+
+    def clear(self) -> None:
+        self._segments, self._offset, self._own = [], 0, []
+        self._reindex()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._materialize()
+        self._own.sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._materialize()
+        self._own.reverse()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MessageStore, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __add__(self, other: Iterable[Any]) -> List[Any]:
+        return list(self) + list(other)
+
+    def __radd__(self, other: Iterable[Any]) -> List[Any]:
+        return list(other) + list(self)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def last_index(self, role: Optional[str] = None) -> Optional[int]:
+        """Index of the last message, or of the last one with ``role``."""
+        if role is None:
+            return len(self) - 1 if len(self) > 0 else None
+        self._ensure_index()
+        return self._last_by_role.get(role)
+
+    def latest(self, role: Optional[str] = None) -> Optional[Any]:
+        index = self.last_index(role)
+        return None if index is None else self._item(index)
+
+    def tool_call_index(self, tool_call_id: str) -> Optional[int]:
+        """Index of the assistant message issuing ``tool_call_id``."""
+        self._ensure_index()
+        return self._tool_calls.get(tool_call_id)
+
+    def tool_result_index(self, tool_call_id: str) -> Optional[int]:
+        """Index of the tool message answering ``tool_call_id``."""
+        self._ensure_index()
+        return self._tool_results.get(tool_call_id)
+
+    def get_tool_result(self, tool_call_id: str) -> Optional[Any]:
+        index = self.tool_result_index(tool_call_id)
+        return None if index is None else self._item(index)
+
+
 class State(BaseModel):
     context_id: Optional[str] = Field(default=None)
     messages: List[ChatCompletionMessageParam] = Field(default_factory=list)
@@ -40,6 +273,70 @@ class State(BaseModel):
     context_parameters: Optional[ArkContextParameters] = Field(default=None)
     details: Optional[Any] = None
 
+    # arguments of streamed tool calls, parsed as they arrive
+    _tool_arguments: Dict[str, IncrementalJSONParser] = PrivateAttr(
+        default_factory=dict
+    )
+
+    @field_validator("messages", mode="wrap")
+    @classmethod
+    def _to_message_store(
+        cls, messages: Any, handler: ValidatorFunctionWrapHandler
+    ) -> MessageStore:
+        if isinstance(messages, MessageStore):
+            return messages
+        return MessageStore(handler(messages))
+
+    @field_serializer("messages", mode="wrap")
+    def _serialize_messages(
+        self, messages: Iterable[Any], handler: SerializerFunctionWrapHandler
+    ) -> Any:
+        return handler(list(messages))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "messages" and not isinstance(value, MessageStore):
+            value = MessageStore(value)
+        super().__setattr__(name, value)
+
+    @property
+    def message_store(self) -> MessageStore:
+        # model_copy(update=...) bypasses validation and may leave a plain list
+        if not isinstance(self.messages, MessageStore):
+            self.messages = MessageStore(self.messages)  # type: ignore
+        return self.messages  # type: ignore
+
+    def fork(self) -> "State":
+        """
+        Branch the state in O(1): the messages are shared copy-on-write,
+        parameters are copied and details are shared.
+        """
+        forked = self.model_copy(
+            update={
+                "messages": self.message_store.fork(),
+                "parameters": (
+                    self.parameters.model_copy() if self.parameters else None
+                ),
+                "context_parameters": (
+                    self.context_parameters.model_copy()
+                    if self.context_parameters
+                    else None
+                ),
+            }
+        )
+        forked._tool_arguments = dict(self._tool_arguments)
+        return forked
+
+    def get_tool_arguments(self, tool_call_id: str) -> Optional[IncrementalJSONParser]:
+        return self._tool_arguments.get(tool_call_id)
+
+    def set_tool_arguments(
+        self, tool_call_id: str, parser: IncrementalJSONParser
+    ) -> None:
+        self._tool_arguments[tool_call_id] = parser
+
+    def pop_tool_arguments(self, tool_call_id: str) -> Optional[IncrementalJSONParser]:
+        return self._tool_arguments.pop(tool_call_id, None)
+
 
 class ContextInterruption(BaseModel):
     life_cycle: Literal["tool_call", "llm_call"]
@@ -0,0 +1,127 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable
+
+ToolResult = tuple[Any | None, Exception | None]
+ToolRunner = Callable[[str, Any], Awaitable[ToolResult]]
+
+
+class ToolCallExecutor:
+    """
+    Runs the tool calls of a single assistant turn together.
+
+    Independent calls share a bounded semaphore, while tools listed in
+    ``serial_tools`` never overlap with any other call of the turn.
+    Results are always returned in the order of the given calls.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: float | None = None,
+        tool_timeouts: dict[str, float] | None = None,
+        serial_tools: Iterable[str] | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.tool_timeouts: dict[str, float] = tool_timeouts or {}
+        self.serial_tools: set[str] = set(serial_tools or [])
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def is_serial(self, tool_name: str) -> bool:
+        return tool_name in self.serial_tools
+
+    def get_timeout(self, tool_name: str) -> float | None:
+        return self.tool_timeouts.get(tool_name, self.timeout)
+
+    def start_turn(self) -> "ToolCallTurn":
+        return ToolCallTurn(self)
+
+    async def run(
+        self,
+        calls: list[tuple[str, Any]],
+        runner: ToolRunner,
+    ) -> list[ToolResult]:
+        """
+        Execute ``(tool_name, arguments)`` pairs with ``runner``.
+
+        Consecutive non-serial calls run together, a serial call runs alone
+        between them.
+        """
+        turn = self.start_turn()
+        try:
+            tasks = [turn.start(name, arguments, runner) for name, arguments in calls]
+            return [await t for t in tasks]
+        finally:
+            turn.cancel()
+
+    async def _run_one(
+        self, tool_name: str, arguments: Any, runner: ToolRunner
+    ) -> ToolResult:
+        timeout = self.get_timeout(tool_name)
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(runner(tool_name, arguments), timeout)
+            except asyncio.TimeoutError:
+                return None, asyncio.TimeoutError(
+                    f"Tool {tool_name} timed out after {timeout}s"
+                )
+
+
+class ToolCallTurn:
+    """
+    Tool calls of one turn, started one at a time as they become ready.
+
+    A serial call waits for every call started before it, and the calls
+    started after it wait for it.
+    """
+
+    def __init__(self, executor: ToolCallExecutor) -> None:
+        self.executor = executor
+        # calls started since the latest serial call, included
+        self._started: list["asyncio.Future[ToolResult]"] = []
+        self._serial: list["asyncio.Future[ToolResult]"] = []
+
+    def start(
+        self, tool_name: str, arguments: Any, runner: ToolRunner
+    ) -> "asyncio.Future[ToolResult]":
+        if self.executor.is_serial(tool_name):
+            after = self._started
+            self._started = []
+        else:
+            after = self._serial
+        task = asyncio.ensure_future(self._run(after, tool_name, arguments, runner))
+        self._started.append(task)
+        if self.executor.is_serial(tool_name):
+            self._serial = [task]
+        return task
+
+    async def _run(
+        self,
+        after: list["asyncio.Future[ToolResult]"],
+        tool_name: str,
+        arguments: Any,
+        runner: ToolRunner,
+    ) -> ToolResult:
+        if after:
+            await asyncio.wait(after)
+        return await self.executor._run_one(tool_name, arguments, runner)
+
+    def cancel(self) -> None:
+        for task in self._started + self._serial:
+            task.cancel()
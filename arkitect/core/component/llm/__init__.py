@@ -13,10 +13,22 @@
 # limitations under the License.
 
 from ....types.llm.model import ArkChatCompletionChunk, ArkChatRequest, ArkChatResponse
+from .cache import BaseResponseCache, InMemoryResponseCache, RedisResponseCache
+from .hedge import HedgePolicy
 from .llm import BaseChatLanguageModel
+from .rate_limit import BaseRateLimiter, InProcessRateLimiter, RedisRateLimiter
+from .single_flight import SingleFlight
 
 __all__ = [
     "BaseChatLanguageModel",
+    "BaseResponseCache",
+    "InMemoryResponseCache",
+    "RedisResponseCache",
+    "SingleFlight",
+    "BaseRateLimiter",
+    "InProcessRateLimiter",
+    "RedisRateLimiter",
+    "HedgePolicy",
     "ArkChatRequest",
     "ArkChatResponse",
     "ArkChatCompletionChunk",
@@ -0,0 +1,290 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from volcenginesdkarkruntime.types.chat import ChatCompletion, ChatCompletionChunk
+
+from arkitect.core.client.redis import RedisClient
+from arkitect.telemetry.logger import WARN
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_cache_key(
+    endpoint: str,
+    params: Dict[str, Any],
+    extra_query: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Canonical hash of a chat request: the endpoint plus the request body
+    (model, messages, tools and parameters) and query, with sorted keys so the
+    order the fields were set in does not matter.
+    """
+    payload = json.dumps(
+        {"endpoint": endpoint, "params": params, "query": extra_query or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_deterministic(params: Dict[str, Any]) -> bool:
+    """
+    Whether a request asks for a reproducible response (temperature 0 or a
+    fixed seed). Any other request samples a new response every time and must
+    not be answered from a cache.
+    """
+    extra_body = params.get("extra_body") or {}
+    return (
+        params.get("temperature") == 0
+        or params.get("seed") is not None
+        or extra_body.get("seed") is not None
+    )
+
+
+class BaseResponseCache(ABC):
+    """
+    Cache of serialized chat completions. Only deterministic requests, see
+    ``is_deterministic``, are read from or written to it.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        pass
+
+
+class InMemoryResponseCache(BaseResponseCache):
+    """
+    LRU cache bounded by both the number of entries and their total size.
+    Entries older than ``ttl`` seconds are dropped when read.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # total size of the values, in utf-8 bytes
+        self.size = 0
+        # key -> (expiry, value, size), least recently used first
+        self._entries: OrderedDict[str, Tuple[Optional[float], str, int]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expiry, value, _ = entry
+        if expiry is not None and expiry <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        self._pop(key)
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expiry, value, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+
+class RedisResponseCache(BaseResponseCache):
+    """
+    Cache shared between processes. Entries expire after ``ttl`` seconds and
+    values above ``max_bytes`` are not stored, the total size is left to the
+    eviction policy of the server.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        prefix: str = "arkitect:llm_cache:",
+        ttl: Optional[float] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.redis_client = RedisClient(
+            host=host,
+            username=username,
+            password=password,
+        )
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis_client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            return value.decode()
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        if len(value.encode()) > self.max_bytes:
+            return
+        await self.redis_client.set(
+            self.prefix + key,
+            value,
+            px=int(self.ttl * 1000) if self.ttl is not None else None,
+        )
+
+
+async def cache_get(cache: BaseResponseCache, key: str) -> Optional[str]:
+    """Read from the cache, a failing backend is a miss."""
+    try:
+        return await cache.get(key)
+    except Exception as e:
+        WARN(f"Failed to read llm response cache: {e}")
+        return None
+
+
+async def cache_set(cache: BaseResponseCache, key: str, value: str) -> None:
+    """Write to the cache, a failing backend only loses the entry."""
+    try:
+        await cache.set(key, value)
+    except Exception as e:
+        WARN(f"Failed to write llm response cache: {e}")
+
+
+def dump_completion(completion: ChatCompletion) -> Optional[str]:
+    """Serialized completion, None if it did not finish and is not worth caching."""
+    if not completion.choices or not all(c.finish_reason for c in completion.choices):
+        return None
+    return completion.model_dump_json()
+
+
+def load_completion(value: str) -> ChatCompletion:
+    return ChatCompletion.model_validate_json(value)
+
+
+def compact_chunks(chunks: List[ChatCompletionChunk]) -> List[Dict[str, Any]]:
+    """
+    Fold a finished stream into one chunk per choice holding its whole
+    content, reasoning and tool calls, followed by the usage chunks as they
+    were received. Empty if the stream did not finish.
+    """
+    choices: Dict[int, Dict[str, Any]] = {}
+    usages: List[Dict[str, Any]] = []
+    first: Optional[ChatCompletionChunk] = None
+    for chunk in chunks:
+        if chunk.usage:
+            usages.append(chunk.model_dump(mode="json", exclude_none=True))
+            continue
+        first = first or chunk
+        for choice in chunk.choices:
+            folded = choices.setdefault(
+                choice.index,
+                {"content": [], "reasoning": [], "tool_calls": {}, "delta": {}},
+            )
+            delta = choice.delta
+            if delta.role:
+                folded["delta"].setdefault("role", delta.role)
+            if delta.content:
+                folded["content"].append(delta.content)
+            if delta.reasoning_content:
+                folded["reasoning"].append(delta.reasoning_content)
+            for tool_call in delta.tool_calls or []:
+                call = folded["tool_calls"].setdefault(
+                    tool_call.index,
+                    {"index": tool_call.index, "arguments": []},
+                )
+                if tool_call.type:
+                    call["type"] = tool_call.type
+                if tool_call.id:
+                    call["id"] = tool_call.id
+                if tool_call.function and tool_call.function.name:
+                    call["name"] = tool_call.function.name
+                if tool_call.function and tool_call.function.arguments:
+                    call["arguments"].append(tool_call.function.arguments)
+            if choice.finish_reason:
+                folded["finish_reason"] = choice.finish_reason
+
+    if not choices or not all("finish_reason" in c for c in choices.values()):
+        return []
+    assert first is not None
+    folded_chunk = first.model_dump(mode="json", exclude_none=True)
+    folded_chunk["choices"] = []
+    for index, folded in sorted(choices.items()):
+        delta = folded["delta"]
+        delta["content"] = "".join(folded["content"])
+        if folded["reasoning"]:
+            delta["reasoning_content"] = "".join(folded["reasoning"])
+        if folded["tool_calls"]:
+            delta["tool_calls"] = [
+                {
+                    "index": call["index"],
+                    "id": call.get("id"),
+                    "type": call.get("type", "function"),
+                    "function": {
+                        "name": call.get("name"),
+                        "arguments": "".join(call["arguments"]),
+                    },
+                }
+                for _, call in sorted(folded["tool_calls"].items())
+            ]
+        folded_chunk["choices"].append(
+            {"index": index, "delta": delta, "finish_reason": folded["finish_reason"]}
+        )
+    return [folded_chunk] + usages
+
+
+async def replay_chunks(value: str) -> AsyncIterator[ChatCompletionChunk]:
+    for chunk in json.loads(value):
+        yield ChatCompletionChunk.model_validate(chunk)
+
+
+async def record_chunks(
+    stream: AsyncIterator[ChatCompletionChunk],
+    cache: BaseResponseCache,
+    key: str,
+) -> AsyncIterator[ChatCompletionChunk]:
+    """Pass the stream through and cache it once it finished."""
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+    compacted = compact_chunks(chunks)
+    if compacted:
+        await cache_set(cache, key, json.dumps(compacted, ensure_ascii=False))
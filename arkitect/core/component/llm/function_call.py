@@ -12,9 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import copy
 import json
-from typing import Any, Optional, Union
+from typing import Any, List, Optional, Union
 
 from volcenginesdkarkruntime.types.chat import (
     ChatCompletion,
@@ -25,7 +26,7 @@ from arkitect.core.component.tool.tool_pool import ToolPool
 from arkitect.core.component.tool.utils import (
     convert_to_chat_completion_content_part_param,
 )
-from arkitect.telemetry.logger import INFO, WARN
+from arkitect.telemetry.logger import ERROR, INFO, WARN
 from arkitect.telemetry.trace import task
 from arkitect.utils import dump_json_str
 
@@ -38,6 +39,56 @@ from ....types.llm.model import (
 )
 from .utils import convert_response_message
 
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+async def _call_tool(tool_pool: ToolPool, tool_call: Any) -> Optional[ArkMessage]:
+    tool_name = tool_call.function.name
+    parameters = json.loads(tool_call.function.arguments)
+    if not await tool_pool.contain(tool_name=tool_name):
+        WARN(f"Function {tool_name} not found")
+        return None
+    resp = await tool_pool.execute_tool(
+        tool_name=tool_name,
+        parameters=parameters,
+    )
+    resp = convert_to_chat_completion_content_part_param(resp)
+    INFO(
+        f"Function {tool_name} called with parameters:"
+        + dump_json_str(parameters)
+        + f" and response: {resp}"
+    )
+    return ArkMessage(
+        role="tool",
+        content=resp,
+        tool_call_id=tool_call.id,
+    )
+
+
+async def _call_tools_in_parallel(
+    tool_pool: ToolPool,
+    tool_calls: List[Any],
+    max_concurrency: Optional[int],
+    timeout: Optional[float],
+) -> List[Optional[ArkMessage]]:
+    semaphore = asyncio.Semaphore(max_concurrency or len(tool_calls))
+
+    async def call(tool_call: Any) -> Optional[ArkMessage]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    _call_tool(tool_pool, tool_call), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                error = f"Function {tool_call.function.name} timed out after {timeout}s"
+            except Exception as e:
+                error = f"Function {tool_call.function.name} failed: {e}"
+        # a failing call is reported to the model, the other calls go on
+        ERROR(error)
+        return ArkMessage(role="tool", content=error, tool_call_id=tool_call.id)
+
+    return await asyncio.gather(*(call(tool_call) for tool_call in tool_calls))
+
 
 @task()
 async def handle_function_call(
@@ -47,6 +98,8 @@ async def handle_function_call(
     ],
     tool_pool: Optional[ToolPool] = None,
     function_call_mode: Optional[FunctionCallMode] = FunctionCallMode.SEQUENTIAL,
+    max_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+    timeout: Optional[float] = None,
     **kwargs: Any,
 ) -> bool:
     """
@@ -60,6 +113,11 @@ async def handle_function_call(
         response : The chat response to process.
         functions : A dictionary of available functions.
         function_call_mode : The mode for handling function calls.
+        max_concurrency : The maximum number of calls running at once in
+            parallel mode, None for no limit.
+        timeout : Seconds each call may take in parallel mode, None for no
+            limit. Failed and timed out calls are answered with an error
+            message instead of aborting the other calls.
     """
     if response.choices[0].finish_reason != "tool_calls":
         return False
@@ -75,33 +133,19 @@ async def handle_function_call(
     if not tool_calls or not tool_pool:
         return False
 
-    if function_call_mode and function_call_mode != FunctionCallMode.SEQUENTIAL:
-        raise NotImplementedError("Only sequential function call mode is supported")
-
     request.messages.append(convert_response_message(response_message))
 
     function_calls = copy.deepcopy(tool_calls)
+    if function_call_mode == FunctionCallMode.PARALLEL:
+        results = await _call_tools_in_parallel(
+            tool_pool, list(function_calls), max_concurrency, timeout
+        )
+        # results are in call order whatever order the calls finished in
+        request.messages.extend(m for m in results if m is not None)
+        return True
+
     for tool_call in function_calls:
-        tool_name = tool_call.function.name
-        parameters = json.loads(tool_call.function.arguments)
-        if not await tool_pool.contain(tool_name=tool_name):
-            WARN(f"Function {tool_name} not found")
-        else:
-            resp = await tool_pool.execute_tool(
-                tool_name=tool_name,
-                parameters=parameters,
-            )
-            resp = convert_to_chat_completion_content_part_param(resp)
-            INFO(
-                f"Function {tool_name} called with parameters:"
-                + dump_json_str(parameters)
-                + f" and response: {resp}"
-            )
-            request.messages.append(
-                ArkMessage(
-                    role="tool",
-                    content=resp,
-                    tool_call_id=tool_call.id,
-                )
-            )
+        message = await _call_tool(tool_pool, tool_call)
+        if message is not None:
+            request.messages.append(message)
     return True
@@ -0,0 +1,182 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import suppress
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# first chunk of a stream that ended before sending any
+_END: Any = object()
+
+
+class HedgePolicy:
+    """
+    When to send a second copy of a streaming request whose first chunk is
+    late.
+
+    The copy is sent after ``delay`` seconds or, without a delay, after the
+    ``percentile`` of the time to first chunk of the last ``window`` requests
+    (``initial_delay`` until ``min_samples`` of them were seen). At most
+    ``budget`` of the requests are hedged, plus up to ``max_burst`` hedges
+    saved up while none were needed, which are available from the start.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        initial_delay: float = 1.0,
+        budget: float = 0.1,
+        max_burst: float = 10,
+    ) -> None:
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.budget = budget
+        self.max_burst = max_burst
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._ttfts: Deque[float] = deque(maxlen=window)
+        self._tokens = float(max_burst)
+
+    def hedge_delay(self) -> float:
+        if self.delay is not None:
+            return self.delay
+        if len(self._ttfts) < self.min_samples:
+            return self.initial_delay
+        ttfts = sorted(self._ttfts)
+        return ttfts[min(math.ceil(len(ttfts) * self.percentile), len(ttfts)) - 1]
+
+    def observe(self, ttft: float) -> None:
+        self._ttfts.append(ttft)
+
+    def on_request(self) -> None:
+        self.requests += 1
+        self._tokens = min(self._tokens + self.budget, self.max_burst)
+
+    def try_hedge(self) -> bool:
+        # ten budgets of 0.1 add up to a little less than one
+        if self._tokens < 1 - 1e-9:
+            return False
+        self._tokens -= 1
+        self.hedges += 1
+        return True
+
+
+async def _close(stream: Any) -> None:
+    close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+    if close is not None:
+        # an sdk stream built from an iterator has no response to close
+        with suppress(Exception):
+            await close()
+
+
+async def _first_chunk(
+    send: Callable[[], Awaitable[AsyncIterator[T]]],
+) -> Tuple[AsyncIterator[T], Any, float]:
+    stream = await send()
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = _END
+    except BaseException:
+        await _close(stream)
+        raise
+    return stream, first, time.monotonic()
+
+
+def _discard(attempt: "asyncio.Future[Any]") -> None:
+    def close(attempt: "asyncio.Future[Any]") -> None:
+        if not attempt.cancelled() and attempt.exception() is None:
+            asyncio.ensure_future(_close(attempt.result()[0]))
+
+    if attempt.done():
+        close(attempt)
+    else:
+        attempt.cancel()
+        # it may still get its stream before the cancellation lands
+        attempt.add_done_callback(close)
+
+
+async def _rest(stream: AsyncIterator[T], first: Any) -> AsyncIterator[T]:
+    try:
+        if first is _END:
+            return
+        yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await _close(stream)
+
+
+async def hedge(
+    policy: HedgePolicy, send: Callable[[], Awaitable[AsyncIterator[T]]]
+) -> AsyncIterator[T]:
+    """
+    Stream of ``send``, or of a second call of it if the first one did not get
+    a chunk within the hedge delay, whichever gets its first chunk first. The
+    other one is cancelled. A request failing before the hedge is sent is not
+    hedged; once it was sent, the first failure waits for the other attempt.
+    """
+    policy.on_request()
+    start = time.monotonic()
+    attempts: List["asyncio.Future[Any]"] = [asyncio.ensure_future(_first_chunk(send))]
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=policy.hedge_delay())
+        if not done and policy.try_hedge():
+            attempts.append(asyncio.ensure_future(_first_chunk(send)))
+        winner = None
+        pending = set(attempts)
+        while winner is None:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            winner = next((a for a in done if a.exception() is None), None)
+            if winner is None and not pending:
+                # the error of the original request
+                raise attempts[0].exception()  # type: ignore
+    except BaseException:
+        for attempt in attempts:
+            _discard(attempt)
+        raise
+    for attempt in attempts:
+        if attempt is not winner:
+            _discard(attempt)
+
+    stream, first, first_at = winner.result()
+    # timed from the original request: a hedge winning only tells that the
+    # original took at least that long, its own ttft would bias the delay low
+    policy.observe(first_at - start)
+    if winner is not attempts[0]:
+        policy.hedge_wins += 1
+    return _rest(stream, first)
@@ -12,17 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from langchain.prompts.chat import BaseChatPromptTemplate
 from langchain.schema.output_parser import BaseTransformOutputParser
-from volcenginesdkarkruntime import Ark, AsyncArk
+from pydantic.v1 import PrivateAttr
+from volcenginesdkarkruntime import AsyncArk
 from volcenginesdkarkruntime._streaming import AsyncStream
 from volcenginesdkarkruntime.types.chat import (
     ChatCompletion,
     ChatCompletionChunk,
 )
 
+from arkitect.core.client import get_ark_client_pool
 from arkitect.core.component.tool.mcp_client import MCPClient
 from arkitect.core.component.tool.tool_pool import ToolPool, build_tool_pool
 
@@ -39,7 +41,21 @@ from ....types.llm.model import (
     FunctionCallMode,
 )
 from .base import BaseLanguageModel
-from .function_call import handle_function_call
+from .cache import (
+    BaseResponseCache,
+    cache_get,
+    cache_set,
+    dump_completion,
+    is_deterministic,
+    load_completion,
+    make_cache_key,
+    record_chunks,
+    replay_chunks,
+)
+from .function_call import DEFAULT_MAX_CONCURRENCY, handle_function_call
+from .hedge import HedgePolicy, hedge
+from .rate_limit import BaseRateLimiter, estimate_tokens, send_rate_limited
+from .single_flight import SingleFlight
 from .utils import format_ark_prompts
 
 
@@ -48,12 +64,43 @@ class BaseChatLanguageModel(BaseLanguageModel):
     parameters: Optional[ArkChatParameters] = None
     template: Optional[BaseChatPromptTemplate] = None
     output_parser: Optional[BaseTransformOutputParser] = None
+    # shared by model instances with the same tools, used when no functions are given
+    tool_pool: Optional[ToolPool] = None
+    # opt-in, only for deterministic requests
+    response_cache: Optional[BaseResponseCache] = None
+    # shared by the models whose identical concurrent requests should be merged
+    single_flight: Optional[SingleFlight] = None
+    # shared by the models sending to the same quotas
+    rate_limiter: Optional[BaseRateLimiter] = None
+    # opt-in, duplicates streams whose first chunk is late
+    hedge_policy: Optional[HedgePolicy] = None
+
+    _functions: Optional[List[Any]] = PrivateAttr(default=None)
+    _functions_tool_pool: Optional[ToolPool] = PrivateAttr(default=None)
+    # (client, copy of it without retries) for the rate limiter to retry itself
+    _unretried_client: Optional[Tuple[AsyncArk, AsyncArk]] = PrivateAttr(default=None)
 
     class Config:
         """Configuration for this pydantic object."""
 
         arbitrary_types_allowed = True
 
+    def get_tool_pool(
+        self, functions: list[MCPClient | Callable] | ToolPool | None = None
+    ) -> ToolPool | None:
+        """
+        Tool pool of a run. The pool built from a list of functions is kept on
+        the model and only rebuilt when a different list is passed.
+        """
+        if functions is None:
+            return self.tool_pool
+        if isinstance(functions, ToolPool):
+            return functions
+        if self._functions != functions:
+            self._functions_tool_pool = build_tool_pool(functions)
+            self._functions = list(functions)
+        return self._functions_tool_pool
+
     def generate_prompts(
         self,
         messages: List[ArkMessage],
@@ -106,10 +153,92 @@ class BaseChatLanguageModel(BaseLanguageModel):
 
         extra_headers = get_extra_headers(extra_headers)
 
-        return await self.client.chat.completions.create(
-            **params,
-            extra_headers=extra_headers,
-            extra_query=extra_query,
+        # sampled responses differ from call to call, only replay fixed ones
+        cache = self.response_cache if is_deterministic(params) else None
+        if cache is None and self.single_flight is None:
+            return await self._create(params, extra_headers, extra_query)
+
+        key = make_cache_key(str(self.client._base_url), params, extra_query)
+        if cache is not None:
+            cached = await cache_get(cache, key)
+            if cached is not None and request.stream:
+                # replayed as a stream of one chunk per choice and the usage chunks
+                return replay_chunks(cached)  # type: ignore
+            if cached is not None:
+                return load_completion(cached)
+
+        async def create() -> Any:
+            completion = await self._create(params, extra_headers, extra_query)
+            if cache is None:
+                return completion
+            if request.stream:
+                return record_chunks(completion, cache, key)
+            value = dump_completion(completion)
+            if value is not None:
+                await cache_set(cache, key, value)
+            return completion
+
+        if self.single_flight is None:
+            return await create()
+        if request.stream:
+            return await self.single_flight.stream(key, create)  # type: ignore
+        return await self.single_flight.call(key, create)
+
+    async def _create(
+        self,
+        params: Dict[str, Any],
+        extra_headers: Optional[Dict[str, str]],
+        extra_query: Optional[Dict[str, Any]],
+    ) -> Any:
+        if params.get("stream") and self.hedge_policy is not None:
+            return await hedge(
+                self.hedge_policy,
+                lambda: self._send(params, extra_headers, extra_query),
+            )
+        return await self._send(params, extra_headers, extra_query)
+
+    async def _send(
+        self,
+        params: Dict[str, Any],
+        extra_headers: Optional[Dict[str, str]],
+        extra_query: Optional[Dict[str, Any]],
+    ) -> Any:
+        if self.rate_limiter is None:
+            return await self.client.chat.completions.create(
+                **params,
+                extra_headers=extra_headers,
+                extra_query=extra_query,
+            )
+
+        if (
+            self._unretried_client is None
+            or self._unretried_client[0] is not self.client
+        ):
+            self._unretried_client = (
+                self.client,
+                AsyncArk(
+                    base_url=self.client._base_url,
+                    api_key=self.client.api_key,
+                    ak=self.client.ak,
+                    sk=self.client.sk,
+                    region=self.client.region,
+                    timeout=self.client.timeout,
+                    max_retries=0,
+                    http_client=self.client._client,
+                ),
+            )
+        client = self._unretried_client[1]
+        return await send_rate_limited(
+            self.rate_limiter,
+            # quotas are per model endpoint
+            f"{self.client._base_url}{params['model']}",
+            estimate_tokens(params),
+            lambda: client.chat.completions.create(
+                **params,
+                extra_headers=extra_headers,
+                extra_query=extra_query,
+            ),
+            self.client.max_retries,
         )
 
     @task()
@@ -120,7 +249,16 @@ class BaseChatLanguageModel(BaseLanguageModel):
         extra_query: Optional[Dict[str, Any]] = None,
         extra_body: Optional[Dict[str, Any]] = None,
     ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
-        sync_client = Ark()
+        # the sync client mirrors the async one and is pooled per config
+        sync_client = get_ark_client_pool().get_client(
+            base_url=self.client._base_url,
+            api_key=self.client.api_key,
+            ak=self.client.ak,
+            sk=self.client.sk,
+            region=self.client.region,
+            timeout=self.client.timeout,
+            max_retries=self.client.max_retries,
+        )
 
         extra_headers = get_extra_headers(extra_headers)
 
@@ -189,6 +327,8 @@ class BaseChatLanguageModel(BaseLanguageModel):
         *,
         functions: list[MCPClient | Callable] | ToolPool | None = None,
         function_call_mode: Optional[FunctionCallMode] = FunctionCallMode.SEQUENTIAL,
+        function_call_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+        function_call_timeout: Optional[float] = None,
         additional_system_prompts: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> ArkChatResponse:
@@ -201,7 +341,7 @@ class BaseChatLanguageModel(BaseLanguageModel):
             else {}
         )
 
-        tool_pool: ToolPool | None = build_tool_pool(functions)
+        tool_pool = self.get_tool_pool(functions)
         if tool_pool:
             await tool_pool.initialize()
             parameters["tools"] = await tool_pool.list_tools()
@@ -225,7 +365,12 @@ class BaseChatLanguageModel(BaseLanguageModel):
 
             if completion.choices and completion.choices[0].finish_reason:
                 if not await handle_function_call(
-                    request, completion, tool_pool, function_call_mode
+                    request,
+                    completion,
+                    tool_pool,
+                    function_call_mode,
+                    max_concurrency=function_call_concurrency,
+                    timeout=function_call_timeout,
                 ):
                     break
 
@@ -239,6 +384,8 @@ class BaseChatLanguageModel(BaseLanguageModel):
         *,
         functions: list[MCPClient | Callable] | ToolPool | None = None,
         function_call_mode: Optional[FunctionCallMode] = FunctionCallMode.SEQUENTIAL,
+        function_call_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+        function_call_timeout: Optional[float] = None,
         additional_system_prompts: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> AsyncStream[ArkChatCompletionChunk]:
@@ -252,7 +399,7 @@ class BaseChatLanguageModel(BaseLanguageModel):
             else {}
         )
 
-        tool_pool: ToolPool | None = build_tool_pool(functions)
+        tool_pool = self.get_tool_pool(functions)
         if tool_pool:
             await tool_pool.initialize()
             parameters["tools"] = await tool_pool.list_tools()
@@ -276,6 +423,8 @@ class BaseChatLanguageModel(BaseLanguageModel):
             # default: one iter
             is_more_request = False
             final_tool_calls = {}
+            # argument fragments per tool call, joined once the call is complete
+            arguments: Dict[int, List[str]] = {}
             cumulated = []
             async for resp in completion:  # type: ChatCompletionChunk
                 if resp.usage:
@@ -289,22 +438,33 @@ class BaseChatLanguageModel(BaseLanguageModel):
                     for tool_call in resp.choices[0].delta.tool_calls:
                         index = tool_call.index
                         if index not in final_tool_calls:
-                            final_tool_calls[index] = tool_call
-                        else:
-                            final_tool_calls[
-                                index
-                            ].function.arguments += tool_call.function.arguments
+                            # chunks may be shared with other subscribers
+                            final_tool_calls[index] = tool_call.model_copy(deep=True)
+                            arguments[index] = []
+                        arguments[index].append(tool_call.function.arguments or "")
                 else:
                     # hide tool_calls info from response
                     if resp.choices[0].finish_reason != "tool_calls":
                         yield ArkChatCompletionChunk(**resp.__dict__)
                 if resp.choices[0].finish_reason == "tool_calls":
+                    for index, fragments in arguments.items():
+                        final_tool_calls[index].function.arguments = "".join(fragments)
                     ark_resp = ArkChatCompletionChunk.merge(cumulated)
-                    ark_resp.choices[0].delta.tool_calls = list(  # type: ignore
-                        final_tool_calls.values()
+                    choice = ark_resp.choices[0]  # type: ignore
+                    ark_resp.choices[0] = choice.model_copy(  # type: ignore
+                        update={
+                            "delta": choice.delta.model_copy(
+                                update={"tool_calls": list(final_tool_calls.values())}
+                            )
+                        }
                     )
                     is_more_request = await handle_function_call(
-                        request, ark_resp, tool_pool, function_call_mode
+                        request,
+                        ark_resp,
+                        tool_pool,
+                        function_call_mode,
+                        max_concurrency=function_call_concurrency,
+                        timeout=function_call_timeout,
                     )
 
             if not is_more_request:
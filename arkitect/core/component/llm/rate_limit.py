@@ -0,0 +1,367 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, TypeVar
+
+from volcenginesdkarkruntime._constants import INITIAL_RETRY_DELAY, MAX_RETRY_DELAY
+from volcenginesdkarkruntime._exceptions import (
+    ArkAPIConnectionError,
+    ArkAPIStatusError,
+    ArkRateLimitError,
+)
+
+from arkitect.core.client.redis import RedisClient
+from arkitect.telemetry.logger import WARN
+
+T = TypeVar("T")
+
+# bytes of utf-8 per token, low enough to overestimate both chinese and english
+BYTES_PER_TOKEN = 3
+
+
+def estimate_tokens(params: Dict[str, Any]) -> int:
+    """Rough upper bound of the prompt tokens of a chat request."""
+    prompt = json.dumps(
+        [params.get("messages"), params.get("tools")], ensure_ascii=False, default=str
+    )
+    return len(prompt.encode()) // BYTES_PER_TOKEN + 1
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from ``retry-after-ms`` or ``retry-after``, if any."""
+    try:
+        if "retry-after-ms" in headers:
+            return max(float(headers["retry-after-ms"]) / 1000, 0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            delta = parsedate_to_datetime(value) - datetime.now(timezone.utc)
+            return max(delta.total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Buckets:
+    """
+    Request and token buckets of one endpoint, refilled at the configured
+    rates times ``scale``. A request larger than a bucket is let through once
+    the bucket is full and leaves it in debt.
+    """
+
+    def __init__(self, requests: float, tokens: float, now: float) -> None:
+        self.requests = requests
+        self.tokens = tokens
+        self.updated = now
+        self.scale = 1.0
+        self.blocked_until = 0.0
+
+
+class BaseRateLimiter(ABC):
+    """
+    Client-side limiter of the requests sent to each endpoint.
+
+    Requests are paced by token buckets sized from the configured requests
+    and tokens per minute, holding ``burst_seconds`` worth of quota. The rates
+    are adapted AIMD-style: every 429 multiplies them by ``decrease`` and
+    pauses the endpoint for its Retry-After, every success adds ``increase``
+    back up to the configured rates.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        burst_seconds: float = 1.0,
+        decrease: float = 0.5,
+        increase: float = 0.05,
+        min_scale: float = 0.05,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self.decrease = decrease
+        self.increase = increase
+        self.min_scale = min_scale
+
+    @abstractmethod
+    async def acquire(self, key: str, tokens: int) -> None:
+        """Wait until a request of ``tokens`` prompt tokens may be sent."""
+        pass
+
+    @abstractmethod
+    async def on_rate_limited(self, key: str, retry_after: Optional[float]) -> None:
+        pass
+
+    @abstractmethod
+    async def on_success(self, key: str) -> None:
+        pass
+
+
+class InProcessRateLimiter(BaseRateLimiter):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._buckets: Dict[str, _Buckets] = {}
+
+    def _capacity(self, per_minute: Optional[float], scale: float) -> float:
+        return per_minute * scale / 60 * self.burst_seconds if per_minute else 0
+
+    def _refill(self, key: str, now: float) -> _Buckets:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = self._buckets[key] = _Buckets(
+                self._capacity(self.requests_per_minute, 1),
+                self._capacity(self.tokens_per_minute, 1),
+                now,
+            )
+        elapsed = max(now - buckets.updated, 0)
+        buckets.updated = now
+        if self.requests_per_minute:
+            buckets.requests = min(
+                buckets.requests
+                + elapsed * self.requests_per_minute * buckets.scale / 60,
+                self._capacity(self.requests_per_minute, buckets.scale),
+            )
+        if self.tokens_per_minute:
+            buckets.tokens = min(
+                buckets.tokens + elapsed * self.tokens_per_minute * buckets.scale / 60,
+                self._capacity(self.tokens_per_minute, buckets.scale),
+            )
+        return buckets
+
+    def _take(self, key: str, tokens: int, now: float) -> float:
+        """Take from the buckets, or the seconds to wait before trying again."""
+        buckets = self._refill(key, now)
+        if buckets.blocked_until > now:
+            return buckets.blocked_until - now
+        wait = 0.0
+        for per_minute, level, cost in [
+            (self.requests_per_minute, buckets.requests, 1),
+            (self.tokens_per_minute, buckets.tokens, tokens),
+        ]:
+            if not per_minute:
+                continue
+            needed = min(cost, self._capacity(per_minute, buckets.scale))
+            if level < needed:
+                wait = max(wait, (needed - level) / (per_minute * buckets.scale / 60))
+        if wait > 0:
+            return wait
+        buckets.requests -= 1
+        buckets.tokens -= tokens
+        return 0
+
+    async def acquire(self, key: str, tokens: int) -> None:
+        while True:
+            wait = self._take(key, tokens, time.monotonic())
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def on_rate_limited(self, key: str, retry_after: Optional[float]) -> None:
+        now = time.monotonic()
+        buckets = self._refill(key, now)
+        buckets.scale = max(buckets.scale * self.decrease, self.min_scale)
+        buckets.requests = min(buckets.requests, 0)
+        buckets.tokens = min(buckets.tokens, 0)
+        if retry_after:
+            buckets.blocked_until = max(buckets.blocked_until, now + retry_after)
+
+    async def on_success(self, key: str) -> None:
+        buckets = self._refill(key, time.monotonic())
+        buckets.scale = min(buckets.scale + self.increase, 1.0)
+
+    def scale(self, key: str) -> float:
+        buckets = self._buckets.get(key)
+        return buckets.scale if buckets else 1.0
+
+
+# the same buckets as InProcessRateLimiter in one hash per endpoint, on the
+# clock of the server so every process agrees on it
+_REFILL = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local s = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated', 'scale',
+                     'blocked_until')
+local scale = tonumber(s[4]) or 1
+local requests = tonumber(s[1]) or rpm / 60 * burst
+local tokens = tonumber(s[2]) or tpm / 60 * burst
+local elapsed = math.max(now - (tonumber(s[3]) or now), 0)
+requests = math.min(requests + elapsed * rpm * scale / 60, rpm * scale / 60 * burst)
+tokens = math.min(tokens + elapsed * tpm * scale / 60, tpm * scale / 60 * burst)
+local blocked_until = tonumber(s[5]) or 0
+"""
+
+_SAVE = """
+redis.call('HSET', KEYS[1], 'requests', tostring(requests), 'tokens', tostring(tokens),
+           'updated', tostring(now), 'scale', tostring(scale),
+           'blocked_until', tostring(blocked_until))
+redis.call('PEXPIRE', KEYS[1], 600000)
+"""
+
+_TAKE = (
+    _REFILL
+    + """
+local cost = tonumber(ARGV[4])
+local wait = 0
+if blocked_until > now then
+  wait = blocked_until - now
+else
+  if rpm > 0 then
+    local needed = math.min(1, rpm * scale / 60 * burst)
+    if requests < needed then
+      wait = math.max(wait, (needed - requests) / (rpm * scale / 60))
+    end
+  end
+  if tpm > 0 then
+    local needed = math.min(cost, tpm * scale / 60 * burst)
+    if tokens < needed then
+      wait = math.max(wait, (needed - tokens) / (tpm * scale / 60))
+    end
+  end
+  if wait <= 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+  end
+end
+"""
+    + _SAVE
+    + "return tostring(wait)"
+)
+
+_RATE_LIMITED = (
+    _REFILL
+    + """
+scale = math.max(scale * tonumber(ARGV[4]), tonumber(ARGV[5]))
+requests = math.min(requests, 0)
+tokens = math.min(tokens, 0)
+local retry_after = tonumber(ARGV[6])
+if retry_after > 0 then
+  blocked_until = math.max(blocked_until, now + retry_after)
+end
+"""
+    + _SAVE
+)
+
+_SUCCESS = (
+    _REFILL
+    + """
+scale = math.min(scale + tonumber(ARGV[4]), 1)
+"""
+    + _SAVE
+)
+
+
+class RedisRateLimiter(BaseRateLimiter):
+    """Limiter whose buckets are shared by every process using the same Redis."""
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        *args: Any,
+        prefix: str = "arkitect:rate_limit:",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.redis_client = RedisClient(
+            host=host,
+            username=username,
+            password=password,
+        )
+        self.prefix = prefix
+        self._take = self.redis_client.client.register_script(_TAKE)
+        self._rate_limited = self.redis_client.client.register_script(_RATE_LIMITED)
+        self._success = self.redis_client.client.register_script(_SUCCESS)
+
+    def _args(self, *extra: Any) -> list:
+        return [
+            self.requests_per_minute or 0,
+            self.tokens_per_minute or 0,
+            self.burst_seconds,
+            *extra,
+        ]
+
+    async def acquire(self, key: str, tokens: int) -> None:
+        while True:
+            wait = float(
+                await self._take(keys=[self.prefix + key], args=self._args(tokens))
+            )
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def on_rate_limited(self, key: str, retry_after: Optional[float]) -> None:
+        await self._rate_limited(
+            keys=[self.prefix + key],
+            args=self._args(self.decrease, self.min_scale, retry_after or 0),
+        )
+
+    async def on_success(self, key: str) -> None:
+        await self._success(keys=[self.prefix + key], args=self._args(self.increase))
+
+
+def _should_retry(e: Exception) -> bool:
+    """Failures the sdk would have retried itself, other than rate limits."""
+    if isinstance(e, ArkAPIConnectionError):
+        return True
+    return isinstance(e, ArkAPIStatusError) and (
+        e.status_code in (408, 409) or e.status_code >= 500
+    )
+
+
+async def send_rate_limited(
+    limiter: BaseRateLimiter,
+    key: str,
+    tokens: int,
+    send: Callable[[], Awaitable[T]],
+    max_retries: int,
+) -> T:
+    """
+    Send a request once the limiter lets it through. ``send`` must not retry
+    by itself: rate limited requests are retried after the limiter adapted,
+    other retryable failures after the same backoff as the sdk.
+    """
+    retry = 0
+    while True:
+        await limiter.acquire(key, tokens)
+        try:
+            result = await send()
+        except ArkRateLimitError as e:
+            retry_after = parse_retry_after(e.response.headers)
+            await limiter.on_rate_limited(key, retry_after)
+            if retry == max_retries:
+                raise
+            WARN(f"Rate limited by {key}, retrying after {retry_after}s")
+        except Exception as e:
+            if retry == max_retries or not _should_retry(e):
+                raise
+            delay = min(INITIAL_RETRY_DELAY * pow(2.0, retry), MAX_RETRY_DELAY)
+            await asyncio.sleep(delay * (1 - 0.25 * random.random()))
+        else:
+            await limiter.on_success(key)
+            return result
+        retry += 1
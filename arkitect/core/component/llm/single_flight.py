@@ -0,0 +1,205 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import copy
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _Stream(Generic[T]):
+    """
+    Upstream stream read once into a buffer. Every subscriber reads the
+    buffer with its own cursor, so a subscriber joining late still gets the
+    whole stream and a slow one does not hold the others back.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[T] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.started: "asyncio.Future[None]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        # replaced on every change, subscribers wait on the one they last saw
+        self.changed = asyncio.Event()
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def produce(self, fn: Callable[[], Awaitable[AsyncIterator[T]]]) -> None:
+        try:
+            stream = await fn()
+            self.started.set_result(None)
+            async for chunk in stream:
+                self.chunks.append(chunk)
+                self.notify()
+        except asyncio.CancelledError:
+            self.error = asyncio.CancelledError()
+            raise
+        except BaseException as e:
+            self.error = e
+            if not self.started.done():
+                self.started.set_exception(e)
+        finally:
+            self.done = True
+            if not self.started.done():
+                self.started.cancel()
+            self.notify()
+
+    async def subscribe(self) -> AsyncGenerator[T, None]:
+        cursor = 0
+        while True:
+            changed = self.changed
+            while cursor < len(self.chunks):
+                yield self.chunks[cursor]
+                cursor += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+class _Subscription(Generic[T]):
+    """
+    Cursor of one subscriber. It holds its place in the flight from the time
+    ``SingleFlight.stream`` returns it until it is exhausted, closed or
+    garbage collected, so a subscription that is never read does not keep
+    the upstream stream alive.
+    """
+
+    def __init__(self, chunks: AsyncGenerator[T, None], release: Callable[[], None]):
+        self._chunks = chunks
+        self._release: Optional[Callable[[], None]] = release
+
+    def __aiter__(self) -> "_Subscription[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            self._close()
+            raise
+
+    async def aclose(self) -> None:
+        self._close()
+        await self._chunks.aclose()
+
+    def _close(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __del__(self) -> None:
+        self._close()
+
+
+class SingleFlight:
+    """
+    Requests with the same key made while one of them is in flight share its
+    upstream call. Only in-flight calls are shared: a call is forgotten as
+    soon as it completes, so the group does not hold on to any response.
+
+    The upstream call is cancelled once every caller waiting on it left.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call[Any]] = {}
+        self._streams: Dict[str, _Stream[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    async def call(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Result of ``fn``, or of the call in flight for ``key``. Callers other
+        than the first one get a copy, so the result can be modified freely.
+        """
+        flight = self._calls.get(key)
+        leader = flight is None
+        if flight is None:
+            flight = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = flight
+            flight.task.add_done_callback(
+                lambda _: self._forget(self._calls, key, flight)
+            )
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(self._calls, key, flight)
+        return result if leader else copy.deepcopy(result)
+
+    async def stream(
+        self, key: str, fn: Callable[[], Awaitable[AsyncIterator[T]]]
+    ) -> AsyncIterator[T]:
+        """
+        Subscribe to the stream of ``fn``, or to the one in flight for
+        ``key``. Chunks are shared between subscribers and must not be
+        modified. Failures of ``fn`` itself are raised here, failures of the
+        stream are raised to every subscriber once it read the chunks before.
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = _Stream()
+            self._streams[key] = flight
+            flight.task = asyncio.ensure_future(flight.produce(fn))
+            flight.task.add_done_callback(
+                lambda _: self._forget(self._streams, key, flight)
+            )
+        flight.subscribers += 1
+        try:
+            await asyncio.shield(flight.started)
+        except BaseException:
+            self._unsubscribe(key, flight)
+            raise
+        return _Subscription(flight.subscribe(), lambda: self._unsubscribe(key, flight))
+
+    def _unsubscribe(self, key: str, flight: _Stream[Any]) -> None:
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and flight.task and not flight.task.done():
+            flight.task.cancel()
+            self._forget(self._streams, key, flight)
+
+    @staticmethod
+    def _forget(flights: Dict[str, Any], key: str, flight: Any) -> None:
+        # a new flight may have taken the key once this one was cancelled
+        if flights.get(key) is flight:
+            del flights[key]
@@ -14,7 +14,8 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Set, Union
+import weakref
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
 
 from langchain.prompts.chat import BaseChatPromptTemplate
 from langchain_core.messages import (
@@ -51,6 +52,133 @@ def _convert_message_role_to_ark_role(  # type: ignore
         return "tool"
 
 
+def _load_arguments(arguments: str) -> Dict[str, Any]:
+    try:
+        args = json.loads(arguments)
+        if isinstance(args, dict) and all(isinstance(key, str) for key in args.keys()):
+            return args
+        return {}
+    except json.JSONDecodeError:
+        logging.error(f"json decode arguments failed: arguments={arguments}")
+        return {}
+
+
+def _build_message(message: ArkMessage, tool_name: Optional[str]) -> BaseMessage:
+    if message.role == "user":
+        if isinstance(message.content, str):
+            return HumanMessage(content=message.content, name=message.name)
+        return HumanMessage(
+            content=(
+                [
+                    part.model_dump(exclude_none=True, exclude_unset=True)
+                    for part in message.content
+                ]
+                if message.content
+                else []
+            ),
+        )
+    elif message.role == "assistant":
+        content, thought = (message.content or ""), ""
+        if message.tool_calls is not None and isinstance(message.content, str):
+            sep = message.content.rfind("\n")
+            if sep >= 0:
+                content, thought = (
+                    message.content[:sep],
+                    message.content[sep + 1 :],
+                )
+        return AIMessage(
+            content=content,  # type: ignore
+            name=message.name,
+            tool_calls=[
+                ToolCall(
+                    name=tool_call.function.name,
+                    args=(
+                        _load_arguments(tool_call.function.arguments)
+                        if tool_call.function.arguments
+                        else {}
+                    ),
+                    id=tool_call.id,
+                )
+                for tool_call in (message.tool_calls or [])
+            ],
+            additional_kwargs={
+                "choice": {
+                    "message": {
+                        "tool_calls": [
+                            {
+                                "id": tool_call.id,
+                                "type": tool_call.type,
+                                "function": {
+                                    "name": tool_call.function.name,
+                                    "arguments": tool_call.function.arguments,
+                                    "thought": thought,
+                                },
+                            }
+                            for tool_call in (message.tool_calls or [])
+                        ],
+                    }
+                }
+            },
+        )
+    elif message.role == "system":
+        return SystemMessage(
+            content=message.content,  # type: ignore
+        )
+    return FunctionMessage(
+        content=message.content,  # type: ignore
+        name=tool_name,  # type: ignore
+    )
+
+
+class _ConvertedMessage(NamedTuple):
+    ref: "weakref.ReferenceType[ArkMessage]"
+    role: str
+    name: Optional[str]
+    content: Any
+    tool_calls: Any
+    tool_name: Optional[str]
+    message: BaseMessage
+
+
+# langchain messages by id of the ArkMessage they were converted from
+_converted_messages: Dict[int, _ConvertedMessage] = {}
+
+
+def _convert_ark_message(
+    message: ArkMessage, tool_name: Optional[str] = None
+) -> BaseMessage:
+    """
+    Convert a message to langchain, memoized by identity: a message is only
+    converted again if one of its fields was reassigned. The result is
+    shared between calls and must not be modified.
+    """
+    key = id(message)
+    entry = _converted_messages.get(key)
+    if (
+        entry is not None
+        and entry.ref() is message
+        and entry.content is message.content
+        and entry.tool_calls is message.tool_calls
+        and entry.role == message.role
+        and entry.name == message.name
+        and entry.tool_name == tool_name
+    ):
+        return entry.message
+    if entry is None:
+        weakref.finalize(message, _converted_messages.pop, key, None)
+    converted = _build_message(message, tool_name)
+    _converted_messages[key] = _ConvertedMessage(
+        ref=weakref.ref(message),
+        role=message.role,
+        name=message.name,
+        content=message.content,
+        tool_calls=message.tool_calls,
+        tool_name=tool_name,
+        message=converted,
+    )
+    return converted
+
+
 def _convert_ark_messages(chat_messages: List[ArkMessage]) -> List[BaseMessage]:
     messages: List[BaseMessage] = []
     tool_calls: Dict[str, ChatCompletionMessageToolCallParam] = {}
@@ -63,98 +191,16 @@ def _convert_ark_messages(chat_messages: List[ArkMessage]) -> List[BaseMessage]:
                 "be followed by tool messages responding to each 'tool_call_id'.",
             )
 
-        if message.role == "user":
-            if isinstance(message.content, str):
-                messages.append(
-                    HumanMessage(content=message.content, name=message.name)
-                )
-            else:
-                messages.append(
-                    HumanMessage(
-                        content=(
-                            [
-                                part.model_dump(exclude_none=True, exclude_unset=True)
-                                for part in message.content
-                            ]
-                            if message.content
-                            else []
-                        ),
-                    )
-                )
+        if message.role in ("user", "system"):
+            messages.append(_convert_ark_message(message))
 
         elif message.role == "assistant":
             next_tool_ids = set()
+            for tool_call in message.tool_calls or []:
+                tool_calls[tool_call.id] = tool_call
+                next_tool_ids.add(tool_call.id)
+            messages.append(_convert_ark_message(message))
 
-            def load_arguments(arguments: str) -> Dict[str, Any]:
-                try:
-                    args = json.loads(arguments)
-                    if isinstance(args, dict) and all(
-                        isinstance(key, str) for key in args.keys()
-                    ):
-                        return args
-                    return {}
-                except json.JSONDecodeError:
-                    logging.error(
-                        f"json decode arguments failed: arguments={arguments}"
-                    )
-                    return {}
-
-            content, thought = (message.content or ""), ""
-            if message.tool_calls is not None:
-                if isinstance(message.content, str):
-                    sep = message.content.rfind("\n")
-                    if sep >= 0:
-                        content, thought = (
-                            message.content[:sep],
-                            message.content[sep + 1 :],
-                        )
-
-                for tool_call in message.tool_calls:
-                    tool_calls[tool_call.id] = tool_call
-                    next_tool_ids.add(tool_call.id)
-
-            messages.append(
-                AIMessage(
-                    content=content,  # type: ignore
-                    name=message.name,
-                    tool_calls=[
-                        ToolCall(
-                            name=tool_call.function.name,
-                            args=(
-                                load_arguments(tool_call.function.arguments)
-                                if tool_call.function.arguments
-                                else {}
-                            ),
-                            id=tool_call.id,
-                        )
-                        for tool_call in (message.tool_calls or [])
-                    ],
-                    additional_kwargs={
-                        "choice": {
-                            "message": {
-                                "tool_calls": [
-                                    {
-                                        "id": tool_call.id,
-                                        "type": tool_call.type,
-                                        "function": {
-                                            "name": tool_call.function.name,
-                                            "arguments": tool_call.function.arguments,
-                                            "thought": thought,
-                                        },
-                                    }
-                                    for tool_call in (message.tool_calls or [])
-                                ],
-                            }
-                        }
-                    },
-                )
-            )
-        elif message.role == "system":
-            messages.append(
-                SystemMessage(
-                    content=message.content,  # type: ignore
-                )
-            )
         elif message.role == "tool":
             if message.tool_call_id not in tool_calls:
                 raise InvalidParameter(
@@ -170,12 +216,7 @@ def _convert_ark_messages(chat_messages: List[ArkMessage]) -> List[BaseMessage]:
                 f"expect `function`, got {tool_call.type}"
             )
 
-            messages.append(
-                FunctionMessage(
-                    content=message.content,  # type: ignore
-                    name=tool_call.function.name,
-                )
-            )
+            messages.append(_convert_ark_message(message, tool_call.function.name))
 
     if len(next_tool_ids) > 0:
         raise InvalidParameter(
@@ -187,7 +228,8 @@ def _convert_ark_messages(chat_messages: List[ArkMessage]) -> List[BaseMessage]:
     return messages
 
 
-@task()
+# dumping every message to the span would cost more than the formatting
+@task(watch_io=False)
 def format_ark_prompts(
     template: BaseChatPromptTemplate,
     chat_messages: List[ArkMessage],
@@ -197,14 +239,16 @@ def format_ark_prompts(
         messages=_convert_ark_messages(chat_messages), **kwargs
     )
 
-    prompts = [
-        ArkMessage(
-            role=_convert_message_role_to_ark_role(message.type),
-            content=message.content if isinstance(message.content, str) else "",
+    prompts = []
+    for message in messages:
+        role = _convert_message_role_to_ark_role(message.type)
+        content = message.content if isinstance(message.content, str) else ""
+        prompts.append(
+            # role and content are known to be valid, skip the validation
+            ArkMessage.model_construct(role=role, content=content)
+            if role is not None
+            else ArkMessage(role=role, content=content)
         )
-        for message in messages
-    ]
-
     return prompts
 
 
@@ -12,14 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, AsyncIterable, Dict, List
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
 
 from volcenginesdkarkruntime import AsyncArk
 from volcenginesdkarkruntime.resources.chat import AsyncChat
 from volcenginesdkarkruntime.resources.chat.completions import AsyncCompletions
-from volcenginesdkarkruntime.types.chat import ChatCompletionMessageParam
-from volcenginesdkarkruntime.types.chat.chat_completion_message import (
-    ChatCompletionMessage,
+from volcenginesdkarkruntime.types.chat import (
+    ChatCompletionChunk,
+    ChatCompletionMessageParam,
+)
+from volcenginesdkarkruntime.types.chat.chat_completion_chunk import (
+    ChoiceDelta,
 )
 
 from arkitect.core.component.tool.tool_pool import ToolPool
@@ -42,12 +56,26 @@ class _AsyncCompletions(AsyncCompletions):
         model: str,
         messages: List[ChatCompletionMessageParam],
         tool_pool: ToolPool | None = None,
+        extra_tool_schemas: Optional[Sequence[dict[str, Any]]] = None,
+        on_tool_call: Optional[Callable[[Any], None]] = None,
+        coalesce_ms: Optional[float] = None,
+        coalesce_bytes: Optional[int] = None,
         **kwargs: Dict[str, Any],
     ) -> AsyncIterable[BaseEvent]:
+        """
+        ``extra_tool_schemas`` are sent before the tools of ``tool_pool``.
+
+        ``on_tool_call`` is called with each streamed tool call as soon as its
+        arguments are complete, in index order.
+
+        With ``coalesce_ms`` or ``coalesce_bytes``, consecutive content and
+        reasoning deltas are merged into one event per time window or size.
+        """
         parameters = self.parameters.__dict__ if self.parameters is not None else {}
-        if tool_pool:
-            tools = await tool_pool.list_tools()
-            parameters["tools"] = [t.model_dump() for t in tools]
+        if tool_pool or extra_tool_schemas:
+            parameters["tools"] = list(extra_tool_schemas or []) + (
+                await tool_pool.list_tool_schemas() if tool_pool else []
+            )
         resp = await super().create(
             model=model,
             messages=messages,
@@ -57,43 +85,55 @@ class _AsyncCompletions(AsyncCompletions):
         )
 
         async def iterator() -> AsyncIterable[BaseEvent]:
-            final_tool_calls = {}
-            chat_completion_messages = ChatCompletionMessage(
-                role="assistant",
-                content="",
-                reasoning_content="",
-                tool_calls=[],
-            )
-            async for chunk in resp:
+            final_tool_calls: dict[int, Any] = {}
+            # argument fragments per tool call, joined once the call is complete
+            arguments: dict[int, list[str]] = {}
+            completed: set[int] = set()
+            content: list[str] = []
+            reasoning_content: list[str] = []
+
+            def complete(index: int) -> None:
+                completed.add(index)
+                tool_call = final_tool_calls[index]
+                tool_call.function.arguments = "".join(arguments[index])
+                if on_tool_call is not None:
+                    on_tool_call(tool_call)
+
+            chunks: AsyncIterable[ChatCompletionChunk] = resp
+            if coalesce_ms is not None or coalesce_bytes is not None:
+                chunks = coalesce_chunks(resp, coalesce_ms, coalesce_bytes)
+            async for chunk in chunks:
                 if len(chunk.choices) > 0:
-                    if chunk.choices[0].delta.content:
-                        chat_completion_messages.content += chunk.choices[
-                            0
-                        ].delta.content
-                    if chunk.choices[0].delta.reasoning_content:
-                        chat_completion_messages.reasoning_content += chunk.choices[
-                            0
-                        ].delta.reasoning_content
-                    if chunk.choices[0].delta.tool_calls:
-                        for tool_call in chunk.choices[0].delta.tool_calls:
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content.append(delta.content)
+                    if delta.reasoning_content:
+                        reasoning_content.append(delta.reasoning_content)
+                    if delta.tool_calls:
+                        for tool_call in delta.tool_calls:
                             index = tool_call.index
                             if index not in final_tool_calls:
-                                final_tool_calls[index] = tool_call
-                            else:
-                                final_tool_calls[
-                                    index
-                                ].function.arguments += tool_call.function.arguments
-                yield MessageEvent(**chunk.model_dump())
-            chat_completion_messages.tool_calls = [
-                v.model_dump() for v in final_tool_calls.values()
-            ]
+                                # the previous calls will not receive more deltas
+                                for ready in list(final_tool_calls):
+                                    if ready not in completed:
+                                        complete(ready)
+                                # the delta itself is shared with the event
+                                final_tool_calls[index] = tool_call.model_copy(
+                                    deep=True
+                                )
+                                arguments[index] = []
+                            arguments[index].append(tool_call.function.arguments or "")
+                yield to_message_event(chunk)
+            for ready in list(final_tool_calls):
+                if ready not in completed:
+                    complete(ready)
             yield StateUpdateEvent(
                 message_delta=[
                     Message(
-                        content=chat_completion_messages.content,
-                        reasoning_content=chat_completion_messages.reasoning_content,
-                        role=chat_completion_messages.role,
-                        tool_calls=chat_completion_messages.tool_calls,
+                        content="".join(content),
+                        reasoning_content="".join(reasoning_content),
+                        role="assistant",
+                        tool_calls=[v.model_dump() for v in final_tool_calls.values()],
                     )
                 ]
             )
@@ -115,3 +155,121 @@ class _AsyncChat(AsyncChat):
     @property
     def completions(self) -> _AsyncCompletions:
         return _AsyncCompletions(self._client, self._state, self.parameters)
+
+
+# fields that are not part of the chunk keep their defaults
+_MESSAGE_EVENT = MessageEvent.model_construct(
+    id="", choices=[], created=0, model="", object="chat.completion.chunk"
+)
+
+
+def to_message_event(chunk: ChatCompletionChunk) -> MessageEvent:
+    # the chunk was validated by the sdk already, skip dump and revalidation
+    return _MESSAGE_EVENT.model_copy(
+        update={
+            "id": chunk.id,
+            "choices": chunk.choices,
+            "created": chunk.created,
+            "model": chunk.model,
+            "object": chunk.object,
+            "usage": chunk.usage,
+        }
+    )
+
+
+def _text_delta(chunk: ChatCompletionChunk) -> Optional[ChoiceDelta]:
+    """The delta of a chunk carrying only content or reasoning content."""
+    if len(chunk.choices) != 1 or chunk.usage is not None:
+        return None
+    choice = chunk.choices[0]
+    delta = choice.delta
+    if (
+        choice.finish_reason is not None
+        or choice.logprobs is not None
+        or delta.tool_calls
+        or delta.function_call is not None
+        or not (delta.content or delta.reasoning_content)
+    ):
+        return None
+    return delta
+
+
+def _merge_chunks(chunks: List[ChatCompletionChunk]) -> ChatCompletionChunk:
+    if len(chunks) == 1:
+        return chunks[0]
+    first = chunks[0]
+    deltas = [chunk.choices[0].delta for chunk in chunks]
+    content = "".join(d.content for d in deltas if d.content)
+    reasoning_content = "".join(
+        d.reasoning_content for d in deltas if d.reasoning_content
+    )
+    delta = ChoiceDelta.model_construct(
+        role=deltas[0].role,
+        content=content or None,
+        reasoning_content=reasoning_content or None,
+    )
+    return first.model_copy(
+        update={
+            "choices": [first.choices[0].model_copy(update={"delta": delta})],
+        }
+    )
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterable[ChatCompletionChunk],
+    interval_ms: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> AsyncIterator[ChatCompletionChunk]:
+    """
+    Merge consecutive content and reasoning deltas until ``interval_ms``
+    elapsed since the first of them, or ``max_bytes`` were buffered. Any
+    other chunk flushes the buffer and is passed through unchanged.
+    """
+    interval = interval_ms / 1000 if interval_ms is not None else None
+    buffer: List[ChatCompletionChunk] = []
+    size = 0
+    deadline = 0.0
+    iterator = chunks.__aiter__()
+    pending: Optional[asyncio.Future[ChatCompletionChunk]] = None
+    try:
+        while True:
+            if interval is not None and buffer:
+                # wait for the next chunk no longer than the window
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                done, _ = await asyncio.wait(
+                    {pending}, timeout=max(deadline - time.monotonic(), 0)
+                )
+                if not done:
+                    yield _merge_chunks(buffer)
+                    buffer, size = [], 0
+                    continue
+            try:
+                if pending is not None:
+                    chunk = await pending
+                    pending = None
+                else:
+                    chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            delta = _text_delta(chunk)
+            if delta is None or (buffer and delta.role is not None):
+                if buffer:
+                    yield _merge_chunks(buffer)
+                    buffer, size = [], 0
+                if delta is None:
+                    yield chunk
+                    continue
+            if not buffer and interval is not None:
+                deadline = time.monotonic() + interval
+            buffer.append(chunk)
+            size += len((delta.content or "").encode("utf-8"))
+            size += len((delta.reasoning_content or "").encode("utf-8"))
+            if max_bytes is not None and size >= max_bytes:
+                yield _merge_chunks(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield _merge_chunks(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -12,8 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import abc
+import asyncio
 from typing import Any, AsyncIterable, Optional, Union
 
+from arkitect.core.component.approval import (
+    ApprovalRequest,
+    BaseApprovalBroker,
+    make_approval_id,
+)
 from arkitect.types.responses.event import (
     BaseEvent,
     HookInterruptEvent,
@@ -77,6 +83,13 @@ Hook = Union[
 
 
 class ApprovalHook(PreToolCallHook):
+    """
+    Ask for approval before each tool call, see the context ApprovalHook.
+    """
+
+    def __init__(self, broker: Optional[BaseApprovalBroker] = None) -> None:
+        self.broker = broker
+
     async def pre_tool_call(
         self,
         name: str,
@@ -88,11 +101,44 @@ class ApprovalHook(PreToolCallHook):
         last_message = state.events[-1].message_delta
         if not last_message or len(last_message) == 0:
             return
-        if last_message[-1].tool_calls:
+        tool_calls = last_message[-1].tool_calls
+        if not tool_calls:
             return
 
+        if self.broker is None:
+            approved = await self._console_approval(tool_calls)
+        else:
+            tool_call_id = next(
+                (
+                    tool_call.id
+                    for tool_call in tool_calls
+                    if tool_call.function.name == name
+                    and tool_call.function.arguments == arguments
+                ),
+                "",
+            )
+            approved = await self.broker.request_approval(
+                ApprovalRequest(
+                    approval_id=make_approval_id(
+                        state.events[-1].session_id, tool_call_id
+                    ),
+                    tool_name=name,
+                    arguments=arguments,
+                )
+            )
+        if not approved:
+            yield HookInterruptEvent(
+                life_cycle="tool_call",
+                reason="approval failed",
+                details={
+                    "tool_name": name,
+                    "tool_call_param": arguments,
+                },
+            )
+
+    async def _console_approval(self, tool_calls: Any) -> bool:
         formated_output = []
-        for tool_call in last_message.tool_calls:  # type: ignore
+        for tool_call in tool_calls:
             tool_name = tool_call.function.name
             tool_call_param = tool_call.function.arguments
             formated_output.append(
@@ -100,15 +146,5 @@ class ApprovalHook(PreToolCallHook):
             )
         print("tool call parameters:")
         print("".join(formated_output))
-        y_or_n = input("input Y to approve\n")
-        if y_or_n == "Y":
-            return
-        else:
-            yield HookInterruptEvent(
-                life_cycle="tool_call",
-                reason="approval failed",
-                details={
-                    "tool_name": tool_name,
-                    "tool_call_param": tool_call_param,
-                },
-            )
+        y_or_n = await asyncio.to_thread(input, "input Y to approve\n")
+        return y_or_n == "Y"
@@ -12,21 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
-from typing import Any, AsyncIterable, Callable, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, AsyncIterable, Callable, Dict, List, Mapping, Optional
 
+from mcp.server.fastmcp.tools import Tool as FastMCPTool
+from mcp.types import CallToolResult, TextContent
+from mcp.types import Tool as MCPTool
 from volcenginesdkarkruntime import AsyncArk
 from volcenginesdkarkruntime.types.chat import ChatCompletionMessageParam
 
 from arkitect.core.client import default_ark_client
 from arkitect.core.component.agent.base_agent import BaseAgent
+from arkitect.core.component.context.tool_executor import (
+    ToolCallExecutor,
+    ToolResult,
+)
 from arkitect.core.component.tool.mcp_client import MCPClient
 from arkitect.core.component.tool.tool_pool import build_tool_pool
 from arkitect.core.component.tool.utils import (
     convert_to_chat_completion_content_part_param,
+    mcp_to_chat_completion_tool,
 )
 from arkitect.telemetry.trace import task
-from arkitect.types.llm.model import ArkChatParameters, Message
+from arkitect.types.llm.model import ArkChatParameters, ChatCompletionTool, Message
 from arkitect.types.responses.event import (
     BaseEvent,
     StateUpdateEvent,
@@ -48,13 +58,19 @@ class _AsyncCompletionsEventStream:
     def __init__(self, ctx: "LLMEventStream"):
         self._ctx = ctx
         self.model = ctx.model
+        # tool calls started while the model was still streaming, by id
+        self._dispatched: dict[str, tuple[str, asyncio.Task[list[ToolResult]]]] = {}
+        self._dispatch_stopped = False
 
     async def create(
         self,
         messages: List[ChatCompletionMessageParam],
         **kwargs: Dict[str, Any],
     ) -> AsyncIterable[BaseEvent]:
-        async def iterator(
+        # sub_agents may have been changed in place since the last run
+        self._ctx.sub_agents = self._ctx.sub_agents
+
+        async def turns(
             messages: List[ChatCompletionMessageParam],
         ) -> AsyncIterable[BaseEvent]:
             yield StateUpdateEvent(message_delta=[Message(**m) for m in messages])
@@ -68,10 +84,19 @@ class _AsyncCompletionsEventStream:
                         self._ctx.state
                     ):
                         yield event
+                self._cancel_dispatched()
                 resp = await self._ctx.chat_service.completions.create_event_stream(
                     model=self.model,
                     messages=self._ctx.build_chat_message(),
                     tool_pool=self._ctx.tool_pool,
+                    extra_tool_schemas=(
+                        self._ctx.routing.tool_schemas if self._ctx.routing else None
+                    ),
+                    on_tool_call=(
+                        self.dispatch_tool_call if self.can_dispatch_early() else None
+                    ),
+                    coalesce_ms=self._ctx.coalesce_ms,
+                    coalesce_bytes=self._ctx.coalesce_bytes,
                     **kwargs,
                 )
                 assert isinstance(resp, AsyncIterable)
@@ -94,21 +119,101 @@ class _AsyncCompletionsEventStream:
                 else:
                     break
 
+        async def iterator(
+            messages: List[ChatCompletionMessageParam],
+        ) -> AsyncIterable[BaseEvent]:
+            try:
+                async for event in turns(messages):
+                    yield event
+            finally:
+                # tools started early whose results will never be awaited
+                self._cancel_dispatched()
+
         return iterator(messages)
 
+    def can_dispatch_early(self) -> bool:
+        """
+        Tools may only start before the turn is complete when no hook can
+        still veto or rewrite the calls.
+        """
+        return (
+            self._ctx.early_tool_dispatch
+            and self._ctx.tool_pool is not None
+            and self._ctx.pre_tool_call_hook is None
+            and self._ctx.post_llm_call_hook is None
+        )
+
+    def dispatch_tool_call(self, tool_call: Any) -> None:
+        """Start a streamed tool call whose arguments are complete."""
+        name = tool_call.function.name
+        if tool_call.index == 0:
+            self._dispatch_stopped = False
+        if self._dispatch_stopped:
+            return
+        if self.is_agent_call(name):
+            # an agent call as first call replaces the whole turn
+            self._dispatch_stopped = tool_call.index == 0
+            return
+        if self._ctx.tool_executor.is_serial(name):
+            # serial tools must not overlap with any other call
+            self._dispatch_stopped = True
+            return
+        arguments = tool_call.function.arguments
+        self._dispatched[tool_call.id] = (
+            arguments,
+            asyncio.create_task(
+                self._ctx.tool_executor.run([(name, arguments)], self.execute_tool)
+            ),
+        )
+
+    def _cancel_dispatched(self) -> None:
+        for _, dispatched in self._dispatched.values():
+            dispatched.cancel()
+        self._dispatched = {}
+
     async def execute_tool(
         self, tool_name: str, parameters: str
     ) -> tuple[Any | None, Exception | None]:
         tool_resp, tool_exception = None, None
         try:
-            tool_resp = await self._ctx.tool_pool.execute_tool(  # type: ignore
-                tool_name=tool_name, parameters=json.loads(parameters)
-            )
-            tool_resp = convert_to_chat_completion_content_part_param(tool_resp)
+            routing = self._ctx.routing
+            result: CallToolResult
+            if routing is not None and tool_name == HANDOFF_TOOL_NAME:
+                # the handoff tool is not part of the tool pool
+                result = CallToolResult(
+                    content=[
+                        TextContent(
+                            type="text",
+                            text=routing.handoff(**json.loads(parameters)),
+                        )
+                    ],
+                    isError=False,
+                )
+            else:
+                result = await self._ctx.tool_pool.execute_tool(  # type: ignore
+                    tool_name=tool_name, parameters=json.loads(parameters)
+                )
+            tool_resp = convert_to_chat_completion_content_part_param(result)
         except Exception as e:
             tool_exception = e
         return tool_resp, tool_exception
 
+    async def _run_tool(
+        self, tool_call_id: str, tool_name: str, arguments: str
+    ) -> ToolResult:
+        dispatched_arguments, dispatched = self._dispatched.pop(
+            tool_call_id, ("", None)
+        )
+        if dispatched is not None and dispatched_arguments == arguments:
+            return (await dispatched)[0]
+        if dispatched is not None:
+            dispatched.cancel()
+        return (
+            await self._ctx.tool_executor.run(
+                [(tool_name, arguments)], self.execute_tool
+            )
+        )[0]
+
     @task()
     def need_tool_call(self) -> bool:
         last_message = self._ctx.get_latest_message(role=None)
@@ -138,7 +243,9 @@ class _AsyncCompletionsEventStream:
                 tool_name=tool_name,
                 tool_arguments=updated_arguments,
             )
-            resp, exceptions = await self.execute_tool(tool_name, updated_arguments)
+            resp, exceptions = await self._run_tool(
+                tool_call.id, tool_name, updated_arguments
+            )
             yield ToolCompletedEvent(
                 tool_call_id=tool_call.id,
                 tool_name=tool_name,
@@ -171,13 +278,15 @@ class _AsyncCompletionsEventStream:
     def need_agent_call(self) -> bool:
         last_message = self._ctx.get_latest_message(role=None)
         if last_message is not None and last_message.tool_calls:
-            if "handoff" in last_message.tool_calls[0].function.name:
-                return True
-            # TODO: Hack due to model performance
-            elif self.get_agent(last_message.tool_calls[0].function.name):
-                return True
+            return self.is_agent_call(last_message.tool_calls[0].function.name)
         return False
 
+    def is_agent_call(self, tool_name: str) -> bool:
+        routing = self._ctx.routing
+        if routing is None:
+            return HANDOFF_TOOL_NAME in tool_name
+        return routing.is_agent_call(tool_name)
+
     async def agent_call_stream(self) -> AsyncIterable[BaseEvent]:
         tool_calls = self._ctx.get_latest_message(role=None).tool_calls  # type: ignore
         agent_call = tool_calls[0]  # type: ignore
@@ -206,12 +315,9 @@ class _AsyncCompletionsEventStream:
 
     @task()
     def get_agent(self, agent_name: str) -> BaseAgent | None:
-        if self._ctx.sub_agents is None:
+        if self._ctx.routing is None:
             return None
-        for agent in self._ctx.sub_agents:
-            if agent.name == agent_name:
-                return agent
-        return None
+        return self._ctx.routing.get_agent(agent_name)
 
 
 def build_handoff(agents: list[BaseAgent]) -> Callable:
@@ -238,6 +344,65 @@ def build_handoff(agents: list[BaseAgent]) -> Callable:
     return handoff
 
 
+HANDOFF_TOOL_NAME = "handoff"
+
+
+class AgentRoutingTable:
+    """
+    Immutable routing of tool calls to sub-agents, with the handoff tool
+    serialized once. A stream keeps the table of its sub-agents until they
+    change, see ``LLMEventStream.sub_agents``.
+    """
+
+    def __init__(self, agents: list[BaseAgent]) -> None:
+        self.key = _routing_key(agents)
+        routes: dict[str, BaseAgent] = {}
+        for agent in agents:
+            # the first agent wins, like the linear search did
+            routes.setdefault(agent.name, agent)
+        self.agents: Mapping[str, BaseAgent] = MappingProxyType(routes)
+        self.handoff = build_handoff(agents)
+        self.handoff_tool: ChatCompletionTool = mcp_to_chat_completion_tool(
+            _to_mcp_tool(self.handoff)
+        )
+        self.tool_schemas: tuple[dict[str, Any], ...] = (
+            self.handoff_tool.model_dump(),
+        )
+
+    def get_agent(self, agent_name: str) -> BaseAgent | None:
+        return self.agents.get(agent_name)
+
+    def is_agent_call(self, tool_name: str) -> bool:
+        # TODO: agent names as tool names is a hack due to model performance
+        return HANDOFF_TOOL_NAME in tool_name or tool_name in self.agents
+
+
+def _to_mcp_tool(fn: Callable) -> MCPTool:
+    tool = FastMCPTool.from_function(fn)
+    return MCPTool(
+        name=tool.name, description=tool.description, inputSchema=tool.parameters
+    )
+
+
+def _routing_key(agents: list[BaseAgent]) -> tuple:
+    # the table holds the agents, so their ids are not reused while it lives
+    return tuple((id(agent), agent.name, agent.description) for agent in agents)
+
+
+def get_routing_table(
+    agents: list[BaseAgent] | None, table: AgentRoutingTable | None = None
+) -> AgentRoutingTable | None:
+    """
+    The routing table of ``agents``. ``table`` is reused unless an agent was
+    added, removed or renamed since it was built.
+    """
+    if not agents:
+        return None
+    if table is not None and table.key == _routing_key(agents):
+        return table
+    return AgentRoutingTable(agents)
+
+
 class LLMEventStream:
     def __init__(
         self,
@@ -254,6 +419,10 @@ class LLMEventStream:
         pre_llm_call_hook: PreLLMCallHook | None = None,
         post_llm_call_hook: PostLLMCallHook | None = None,
         instruction: str | None = None,
+        tool_executor: Optional[ToolCallExecutor] = None,
+        early_tool_dispatch: bool = False,
+        coalesce_ms: Optional[float] = None,
+        coalesce_bytes: Optional[int] = None,
     ):
         self.model = model
         self.agent_name = agent_name
@@ -263,18 +432,32 @@ class LLMEventStream:
         self.chat_service = _AsyncChat(
             client=self.client, state=self.state, parameters=self.parameters
         )
+        self.routing: AgentRoutingTable | None = None
         self.sub_agents = sub_agents
-        full_tools: list[MCPClient | Callable] = []
-        if self.sub_agents and len(self.sub_agents) > 0:
-            full_tools = [build_handoff(self.sub_agents)]
-        if tools and len(tools) > 0:
-            full_tools.extend(tools)
-        self.tool_pool = build_tool_pool(full_tools)
+        self.tool_pool = build_tool_pool(list(tools) if tools else [])
         self.pre_tool_call_hook: PreToolCallHook | None = pre_tool_call_hook
         self.post_tool_call_hook: PostToolCallHook | None = post_tool_call_hook
         self.pre_llm_call_hook: PreLLMCallHook | None = pre_llm_call_hook
         self.post_llm_call_hook: PostLLMCallHook | None = post_llm_call_hook
         self.instruction = instruction
+        self.tool_executor = (
+            tool_executor if tool_executor is not None else ToolCallExecutor()
+        )
+        # opt-in: start tools whose arguments are complete while the model
+        # is still streaming the rest of the turn
+        self.early_tool_dispatch = early_tool_dispatch
+        # merge text deltas into fewer message events, None streams every chunk
+        self.coalesce_ms = coalesce_ms
+        self.coalesce_bytes = coalesce_bytes
+
+    @property
+    def sub_agents(self) -> list[BaseAgent] | None:
+        return self._sub_agents
+
+    @sub_agents.setter
+    def sub_agents(self, sub_agents: list[BaseAgent] | None) -> None:
+        self._sub_agents = sub_agents
+        self.routing = get_routing_table(sub_agents, self.routing)
 
     async def init(self) -> None:
         if self.tool_pool:
@@ -291,7 +474,8 @@ class LLMEventStream:
                         return m
         return None
 
-    @task()
+    # dumping the whole history to the span would cost O(events) per turn
+    @task(watch_io=False)
     def build_chat_message(self) -> list[ChatCompletionMessageParam]:
         if self.instruction:
             messages = [
@@ -302,9 +486,18 @@ class LLMEventStream:
             ]
         else:
             messages = []
-        for e in self.state.events:
-            if m := build_messages(e, self.agent_name):
-                messages.extend(m)
+        # only convert the events appended since the previous turn
+        events = self.state.events
+        cache = self.state.get_message_cache(self.agent_name)
+        if not cache.is_valid(events):
+            cache.reset(events)
+        for i in range(cache.cursor, len(events)):
+            if m := build_messages(events[i], self.agent_name):
+                cache.messages.extend(m)
+        cache.cursor = len(events)
+        cache.last_event = events[-1] if events else None
+        # copies, so that callers editing a message do not edit later turns
+        messages.extend(dict(m) for m in cache.messages)
         return messages
 
     @property
@@ -12,13 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from arkitect.types.responses.event import StateUpdateEvent
 
 
+class MessageCache:
+    """
+    Chat messages converted from the first ``cursor`` events of a state,
+    as seen by one agent.
+    """
+
+    def __init__(self) -> None:
+        self.reset(None)
+
+    def reset(self, events: Optional[List[StateUpdateEvent]]) -> None:
+        self.events = events
+        self.cursor = 0
+        self.last_event: Optional[StateUpdateEvent] = None
+        self.messages: List[Any] = []
+
+    def is_valid(self, events: List[StateUpdateEvent]) -> bool:
+        """Whether ``events`` still starts with the converted events."""
+        return (
+            self.events is events
+            and self.cursor <= len(events)
+            and (self.cursor == 0 or events[self.cursor - 1] is self.last_event)
+        )
+
+
 class State(BaseModel):
     details: dict = {}
     events: List[StateUpdateEvent] = Field(default_factory=list)
+
+    # converted chat messages per agent name
+    _message_caches: Dict[str, MessageCache] = PrivateAttr(default_factory=dict)
+
+    def get_message_cache(self, agent_name: str) -> MessageCache:
+        return self._message_caches.setdefault(agent_name, MessageCache())
+
+    def invalidate_message_cache(self) -> None:
+        """Call after editing events in place, appending is tracked."""
+        self._message_caches.clear()
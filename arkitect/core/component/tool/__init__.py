@@ -14,16 +14,21 @@
 
 from .builder import build_mcp_clients_from_config
 from .builtin_tools import calculator, link_reader
-from .mcp_client import MCPClient
+from .mcp_client import ConnectionMetrics, ConnectionState, MCPClient
 from .mcp_server import ArkFastMCP
+from .registry import MCPServerRegistry, mcp_server_registry
 from .tool_pool import ToolPool, build_tool_pool
 
 __all__ = [
     "MCPClient",
+    "ConnectionMetrics",
+    "ConnectionState",
     "ToolPool",
     "build_tool_pool",
     "build_mcp_clients_from_config",
     "ArkFastMCP",
+    "MCPServerRegistry",
+    "mcp_server_registry",
     "link_reader",
     "calculator",
 ]
@@ -24,13 +24,21 @@ import anyio
 from anyio.abc import Process
 
 from arkitect.core.component.tool.mcp_client import MCPClient
+from arkitect.core.component.tool.registry import MCPServerRegistry
 from mcp.client.stdio import get_default_environment
 
 
 def build_mcp_clients_from_config(  # type: ignore
     config_file: str,
+    registry: MCPServerRegistry | None = None,
     **kwargs,
 ) -> tuple[dict[str, MCPClient], Callable]:
+    """
+    Clients of the servers of ``config_file`` and the coroutine function
+    closing them. With a ``registry``, such as ``mcp_server_registry``, the
+    clients are shared with every other caller using the same servers, and
+    cleaning up gives them back to it instead.
+    """
     # https://www.librechat.ai/docs/configuration/librechat_yaml/object_structure/mcp_servers#servername
     # check file exist
     if not os.path.exists(config_file):
@@ -51,18 +59,16 @@ def build_mcp_clients_from_config(  # type: ignore
         transport = mcp_servers_config[server_name].get("type", None)
         if port is not None:
             logger.info("Starting local SSE MCP server")
-            client = MCPClient(
+            client_kwargs = dict(
                 name=server_name,
                 server_url=f"http://localhost:{port}/sse",
-                exit_stack=exit_stack,
                 **kwargs,
             )
         else:
             logger.info("Starting server")
-            client = MCPClient(
+            client_kwargs = dict(
                 name=server_name,
                 server_url=server_url,
-                exit_stack=exit_stack,
                 command=command,
                 arguments=args,
                 env=env,
@@ -70,9 +76,21 @@ def build_mcp_clients_from_config(  # type: ignore
                 transport=transport,
                 **kwargs,
             )
-        mcp_clients[server_name] = client
+        if registry is not None:
+            try:
+                mcp_clients[server_name] = registry.acquire(**client_kwargs)
+            except Exception:
+                for client in mcp_clients.values():
+                    registry.release(client)
+                raise
+        else:
+            mcp_clients[server_name] = MCPClient(exit_stack=exit_stack, **client_kwargs)
 
     async def cleanup() -> None:
+        if registry is not None:
+            for client in mcp_clients.values():
+                registry.release(client)
+            return
         try:
             await exit_stack.aclose()
         except asyncio.CancelledError as e:
@@ -12,11 +12,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
+import inspect
 import logging
+import random
 import sys
-from contextlib import AsyncExitStack
+import time
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any, Dict, TextIO
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    TextIO,
+    TypeVar,
+)
+
+import anyio
+import httpx
 
 from arkitect.core.component.tool.utils import (
     mcp_to_chat_completion_tool,
@@ -32,12 +50,104 @@ from mcp import (
 from mcp.client.sse import sse_client
 from mcp.client.stdio import get_default_environment
 from mcp.client.streamable_http import streamablehttp_client
-from mcp.types import CallToolResult
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import RequestResponder
+from mcp.types import (
+    CallToolResult,
+    ClientResult,
+    ErrorData,
+    JSONRPCError,
+    ServerNotification,
+    ServerRequest,
+    ToolListChangedNotification,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# error of the requests in flight when the connection closed, as in later
+# versions of mcp
+CONNECTION_CLOSED = -32000
+
+# failures to send a request, which never reached the server
+_NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class ConnectionState(str, Enum):
+    NEW = "new"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    DISCONNECTED = "disconnected"
+    CLOSED = "closed"
+
+
+@dataclass
+class ConnectionMetrics:
+    state: ConnectionState = ConnectionState.NEW
+    connects: int = 0
+    reconnects: int = 0
+    reconnect_failures: int = 0
+    # connections found broken
+    disconnects: int = 0
+    replayed_calls: int = 0
+    pings: int = 0
+    ping_failures: int = 0
+    in_flight: int = 0
+
+
+class _ClientSession(ClientSession):
+    """Session failing its pending requests as soon as the connection closes."""
+
+    def __init__(self, *args: Any, on_closed: Callable[[], None], **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._on_closed = on_closed
+
+    async def _receive_loop(self) -> None:
+        try:
+            await super()._receive_loop()
+        finally:
+            for request_id, stream in list(self._response_streams.items()):
+                error = ErrorData(code=CONNECTION_CLOSED, message="Connection closed")
+                with suppress(anyio.WouldBlock, *_NOT_SENT):
+                    stream.send_nowait(
+                        JSONRPCError(jsonrpc="2.0", id=request_id, error=error)
+                    )
+            self._on_closed()
+
+
+class _Connection:
+    """
+    Sessions to a server, opened and closed by a task of their own: the
+    transports are anyio task groups, which must be exited by the task that
+    entered them, while a connection may be replaced from any task.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: list[ClientSession] = []
+        # idle sessions, in session pool mode
+        self.idle: asyncio.Queue[ClientSession] | None = None
+        self.broken = asyncio.Event()
+        self.closing = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
 
 class MCPClient:
+    """
+    Requests share one session, up to ``max_in_flight`` of them at a time.
+    Servers that cannot serve concurrent requests get a pool of
+    ``session_pool_size`` sessions instead, each serving one request at a time.
+
+    A broken connection, found by a failed request, the server closing it or
+    a failed ping every ``ping_interval`` seconds while idle, is reconnected
+    up to ``reconnect_attempts`` times with exponential backoff and jitter.
+    Requests that never reached the server are sent again on the new
+    connection; calls in flight are only if their tool is in
+    ``idempotent_tools``.
+    """
+
     def __init__(
         self,
         name: str | None = None,
@@ -51,6 +161,14 @@ class MCPClient:
         exit_stack: AsyncExitStack | None = None,
         transport: str | None = None,
         errlog: TextIO = sys.stderr,
+        max_in_flight: int = 32,
+        session_pool_size: int | None = None,
+        reconnect_attempts: int = 5,
+        reconnect_backoff: float = 0.5,
+        max_reconnect_backoff: float = 10,
+        ping_interval: float | None = None,
+        ping_timeout: float = 5,
+        idempotent_tools: Iterable[str] = (),
     ) -> None:
         self.command = command
         self.arguments = arguments
@@ -61,6 +179,15 @@ class MCPClient:
         self.sse_read_timeout = sse_read_timeout
         self.transport = transport
         self.errlog = errlog
+        self.max_in_flight = max_in_flight
+        self.session_pool_size = session_pool_size
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.max_reconnect_backoff = max_reconnect_backoff
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.idempotent_tools = set(idempotent_tools)
+        self.metrics = ConnectionMetrics()
 
         # Initialize session and client objects
         self.session: ClientSession = None  # type: ignore
@@ -68,7 +195,19 @@ class MCPClient:
         self.tools: Dict[str, Tool] = {}
         self._mcp_server_name: str = name if name is not None else ""
         self._chat_completion_tools: dict[str, ChatCompletionTool] = {}
+        # only held to connect, never around a request
         self._lock = asyncio.Lock()
+        self._refresh_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._connection: _Connection | None = None
+        self._reconnect_task: asyncio.Task[None] | None = None
+        # set when the server notifies tools/list_changed
+        self._tools_stale: bool = False
+        # held weakly for bound methods, so that a tool pool sharing this
+        # client with others is not kept alive by it
+        self._tools_changed_callbacks: list[
+            Callable[[], Callable[[], None] | None]
+        ] = []
 
     async def connect_to_server(
         self,
@@ -77,22 +216,121 @@ class MCPClient:
         if self.session is not None:
             logger.warning("MCP client is already connected to server")
             return
-        # Store the context managers so they stay alive
         if self.command is not None and self.server_url is not None:
             raise ValueError("You should set either command or server_url")
+        if self.server_url is None and self.command is None:
+            raise ValueError("You should set either command or server_url")
+        await self._open_connection()
+        # the connection is closed along with the exit stack
+        self.exit_stack.push_async_callback(self._close)
+
+    async def _open_connection(self) -> None:
+        connection = _Connection()
+        # not pinged while initializing
+        connection.in_flight += 1
+        ready = asyncio.get_running_loop().create_future()
+        connection.task = asyncio.ensure_future(self._run_connection(connection, ready))
+        try:
+            await ready
+            self._connection = connection
+            self.session = connection.sessions[0]
+            # Initialize
+            await self._init()
+        except BaseException:
+            connection.closing.set()
+            raise
+        finally:
+            connection.in_flight -= 1
+            connection.last_used = time.monotonic()
+        self.metrics.connects += 1
+        self.metrics.state = ConnectionState.CONNECTED
+
+    async def _run_connection(
+        self, connection: _Connection, ready: "asyncio.Future[None]"
+    ) -> None:
+        try:
+            async with AsyncExitStack() as exit_stack:
+                for i in range(self.session_pool_size or 1):
+                    session = await self._open_session(exit_stack, connection)
+                    # the first session is initialized by _init
+                    if i > 0:
+                        await session.initialize()
+                    connection.sessions.append(session)
+                if self.session_pool_size is not None:
+                    connection.idle = asyncio.Queue()
+                    for session in connection.sessions:
+                        connection.idle.put_nowait(session)
+                ready.set_result(None)
+                await self._supervise(connection)
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                # a broken transport rarely closes cleanly
+                logger.debug("Error while closing connection: %s", e)
+        finally:
+            connection.broken.set()
+
+    async def _supervise(self, connection: _Connection) -> None:
+        """Wait for the connection to be closed, pinging it while idle."""
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(connection.closing.wait(), self.ping_interval)
+                return
+            idle = time.monotonic() - connection.last_used
+            if (
+                connection.broken.is_set()
+                or connection.in_flight
+                or idle < self.ping_interval  # type: ignore
+            ):
+                continue
+            for session in connection.sessions:
+                if not await self._ping(session):
+                    self._on_broken(connection)
+                    break
+
+    async def _ping(self, session: ClientSession) -> bool:
+        self.metrics.pings += 1
+        try:
+            await asyncio.wait_for(session.send_ping(), self.ping_timeout)
+            return True
+        except Exception as e:
+            logger.warning("Ping to MCP server %s failed: %r", self.name, e)
+            self.metrics.ping_failures += 1
+            return False
+
+    def _on_broken(self, connection: _Connection) -> None:
+        if connection.closing.is_set() or connection.broken.is_set():
+            return
+        connection.broken.set()
+        self.metrics.disconnects += 1
+        if connection is not self._connection:
+            return
+        logger.warning("Connection to MCP server %s is broken", self.name)
+        self.metrics.state = ConnectionState.DISCONNECTED
+        # reconnect right away rather than on the next request
+        if self.reconnect_attempts and (
+            self._reconnect_task is None or self._reconnect_task.done()
+        ):
+            self._reconnect_task = asyncio.ensure_future(self._ensure_connected())
+            self._reconnect_task.add_done_callback(
+                lambda t: t.cancelled() or t.exception()
+            )
+
+    async def _open_session(
+        self, exit_stack: AsyncExitStack, connection: _Connection
+    ) -> ClientSession:
         if self.server_url is not None:
             if self.transport == "streamable-http":
-                await self._connect_to_streamablehttp_server()
-            else:
-                await self._connect_to_sse_server()
-        elif self.command is not None:
-            await self._connect_to_stdio_server()
-        else:
-            raise ValueError("You should set either command or server_url")
-        # Initialize
-        await self._init()
+                return await self._connect_to_streamablehttp_server(
+                    exit_stack, connection
+                )
+            return await self._connect_to_sse_server(exit_stack, connection)
+        return await self._connect_to_stdio_server(exit_stack, connection)
 
-    async def _connect_to_stdio_server(self) -> None:
+    async def _connect_to_stdio_server(
+        self, exit_stack: AsyncExitStack, connection: _Connection
+    ) -> ClientSession:
         """Connect to an MCP server"""
         is_python = (
             self.command == "uvx" or self.command == "python" or self.command == "uv"
@@ -110,24 +348,25 @@ class MCPClient:
             env=envs,  # type: ignore
         )
 
-        stdio_transport = await self.exit_stack.enter_async_context(
+        stdio_transport = await exit_stack.enter_async_context(
             stdio_client(server_params, self.errlog)
         )
         stdio_read, stdio_write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(
+        return await exit_stack.enter_async_context(
+            _ClientSession(
                 stdio_read,
                 stdio_write,
                 read_timeout_seconds=timedelta(seconds=self.timeout),
+                message_handler=self._handle_message,
+                on_closed=lambda: self._on_broken(connection),
             )
         )
 
     async def _connect_to_sse_server(
-        self,
-    ) -> None:
+        self, exit_stack: AsyncExitStack, connection: _Connection
+    ) -> ClientSession:
         """Connect to an MCP server running with SSE transport"""
-        # Store the context managers so they stay alive
-        streams = await self.exit_stack.enter_async_context(
+        streams = await exit_stack.enter_async_context(
             sse_client(  # type: ignore
                 url=self.server_url,  # type: ignore
                 headers=self.headers,  # type: ignore
@@ -135,16 +374,22 @@ class MCPClient:
                 sse_read_timeout=self.sse_read_timeout,
             )
         )
+        read, write = streams
 
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(*streams)
+        return await exit_stack.enter_async_context(
+            _ClientSession(
+                read,
+                write,
+                message_handler=self._handle_message,
+                on_closed=lambda: self._on_broken(connection),
+            )
         )
 
     async def _connect_to_streamablehttp_server(
-        self,
-    ) -> None:
+        self, exit_stack: AsyncExitStack, connection: _Connection
+    ) -> ClientSession:
         """Connect to an MCP server running with streamable http transport"""
-        streams = await self.exit_stack.enter_async_context(
+        streams = await exit_stack.enter_async_context(
             streamablehttp_client(
                 url=self.server_url,  # type: ignore
                 headers=self.headers,
@@ -155,8 +400,13 @@ class MCPClient:
 
         read, write, _ = streams
 
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(read, write)
+        return await exit_stack.enter_async_context(
+            _ClientSession(
+                read,
+                write,
+                message_handler=self._handle_message,
+                on_closed=lambda: self._on_broken(connection),
+            )
         )
 
     async def _init(self) -> None:
@@ -178,6 +428,178 @@ class MCPClient:
             self.name if self.name != "" else init_result.serverInfo.name
         )
 
+    def add_tools_changed_callback(self, callback: Callable[[], None]) -> None:
+        ref: Callable[[], Callable[[], None] | None]
+        if inspect.ismethod(callback):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback  # noqa: E731
+        self._tools_changed_callbacks = [
+            r for r in self._tools_changed_callbacks if r() is not None
+        ] + [ref]
+
+    def remove_tools_changed_callback(self, callback: Callable[[], None]) -> None:
+        self._tools_changed_callbacks = [
+            r for r in self._tools_changed_callbacks if r() not in (None, callback)
+        ]
+
+    def _notify_tools_changed(self) -> None:
+        for ref in list(self._tools_changed_callbacks):
+            callback = ref()
+            if callback is not None:
+                callback()
+
+    async def _handle_message(
+        self,
+        message: RequestResponder[ServerRequest, ClientResult]
+        | ServerNotification
+        | Exception,
+    ) -> None:
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            logger.info("Tool list of %s changed", self.name)
+            self._tools_stale = True
+            self._notify_tools_changed()
+
+    async def _ensure_connected(self) -> None:
+        connection = self._connection
+        # the session is set before it is initialized
+        if (
+            self.session is not None
+            and (connection is None or not connection.broken.is_set())
+            and not self._lock.locked()
+        ):
+            return
+        async with self._lock:
+            connection = self._connection
+            if self.metrics.state == ConnectionState.CLOSED:
+                raise ConnectionError(f"MCP client {self.name} is closed")
+            if self.session is None:
+                logger.warning(
+                    "MCP client is not connected to server yet. Connecting..."
+                )
+                await self.connect_to_server()
+            elif connection is not None and connection.broken.is_set():
+                await self._reconnect(connection)
+
+    async def _reconnect(self, broken: _Connection) -> None:
+        broken.closing.set()
+        if not self.reconnect_attempts:
+            raise ConnectionError(f"Connection to MCP server {self.name} is broken")
+        self.metrics.state = ConnectionState.RECONNECTING
+        error: Exception | None = None
+        for attempt in range(self.reconnect_attempts):
+            if attempt > 0:
+                backoff = min(
+                    self.reconnect_backoff * 2 ** (attempt - 1),
+                    self.max_reconnect_backoff,
+                )
+                await asyncio.sleep(backoff * random.uniform(0.5, 1))
+            try:
+                await self._open_connection()
+            except Exception as e:
+                logger.warning("Failed to reconnect to MCP server %s: %s", self.name, e)
+                self.metrics.reconnect_failures += 1
+                error = e
+                continue
+            self.metrics.reconnects += 1
+            logger.info("Reconnected to MCP server %s", self.name)
+            # the server may have come back with other tools
+            self._notify_tools_changed()
+            return
+        self.metrics.state = ConnectionState.DISCONNECTED
+        raise ConnectionError(
+            f"Failed to reconnect to MCP server {self.name}"
+        ) from error
+
+    async def _close(self) -> None:
+        self.metrics.state = ConnectionState.CLOSED
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+        connection = self._connection
+        if connection is not None and connection.task is not None:
+            connection.closing.set()
+            await asyncio.wait([connection.task])
+
+    @asynccontextmanager
+    async def _acquire_session(
+        self, connection: _Connection | None
+    ) -> AsyncIterator[ClientSession]:
+        if connection is None:
+            # a session set from outside the client
+            async with self._in_flight:
+                yield self.session
+            return
+        connection.in_flight += 1
+        self.metrics.in_flight += 1
+        try:
+            if connection.idle is None:
+                async with self._in_flight:
+                    yield connection.sessions[0]
+                return
+            session = await connection.idle.get()
+            try:
+                yield session
+            finally:
+                connection.idle.put_nowait(session)
+        finally:
+            connection.in_flight -= 1
+            self.metrics.in_flight -= 1
+            connection.last_used = time.monotonic()
+
+    async def _is_broken(
+        self, connection: _Connection, session: ClientSession, e: Exception
+    ) -> bool:
+        if connection.broken.is_set() or isinstance(e, (*_NOT_SENT, anyio.EndOfStream)):
+            return True
+        if not isinstance(e, McpError):
+            return False
+        if e.error.code == CONNECTION_CLOSED:
+            return True
+        # a slow tool, or a server that stopped answering
+        return e.error.code == httpx.codes.REQUEST_TIMEOUT and not await self._ping(
+            session
+        )
+
+    async def _request(
+        self, send: Callable[[ClientSession], Awaitable[T]], idempotent: bool
+    ) -> T:
+        replayed = False
+        while True:
+            await self._ensure_connected()
+            connection = self._connection
+            async with self._acquire_session(connection) as session:
+                try:
+                    return await send(session)
+                except Exception as e:
+                    if connection is None or not await self._is_broken(
+                        connection, session, e
+                    ):
+                        raise
+                    self._on_broken(connection)
+                    sent = not isinstance(e, _NOT_SENT)
+                    if replayed or (sent and not idempotent):
+                        raise
+            replayed = True
+            if sent:
+                self.metrics.replayed_calls += 1
+            logger.warning("Retrying request to MCP server %s", self.name)
+
+    async def _refresh_tools(self, use_cache: bool = True) -> None:
+        # concurrent callers share one refresh
+        async with self._refresh_lock:
+            if use_cache and not self._tools_stale:
+                return
+            self._tools_stale = False
+            response = await self._request(
+                lambda session: session.list_tools(), idempotent=True
+            )
+            self.tools = {t.name: t for t in response.tools}
+            self._chat_completion_tools = {
+                t.name: mcp_to_chat_completion_tool(t) for t in response.tools
+            }
+
     async def cleanup(self) -> None:
         """Clean up resources"""
         try:
@@ -191,32 +613,15 @@ class MCPClient:
 
     @task()
     async def list_mcp_tools(self, use_cache: bool = True) -> list[Tool]:
-        async with self._lock:
-            if self.session is None:
-                logger.warning(
-                    "MCP client is not connected to server yet. Connecting..."
-                )
-                await self.connect_to_server()
-            if not use_cache:
-                response = await self.session.list_tools()
-                self.tools = {t.name: t for t in response.tools}
-            return list(self.tools.values())
+        await self._ensure_connected()
+        await self._refresh_tools(use_cache)
+        return list(self.tools.values())
 
     @task()
     async def list_tools(self, use_cache: bool = True) -> list[ChatCompletionTool]:
-        async with self._lock:
-            if self.session is None:
-                logger.warning(
-                    "MCP client is not connected to server yet. Connecting..."
-                )
-                await self.connect_to_server()
-            if not use_cache:
-                response = await self.session.list_tools()
-                self.tools = {t.name: t for t in response.tools}
-                self._chat_completion_tools = {
-                    t.name: mcp_to_chat_completion_tool(t) for t in response.tools
-                }
-            return list(self._chat_completion_tools.values())
+        await self._ensure_connected()
+        await self._refresh_tools(use_cache)
+        return list(self._chat_completion_tools.values())
 
     @property
     def name(self) -> str:
@@ -228,24 +633,13 @@ class MCPClient:
         tool_name: str,
         parameters: dict[str, Any],
     ) -> CallToolResult:
-        async with self._lock:
-            if self.session is None:
-                logger.warning(
-                    "MCP client is not connected to server yet. Connecting..."
-                )
-                await self.connect_to_server()
-            result = await self.session.call_tool(tool_name, parameters)
-            return result
+        return await self._request(
+            lambda session: session.call_tool(tool_name, parameters),
+            idempotent=tool_name in self.idempotent_tools,
+        )
 
     @task()
     async def get_tool(self, tool_name: str, use_cache: bool = True) -> Tool | None:
-        async with self._lock:
-            if self.session is None:
-                logger.warning(
-                    "MCP client is not connected to server yet. Connecting..."
-                )
-                await self.connect_to_server()
-            if not use_cache:
-                response = await self.session.list_tools()
-                self.tools = {t.name: t for t in response.tools}
-            return self.tools.get(tool_name, None)
+        await self._ensure_connected()
+        await self._refresh_tools(use_cache)
+        return self.tools.get(tool_name, None)
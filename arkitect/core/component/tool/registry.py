@@ -0,0 +1,161 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+from arkitect.core.component.tool.mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, key: str, client: MCPClient) -> None:
+        self.key = key
+        self.client = client
+        self.refs = 0
+        self.idle_since = time.monotonic()
+        self.expiry: asyncio.TimerHandle | None = None
+
+
+class MCPServerRegistry:
+    """
+    MCP clients shared by the sessions of a process, one per server config.
+
+    Clients are refcounted: a client nobody holds any more is closed after
+    ``idle_ttl`` seconds, unless it is acquired again in the meantime. At most
+    ``max_processes`` clients of stdio servers, each running a server process,
+    are kept; idle ones are closed first, least recently used first, to make
+    room for new ones.
+    """
+
+    def __init__(self, idle_ttl: float = 300, max_processes: int | None = None) -> None:
+        self.idle_ttl = idle_ttl
+        self.max_processes = max_processes
+        # clients created, each a server process for stdio servers
+        self.spawned = 0
+        self._entries: dict[str, _Entry] = {}
+        self._by_client: dict[int, _Entry] = {}
+
+    @staticmethod
+    def key(**client_kwargs: Any) -> str:
+        """Canonical key of the arguments of an MCPClient."""
+        return json.dumps(client_kwargs, sort_keys=True, default=repr)
+
+    def acquire(self, **client_kwargs: Any) -> MCPClient:
+        """
+        Client built from ``client_kwargs``, shared with every other holder of
+        the same config. It connects on first use, and must be given back with
+        ``release`` rather than cleaned up.
+        """
+        self._expire_idle()
+        key = self.key(**client_kwargs)
+        entry = self._entries.get(key)
+        if entry is None:
+            if client_kwargs.get("command") is not None:
+                self._make_room()
+            entry = _Entry(key, MCPClient(**client_kwargs))
+            self._entries[key] = entry
+            self._by_client[id(entry.client)] = entry
+            self.spawned += 1
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+            entry.expiry = None
+        entry.refs += 1
+        return entry.client
+
+    def release(self, client: MCPClient) -> None:
+        entry = self._by_client.get(id(client))
+        if entry is None or entry.refs == 0:
+            raise ValueError(f"MCP client {client.name} is not held")
+        entry.refs -= 1
+        if entry.refs > 0:
+            return
+        entry.idle_since = time.monotonic()
+        self._expire_idle()
+
+    def _expire_idle(self) -> None:
+        # clients released with no loop running, as when building the clients
+        # of a session fails, expire once there is one
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        now = time.monotonic()
+        for entry in self._entries.values():
+            if entry.refs == 0 and entry.expiry is None:
+                entry.expiry = loop.call_later(
+                    max(0.0, entry.idle_since + self.idle_ttl - now),
+                    self._evict,
+                    entry,
+                )
+
+    def _processes(self) -> list[_Entry]:
+        return [e for e in self._entries.values() if e.client.command is not None]
+
+    def _make_room(self) -> None:
+        if self.max_processes is None:
+            return
+        processes = self._processes()
+        excess = len(processes) - self.max_processes + 1
+        if excess <= 0:
+            return
+        idle = sorted((e for e in processes if e.refs == 0), key=lambda e: e.idle_since)
+        if len(idle) < excess:
+            raise RuntimeError(
+                f"All {self.max_processes} MCP server processes are in use"
+            )
+        for entry in idle[:excess]:
+            self._evict(entry)
+
+    def _evict(self, entry: _Entry) -> None:
+        if entry.refs > 0 or self._entries.get(entry.key) is not entry:
+            return
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+        del self._entries[entry.key]
+        del self._by_client[id(entry.client)]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._close(entry.client))
+            return
+        loop.create_task(self._close(entry.client))
+
+    async def _close(self, client: MCPClient) -> None:
+        try:
+            await client.cleanup()
+        except BaseException as e:
+            # cleanup logged it already
+            logger.debug("Error while closing MCP client %s: %s", client.name, e)
+
+    async def close(self) -> None:
+        """Close every client, held or not."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        self._by_client.clear()
+        for entry in entries:
+            if entry.expiry is not None:
+                entry.expiry.cancel()
+        await asyncio.gather(*[self._close(e.client) for e in entries])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# shared by every build_mcp_clients_from_config passed it
+mcp_server_registry = MCPServerRegistry()
@@ -32,12 +32,37 @@ class ToolPool:
         self.tools: dict[str, ChatCompletionTool] = {}
         self.mcp_clients: Dict[str, MCPClient] = {}
         self._all_tool_name: set[str] = set()
+        # bumped whenever the tool set may have changed
+        self._version: int = 0
+        self._schema_cache: tuple[int, list[dict[str, Any]]] | None = None
+        self._tools_cache: tuple[int, list[ChatCompletionTool]] | None = None
+        # tool name -> (client serving it, None for the local session; schema)
+        self._routes: (
+            tuple[int, dict[str, tuple[MCPClient | None, ChatCompletionTool]]] | None
+        ) = None
+        self._refreshed_version: int | None = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._version += 1
 
     def add_mcp_client(self, mcp_client: MCPClient) -> None:
         if mcp_client.name in self.mcp_clients:
             WARN(f"Found MCP client with the same name: {mcp_client.name}. Skipping.")
             return
         self.mcp_clients[mcp_client.name] = mcp_client
+        mcp_client.add_tools_changed_callback(self.invalidate)
+        self.invalidate()
+
+    def remove_mcp_client(self, name: str) -> None:
+        mcp_client = self.mcp_clients.pop(name, None)
+        if mcp_client is None:
+            return
+        mcp_client.remove_tools_changed_callback(self.invalidate)
+        self.invalidate()
 
     def add_tool(
         self,
@@ -46,40 +71,77 @@ class ToolPool:
         description: str | None = None,
     ) -> None:
         self.session.add_tool(fn=fn, name=name, description=description)
+        self.invalidate()
 
     def tool(
         self, name: str | None = None, description: str | None = None
     ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-        fn = self.session.tool(name=name, description=description)
-        return fn
+        decorator = self.session.tool(name=name, description=description)
+
+        def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+            decorator(fn)
+            self.invalidate()
+            return fn
+
+        return register
 
     async def initialize(self) -> None:
-        await self.refresh_tool_list()
+        # a pool shared across runs is only listed again once its tools change
+        if self._refreshed_version != self._version:
+            await self.refresh_tool_list()
 
     @task()
-    async def refresh_tool_list(self) -> None:
+    async def refresh_tool_list(self, use_cache: bool = True) -> None:
+        """
+        List the tools of the local session and of every client, and index
+        them by name. The first tool listed with a name serves it.
+        """
+        version = self._version
+        self._refreshed_version = version
         tools = await self.session.list_tools()
         self.tools = {t.name: mcp_to_chat_completion_tool(t) for t in tools}
-        self._all_tool_name.update([t.name for t in tools])
-        for client in self.mcp_clients.values():
-            new_tools = await client.list_tools()
-            new_names = [t.function.name for t in new_tools]
-            self._all_tool_name.update(new_names)
-
-    @task()
-    async def list_tools(self, use_cache: bool = True) -> list[ChatCompletionTool]:
-        if not use_cache:
-            await self.refresh_tool_list()
         chat_completion_tools = list(self.tools.values())
+        routes: dict[str, tuple[MCPClient | None, ChatCompletionTool]] = {
+            name: (None, tool) for name, tool in self.tools.items()
+        }
         for client in self.mcp_clients.values():
-            chat_completion_tools.extend(await client.list_tools())
+            new_tools = await client.list_tools(use_cache=use_cache)
+            chat_completion_tools.extend(new_tools)
+            for tool in new_tools:
+                routes.setdefault(tool.function.name, (client, tool))
+        self._all_tool_name.update(routes)
         duplicates = find_duplicate_tools(chat_completion_tools)
         if duplicates:
             WARN(
                 f"Found tools with the same name in the tool pool: {duplicates}."
                 + "This may cause unexpected behavior."
             )
-        return chat_completion_tools
+        self._tools_cache = (version, chat_completion_tools)
+        self._routes = (version, routes)
+
+    @task()
+    async def list_tool_schemas(self) -> list[dict[str, Any]]:
+        """
+        Serialized tools to send with a chat request.
+
+        The result is cached on the pool until its version changes, so it is
+        shared across turns and across contexts using the same pool.
+        """
+        version = self._version
+        if self._schema_cache is None or self._schema_cache[0] != version:
+            tools = await self.list_tools()
+            self._schema_cache = (version, [t.model_dump() for t in tools])
+        return list(self._schema_cache[1])
+
+    @task()
+    async def list_tools(self, use_cache: bool = True) -> list[ChatCompletionTool]:
+        if (
+            not use_cache
+            or self._tools_cache is None
+            or self._tools_cache[0] != self._version
+        ):
+            await self.refresh_tool_list(use_cache=use_cache)
+        return list(self._tools_cache[1])  # type: ignore
 
     @task()
     async def execute_tool(
@@ -87,15 +149,16 @@ class ToolPool:
         tool_name: str,
         parameters: dict[str, Any],
     ) -> CallToolResult:
-        available_tool_names = [t.name for t in await self.session.list_tools()]
-        if tool_name in available_tool_names:
+        if self._routes is None or self._routes[0] != self._version:
+            await self.refresh_tool_list()
+        route = self._routes[1].get(tool_name)  # type: ignore
+        if route is None:
+            raise ValueError(f"Tool {tool_name} is not found!")
+        client, _ = route
+        if client is None:
             result = await self.session.call_tool(tool_name, parameters)
             return CallToolResult(content=list(result), isError=False)
-        else:
-            for client in self.mcp_clients.values():
-                if await client.get_tool(tool_name):
-                    return await client.execute_tool(tool_name, parameters)
-        raise ValueError(f"Tool {tool_name} is not found!")
+        return await client.execute_tool(tool_name, parameters)
 
     @task()
     async def contain(self, tool_name: str) -> bool:
@@ -519,6 +519,59 @@ class BotUsage(BaseModel):
         return total_usage
 
 
+def _merge_contents(
+    last: List[Any], earlier: List[List[Any]], skip_none: bool
+) -> Dict[int, Any]:
+    """
+    Contents of the earlier responses prepended to the last one per choice
+    position, joined once so merging is linear in the number of responses.
+    Only the positions that changed are returned.
+
+    Strings are joined to strings and lists to lists, None contents of
+    earlier responses are skipped if ``skip_none``, anything else is a
+    TypeError.
+    """
+    fragments: List[List[Any]] = [[] for _ in last]
+    for contents in earlier:
+        for index, content in enumerate(contents[: len(last)]):
+            if isinstance(last[index], str) and isinstance(content, str):
+                fragments[index].append(content)
+            elif isinstance(last[index], list) and isinstance(content, list):
+                fragments[index].append(content)
+            elif skip_none and content is None:
+                continue
+            else:
+                raise TypeError("no supported merge type")
+
+    merged: Dict[int, Any] = {}
+    for index, parts in enumerate(fragments):
+        if not parts:
+            continue
+        parts.append(last[index])
+        if isinstance(last[index], str):
+            merged[index] = "".join(parts)
+        else:
+            merged[index] = [item for part in parts for item in part]
+    return merged
+
+
+def _merge_usage(
+    last: Optional[CompletionUsage], earlier: List[Any]
+) -> Optional[CompletionUsage]:
+    """Add the usages of the earlier responses to the last one, if it has any."""
+    usages = [r.usage for r in earlier if r.usage]
+    if not last or not usages:
+        return last
+    return last.model_copy(
+        update={
+            "prompt_tokens": last.prompt_tokens + sum(u.prompt_tokens for u in usages),
+            "completion_tokens": last.completion_tokens
+            + sum(u.completion_tokens for u in usages),
+            "total_tokens": last.total_tokens + sum(u.total_tokens for u in usages),
+        }
+    )
+
+
 class ArkChatResponse(Response):
     id: str
     """A unique identifier for the chat completion."""
@@ -553,29 +606,22 @@ class ArkChatResponse(Response):
 
         """
         to ensure the `merged` have attributes `usage`
-        handle the responses in reversed order
+        start from the last response and prepend the earlier ones
         """
         merged = ArkChatResponse(**responses[-1].__dict__)
-        for resp in reversed(responses[:-1]):
-            for i, j in zip(merged.choices, resp.choices):
-                if isinstance(i.message.content, str) and isinstance(
-                    j.message.content, str
-                ):
-                    i.message.content = j.message.content + i.message.content
-                elif isinstance(i.message.content, list) and isinstance(
-                    j.message.content, list
-                ):
-                    i.message.content = j.message.content + i.message.content
-                elif j.message.content is None:
-                    continue
-                else:
-                    raise TypeError("no supported merge type")
-
-            if merged.usage and resp.usage:
-                merged.usage.prompt_tokens += resp.usage.prompt_tokens
-                merged.usage.completion_tokens += resp.usage.completion_tokens
-                merged.usage.total_tokens += resp.usage.total_tokens
-
+        contents = _merge_contents(
+            [choice.message.content for choice in merged.choices],
+            [[choice.message.content for choice in r.choices] for r in responses[:-1]],
+            skip_none=True,
+        )
+        for index, content in contents.items():
+            choice = merged.choices[index]
+            merged.choices[index] = choice.model_copy(
+                update={
+                    "message": choice.message.model_copy(update={"content": content})
+                }
+            )
+        merged.usage = _merge_usage(merged.usage, responses[:-1])
         return merged
 
     def merge_usages(
@@ -675,27 +721,20 @@ class ArkChatCompletionChunk(Response):
 
         """
         to ensure the `merged` have attributes `usage`
-        handle the responses in reversed order
+        start from the last response and prepend the earlier ones
         """
         merged = ArkChatCompletionChunk(**responses[-1].__dict__)
-        for resp in reversed(responses[:-1]):
-            for i, j in zip(merged.choices, resp.choices):
-                if isinstance(i.delta.content, str) and isinstance(
-                    j.delta.content, str
-                ):
-                    i.delta.content = j.delta.content + i.delta.content
-                elif isinstance(i.delta.content, list) and isinstance(
-                    j.delta.content, list
-                ):
-                    i.delta.content = j.delta.content + i.delta.content
-                else:
-                    raise TypeError("no supported merge type")
-
-            if merged.usage and resp.usage:
-                merged.usage.prompt_tokens += resp.usage.prompt_tokens
-                merged.usage.completion_tokens += resp.usage.completion_tokens
-                merged.usage.total_tokens += resp.usage.total_tokens
-
+        contents = _merge_contents(
+            [choice.delta.content for choice in merged.choices],
+            [[choice.delta.content for choice in r.choices] for r in responses[:-1]],
+            skip_none=False,
+        )
+        for index, content in contents.items():
+            choice = merged.choices[index]
+            merged.choices[index] = choice.model_copy(
+                update={"delta": choice.delta.model_copy(update={"content": content})}
+            )
+        merged.usage = _merge_usage(merged.usage, responses[:-1])
         return merged
 
     def merge_usages(
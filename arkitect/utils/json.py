@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import json
+import re
+from collections.abc import MutableSequence
 from enum import Enum
 from typing import (
     Any,
@@ -34,7 +36,7 @@ def dump_json_str(obj: Any) -> str:
 def dump_json(obj: Any) -> Any:
     if isinstance(obj, dict):
         return {k: dump_json(v) for k, v in obj.items()}
-    elif isinstance(obj, (tuple, list)):
+    elif isinstance(obj, (tuple, MutableSequence)):
         return [dump_json(v) for v in obj]
     elif isinstance(obj, BaseModel):
         return obj.model_dump(exclude_unset=True, exclude_none=True)
@@ -74,7 +76,7 @@ def dump_json_truncate(obj: Any, string_length_limit: int, depth: int = 0) -> An
         return obj.value
     elif isinstance(obj, (AsyncGenerator, Generator, AsyncIterable)):
         return str(obj)
-    elif isinstance(obj, (list, tuple)):
+    elif isinstance(obj, (tuple, MutableSequence)):
         return [
             dump_json_truncate(item, string_length_limit, depth + 1) for item in obj
         ]
@@ -89,3 +91,262 @@ def dump_json_truncate(obj: Any, string_length_limit: int, depth: int = 0) -> An
         return result_dict
     else:
         return obj
+
+
+_WHITESPACE = frozenset(" \t\n\r")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+_NUMBER_PATTERN = re.compile(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+_STRING_SPECIAL = re.compile(r'["\\]')
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# structural expectations of the incremental parser
+_VALUE = "value"
+_FIRST_VALUE = "first_value"  # right after "[", "]" is allowed
+_KEY = "key"
+_FIRST_KEY = "first_key"  # right after "{", "}" is allowed
+_COLON = "colon"
+_NEXT = "next"  # "," or the closing bracket of the current container
+_END = "end"
+
+
+class IncrementalJSONParser:
+    """
+    Parse a JSON document that arrives as a sequence of text fragments.
+
+    Every fragment is consumed once, so feeding a document costs O(len) in
+    total no matter how finely it is split. ``partial`` exposes the values
+    completed so far; containers are filled in place as parsing proceeds.
+    Malformed input never raises from ``feed``, ``result`` falls back to
+    ``json.loads`` on the full text so errors match the non-streaming path.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: list[str] = []
+        self._text: str | None = ""
+        self._stack: list[dict | list] = []
+        self._keys: list[str | None] = []
+        self._root: Any = None
+        self._expect = _VALUE
+        self._lexeme: str | None = None  # "string", "key", "number" or "literal"
+        self._buffer: list[str] = []
+        self._escape: str | None = None
+        self._has_unicode_escape = False
+        self._done = False
+        self._error: str | None = None
+
+    def feed(self, fragment: str | None) -> None:
+        if not fragment:
+            return
+        self._fragments.append(fragment)
+        self._text = None
+        if self._error is not None:
+            return
+        try:
+            self._consume(fragment)
+        except ValueError as e:
+            self._error = str(e)
+
+    def close(self) -> None:
+        """Finish a trailing top level number or literal at the end of input."""
+        if self._error is not None or self._stack:
+            return
+        try:
+            if self._lexeme == "number":
+                self._finish_number()
+            elif self._lexeme == "literal":
+                self._finish_literal()
+        except ValueError as e:
+            self._error = str(e)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._fragments)
+            self._fragments = [self._text]
+        return self._text
+
+    @property
+    def done(self) -> bool:
+        return self._done and self._error is None
+
+    @property
+    def partial(self) -> Any:
+        return self._root
+
+    @property
+    def result(self) -> Any:
+        self.close()
+        if self.done:
+            return self._root
+        return json.loads(self.text)
+
+    def _consume(self, chunk: str) -> None:
+        i, n = 0, len(chunk)
+        while i < n:
+            lexeme = self._lexeme
+            if lexeme == "string" or lexeme == "key":
+                i = self._consume_string(chunk, i)
+                continue
+            c = chunk[i]
+            if lexeme == "number":
+                if c in _NUMBER_CHARS:
+                    self._buffer.append(c)
+                    i += 1
+                    continue
+                self._finish_number()
+            elif lexeme == "literal":
+                if c.isalpha():
+                    self._buffer.append(c)
+                    i += 1
+                    continue
+                self._finish_literal()
+            if c not in _WHITESPACE:
+                self._structural(c)
+            i += 1
+
+    def _consume_string(self, chunk: str, i: int) -> int:
+        n = len(chunk)
+        while i < n:
+            if self._escape is not None:
+                i = self._consume_escape(chunk, i)
+                continue
+            m = _STRING_SPECIAL.search(chunk, i)
+            if m is None:
+                self._buffer.append(chunk[i:])
+                return n
+            j = m.start()
+            if j > i:
+                self._buffer.append(chunk[i:j])
+            if chunk[j] == '"':
+                self._finish_string()
+                return j + 1
+            self._escape = ""
+            i = j + 1
+        return i
+
+    def _consume_escape(self, chunk: str, i: int) -> int:
+        if self._escape == "":
+            c = chunk[i]
+            if c == "u":
+                self._escape = "u"
+                self._has_unicode_escape = True
+            elif c in _ESCAPES:
+                self._buffer.append(_ESCAPES[c])
+                self._escape = None
+            else:
+                raise ValueError(f"Invalid escape \\{c}")
+            return i + 1
+        part = chunk[i : i + 5 - len(self._escape)]  # type: ignore
+        self._escape += part  # type: ignore
+        if len(self._escape) == 5:  # type: ignore
+            self._buffer.append(chr(int(self._escape[1:], 16)))  # type: ignore
+            self._escape = None
+        return i + len(part)
+
+    def _structural(self, c: str) -> None:
+        expect = self._expect
+        if expect == _COLON:
+            if c != ":":
+                raise ValueError(f"Expecting ':' but got {c!r}")
+            self._expect = _VALUE
+        elif expect == _NEXT:
+            if c == ",":
+                self._expect = _KEY if isinstance(self._stack[-1], dict) else _VALUE
+            else:
+                self._close_container(c)
+        elif expect == _KEY or expect == _FIRST_KEY:
+            if c == '"':
+                self._lexeme = "key"
+            elif c == "}" and expect == _FIRST_KEY:
+                self._close_container(c)
+            else:
+                raise ValueError(f"Expecting property name but got {c!r}")
+        elif expect == _VALUE or expect == _FIRST_VALUE:
+            if c == "]" and expect == _FIRST_VALUE:
+                self._close_container(c)
+            elif c == "{" or c == "[":
+                container: dict | list = {} if c == "{" else []
+                self._emit(container)
+                self._stack.append(container)
+                self._keys.append(None)
+                self._expect = _FIRST_KEY if c == "{" else _FIRST_VALUE
+            elif c == '"':
+                self._lexeme = "string"
+            elif c == "-" or c.isdigit():
+                self._lexeme = "number"
+                self._buffer.append(c)
+            elif c.isalpha():
+                self._lexeme = "literal"
+                self._buffer.append(c)
+            else:
+                raise ValueError(f"Expecting value but got {c!r}")
+        else:
+            raise ValueError(f"Extra data {c!r} after the end of document")
+
+    def _emit(self, value: Any) -> None:
+        if not self._stack:
+            self._root = value
+            self._expect = _END
+            self._done = not isinstance(value, (dict, list))
+            return
+        top = self._stack[-1]
+        if isinstance(top, dict):
+            top[self._keys[-1]] = value
+        else:
+            top.append(value)
+        self._expect = _NEXT
+
+    def _close_container(self, c: str) -> None:
+        if not self._stack or c != ("}" if isinstance(self._stack[-1], dict) else "]"):
+            raise ValueError(f"Unexpected {c!r}")
+        self._stack.pop()
+        self._keys.pop()
+        if self._stack:
+            self._expect = _NEXT
+        else:
+            self._expect = _END
+            self._done = True
+
+    def _take_buffer(self) -> str:
+        value = "".join(self._buffer)
+        self._buffer = []
+        self._lexeme = None
+        return value
+
+    def _finish_string(self) -> None:
+        is_key = self._lexeme == "key"
+        value = self._take_buffer()
+        if self._has_unicode_escape:
+            # join surrogate pairs the same way json.loads does
+            value = value.encode("utf-16", "surrogatepass").decode("utf-16")
+            self._has_unicode_escape = False
+        if is_key:
+            self._keys[-1] = value
+            self._expect = _COLON
+        else:
+            self._emit(value)
+
+    def _finish_number(self) -> None:
+        text = self._take_buffer()
+        if not _NUMBER_PATTERN.fullmatch(text):
+            raise ValueError(f"Invalid number {text!r}")
+        if "." in text or "e" in text or "E" in text:
+            self._emit(float(text))
+        else:
+            self._emit(int(text))
+
+    def _finish_literal(self) -> None:
+        text = self._take_buffer()
+        if text not in _LITERALS:
+            raise ValueError(f"Invalid literal {text!r}")
+        self._emit(_LITERALS[text])
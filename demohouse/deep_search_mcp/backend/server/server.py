@@ -15,6 +15,7 @@ from typing import AsyncIterable, Tuple, Callable, Dict, AsyncIterator, Any
 from agent.worker import Worker
 from arkitect.core.component.tool import MCPClient
 from arkitect.core.component.tool.builder import build_mcp_clients_from_config
+from arkitect.core.component.tool.registry import mcp_server_registry
 from arkitect.core.errors import (
     ResourceNotFound,
     InternalServiceError,
@@ -50,11 +51,6 @@ from tools.hooks import (
 async def _run_deep_research(
     state_manager: DeepSearchStateManager, max_plannings: int
 ) -> AsyncIterable[BaseEvent]:
-    # init mcp client
-    mcp_clients, clean_up = build_mcp_clients_from_config(
-        config_file=MCP_CONFIG_FILE_PATH,
-    )
-
     dr_state = await state_manager.load()
 
     if not dr_state:
@@ -65,6 +61,12 @@ async def _run_deep_research(
         )
         return
 
+    # init mcp client
+    mcp_clients, clean_up = build_mcp_clients_from_config(
+        config_file=MCP_CONFIG_FILE_PATH,
+        registry=mcp_server_registry,
+    )
+
     try:
         dr = DeepSearch(
             supervisor_llm_model=SUPERVISOR_LLM_MODEL,
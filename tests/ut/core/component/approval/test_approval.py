@@ -0,0 +1,307 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import fnmatch
+import json
+import os
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from arkitect.core.component.approval import (
+    ApprovalRequest,
+    InMemoryApprovalBroker,
+    RedisApprovalBroker,
+    build_approval_router,
+)
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.hooks import (
+    ApprovalHook,
+    HookInterruptException,
+)
+from arkitect.core.component.context.model import State
+
+os.environ["ARK_API_KEY"] = "-"
+
+
+def build_state(context_id: str = "ctx") -> State:
+    return State(
+        context_id=context_id,
+        messages=[
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {
+                        "id": "call_0",
+                        "type": "function",
+                        "function": {"name": "rm", "arguments": '{"path": "/"}'},
+                    }
+                ],
+            }
+        ],
+    )
+
+
+async def fake_streaming_session(chunks: int = 20) -> int:
+    received = 0
+    for _ in range(chunks):
+        await asyncio.sleep(0.001)
+        received += 1
+    return received
+
+
+async def wait_for_pending(broker: InMemoryApprovalBroker, count: int = 1) -> None:
+    while len(await broker.list_pending()) < count:
+        await asyncio.sleep(0.001)
+
+
+async def test_pending_approval_does_not_block_other_sessions() -> None:
+    broker = InMemoryApprovalBroker()
+    app = FastAPI()
+    app.include_router(build_approval_router(broker))
+    hook = ApprovalHook(broker=broker)
+
+    approval = asyncio.create_task(
+        hook.pre_tool_call("rm", '{"path": "/"}', build_state())
+    )
+    await wait_for_pending(broker)
+
+    sessions = await asyncio.wait_for(
+        asyncio.gather(*[fake_streaming_session() for _ in range(100)]), timeout=5
+    )
+    assert sessions == [20] * 100
+    assert not approval.done()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        pending = (await client.get("/approvals")).json()
+        assert [p["approval_id"] for p in pending] == ["ctx:call_0"]
+        assert json.loads(pending[0]["arguments"]) == {"path": "/"}
+
+        response = await client.post("/approvals/ctx:call_0", json={"approved": True})
+        assert response.status_code == 200
+        response = await client.post("/approvals/unknown", json={"approved": True})
+        assert response.status_code == 404
+
+    state = await approval
+    assert state.context_id == "ctx"
+    assert await broker.list_pending() == []
+
+
+async def test_rejection_interrupts() -> None:
+    broker = InMemoryApprovalBroker()
+    approval = asyncio.create_task(
+        ApprovalHook(broker=broker).pre_tool_call("rm", '{"path": "/"}', build_state())
+    )
+    await wait_for_pending(broker)
+    assert await broker.resolve("ctx:call_0", False)
+    with pytest.raises(HookInterruptException):
+        await approval
+
+
+@pytest.mark.parametrize("default_approved", [True, False])
+async def test_timeout_applies_default_decision(default_approved: bool) -> None:
+    hook = ApprovalHook(
+        broker=InMemoryApprovalBroker(timeout=0.01, default_approved=default_approved)
+    )
+    if default_approved:
+        await hook.pre_tool_call("rm", '{"path": "/"}', build_state())
+    else:
+        with pytest.raises(HookInterruptException):
+            await hook.pre_tool_call("rm", '{"path": "/"}', build_state())
+
+
+async def test_unknown_calls_do_not_share_approvals() -> None:
+    broker = InMemoryApprovalBroker()
+    hook = ApprovalHook(broker=broker)
+    # neither call is in the history of the state
+    approvals = [
+        asyncio.create_task(hook.pre_tool_call("ls", "{}", build_state()))
+        for _ in range(2)
+    ]
+    await wait_for_pending(broker, 2)
+    first, second = [p.approval_id for p in await broker.list_pending()]
+    assert first != second
+    assert first.startswith("ctx:") and first != "ctx:"
+    assert await broker.resolve(first, True)
+    assert await broker.resolve(second, False)
+    await approvals[0]
+    with pytest.raises(HookInterruptException):
+        await approvals[1]
+
+
+def build_turn(context_id: str = "ctx") -> Context:
+    async def rm(path: str) -> str:
+        """Remove a path
+        Args:
+            path (str): path to remove
+        Returns:
+            str: the removed path
+        """
+        return path
+
+    return Context(
+        model="test",
+        tools=[rm],
+        state=State(
+            context_id=context_id,
+            messages=[
+                {
+                    "role": "assistant",
+                    "content": "",
+                    "tool_calls": [
+                        {
+                            "id": f"call_{i}",
+                            "type": "function",
+                            "function": {
+                                "name": "rm",
+                                "arguments": json.dumps({"path": path}),
+                            },
+                        }
+                        for i, path in enumerate(["/a", "/b"])
+                    ],
+                }
+            ],
+        ),
+    )
+
+
+async def test_each_call_of_a_turn_is_approved_on_its_own() -> None:
+    broker = InMemoryApprovalBroker()
+    ctx = build_turn()
+    await ctx.init()
+    ctx.set_pre_tool_call_hook(ApprovalHook(broker=broker))
+    turn = asyncio.create_task(ctx.completions.handle_tool_call())
+
+    for i, path in enumerate(["/a", "/b"]):
+        approval_id = f"ctx:call_{i}"
+        while [p.approval_id for p in await broker.list_pending()] != [approval_id]:
+            await asyncio.sleep(0.001)
+        [pending] = await broker.list_pending()
+        assert json.loads(pending.arguments) == {"path": path}
+        assert await broker.resolve(approval_id, True)
+
+    assert await turn
+    assert [m["tool_call_id"] for m in ctx.state.messages[1:]] == [
+        "call_0",
+        "call_1",
+    ]
+
+
+async def test_console_approval_shows_its_own_call(monkeypatch, capsys) -> None:
+    monkeypatch.setattr("builtins.input", lambda prompt: "Y")
+    ctx = build_turn()
+    await ctx.init()
+    ctx.set_pre_tool_call_hook(ApprovalHook())
+
+    assert await ctx.completions.handle_tool_call()
+    prompts = capsys.readouterr().out.split("tool call parameters:")[1:]
+    assert len(prompts) == 2
+    assert "/a" in prompts[0] and "/b" not in prompts[0]
+    assert "/b" in prompts[1] and "/a" not in prompts[1]
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.redis.channels.setdefault(channel, []).append(self)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.redis.channels[channel].remove(self)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def listen(self) -> AsyncIterator[dict]:
+        yield {"type": "subscribe", "data": 1}
+        while True:
+            yield {"type": "message", "data": await self.messages.get()}
+
+
+class FakeRedis:
+    """The part of redis.asyncio.Redis the approval broker uses."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.channels: dict[str, list[FakePubSub]] = {}
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, **kwargs: Any) -> None:
+        self.values[key] = value.encode()
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.values)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for pubsub in self.channels.get(channel, []):
+            pubsub.messages.put_nowait(message.encode())
+
+    async def scan(self, cursor: int, match: str, count: int) -> tuple[int, list]:
+        return 0, [key for key in self.values if fnmatch.fnmatch(key, match)]
+
+    async def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        return [self.values.get(key) for key in keys]
+
+
+def redis_broker(**kwargs: Any) -> tuple[RedisApprovalBroker, FakeRedis]:
+    broker = RedisApprovalBroker(host="localhost", username="", password="", **kwargs)
+    redis = FakeRedis()
+    broker.redis_client.client = redis  # type: ignore
+    return broker, redis
+
+
+@pytest.mark.parametrize("approved", [True, False])
+async def test_redis_broker_resolve(approved: bool) -> None:
+    broker, redis = redis_broker()
+    request = ApprovalRequest(approval_id="ctx:call_0", tool_name="rm")
+    assert not await broker.resolve("ctx:call_0", True)
+    decision = asyncio.create_task(broker.request_approval(request))
+    while not await broker.list_pending():
+        await asyncio.sleep(0.001)
+    [pending] = await broker.list_pending()
+    assert pending.approval_id == "ctx:call_0"
+
+    # any worker sharing the redis server may resolve it
+    other, _ = redis_broker()
+    other.redis_client.client = redis  # type: ignore
+    assert await other.resolve("ctx:call_0", approved)
+    assert await decision is approved
+    assert await broker.list_pending() == []
+    assert redis.values == {}
+
+
+@pytest.mark.parametrize("default_approved", [True, False])
+async def test_redis_broker_timeout(default_approved: bool) -> None:
+    broker, redis = redis_broker(timeout=0.01, default_approved=default_approved)
+    request = ApprovalRequest(approval_id="ctx:call_0", tool_name="rm")
+    assert await broker.request_approval(request) is default_approved
+    assert redis.values == {}
+    assert redis.channels == {"approval:channel:ctx:call_0": []}
@@ -0,0 +1,70 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Any, Callable, Optional, Sequence, Union
+
+from volcenginesdkarkruntime.resources.chat.completions import AsyncCompletions
+from volcenginesdkarkruntime.types.chat import ChatCompletionChunk
+
+
+def chunk(delta: dict, finish_reason: Optional[str] = None, **kwargs: Any) -> dict:
+    """Body of a streamed chat completion chunk with a single choice."""
+    return {
+        "id": "chunk",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "test",
+        "service_tier": "default",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        **kwargs,
+    }
+
+
+def build_chunk(
+    delta: dict, finish_reason: Optional[str] = None
+) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(chunk(delta, finish_reason))
+
+
+def stub_completions(
+    monkeypatch: Any,
+    replies: list[Sequence[Union[ChatCompletionChunk, float]]],
+    before_chunk: Optional[Callable[[], None]] = None,
+) -> list[dict]:
+    """
+    Make every streamed chat completion request answer with the next of
+    ``replies``, the last one answering any further request. A number in a
+    reply sleeps that many seconds before the chunks after it. Returns the
+    keyword arguments of every request.
+    """
+    requests: list[dict] = []
+
+    async def fake_create(self, *args, **kwargs):  # type: ignore
+        requests.append(kwargs)
+        reply = replies.pop(0) if len(replies) > 1 else replies[0]
+
+        async def iterator():  # type: ignore
+            for item in reply:
+                if isinstance(item, (int, float)):
+                    await asyncio.sleep(item)
+                    continue
+                if before_chunk is not None:
+                    before_chunk()
+                yield item
+
+        return iterator()
+
+    monkeypatch.setattr(AsyncCompletions, "create", fake_create)
+    return requests
@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.hooks import (
+    HookInterruptException,
+    PreLLMCallHook,
+    PreLLMCallHookRunner,
+)
+from arkitect.core.component.context.model import State
+
+os.environ["ARK_API_KEY"] = "-"
+
+SLEEP_SECONDS = 0.3
+
+
+class SleepingHook(PreLLMCallHook):
+    def __init__(
+        self,
+        hook_name: str,
+        seconds: float = 0.0,
+        concurrent_safe: bool = True,
+        depends_on: tuple[str, ...] = (),
+        timeout: float | None = None,
+        interrupt: bool = False,
+    ) -> None:
+        self.hook_name = hook_name
+        self.seconds = seconds
+        self.concurrent_safe = concurrent_safe
+        self.depends_on = depends_on
+        self.timeout = timeout
+        self.interrupt = interrupt
+        self.seen: list[str] = []
+
+    async def pre_llm_call(self, state: State) -> State:
+        self.seen = [m["content"] for m in state.messages]
+        await asyncio.sleep(self.seconds)
+        if self.interrupt:
+            raise HookInterruptException(reason=self.hook_name, state=state)
+        state.messages.append({"role": "user", "content": self.hook_name})
+        return state
+
+
+async def run_hooks(*hooks: SleepingHook) -> tuple[PreLLMCallHookRunner, State]:
+    runner = PreLLMCallHookRunner(list(hooks))
+    state = await runner.pre_llm_call(State(messages=[]))
+    return runner, state
+
+
+async def test_concurrent_hooks_run_in_parallel_and_merge_in_order() -> None:
+    start = time.perf_counter()
+    runner, state = await run_hooks(
+        SleepingHook("a", SLEEP_SECONDS),
+        SleepingHook("b", SLEEP_SECONDS / 3),
+        SleepingHook("c", SLEEP_SECONDS),
+    )
+    assert time.perf_counter() - start < SLEEP_SECONDS * 2
+    assert [m["content"] for m in state.messages] == ["a", "b", "c"]
+    assert set(runner.timings) == {"a", "b", "c"}
+    assert runner.timings["a"] >= SLEEP_SECONDS
+
+
+async def test_dependencies_and_serial_hooks_keep_order() -> None:
+    after_a = SleepingHook("after_a", depends_on=("a",))
+    serial = SleepingHook("serial", concurrent_safe=False)
+    runner, state = await run_hooks(
+        after_a, SleepingHook("a", 0.01), serial, SleepingHook("d")
+    )
+    assert [m["content"] for m in state.messages] == ["a", "after_a", "serial", "d"]
+    assert after_a.seen == ["a"]
+    assert serial.seen == ["a", "after_a"]
+
+
+async def test_unresolvable_dependencies() -> None:
+    with pytest.raises(ValueError):
+        await run_hooks(SleepingHook("a", depends_on=("missing",)))
+
+
+async def test_hook_timeout_interrupts() -> None:
+    with pytest.raises(HookInterruptException) as e:
+        await run_hooks(SleepingHook("slow", SLEEP_SECONDS, timeout=0.01))
+    assert "timed out" in e.value.reason
+
+
+async def test_first_interruption_in_order_is_raised() -> None:
+    runner = PreLLMCallHookRunner(
+        [
+            SleepingHook("a", SLEEP_SECONDS / 3),
+            SleepingHook("b", SLEEP_SECONDS, interrupt=True),
+            SleepingHook("c", 0.0, interrupt=True),
+        ]
+    )
+    state = State(messages=[])
+    with pytest.raises(HookInterruptException) as e:
+        await runner.pre_llm_call(state)
+    assert e.value.reason == "b"
+    assert [m["content"] for m in state.messages] == ["a"]
+
+
+async def test_context_add_hook() -> None:
+    ctx = Context(model="test")
+    first, second = SleepingHook("first"), SleepingHook("second")
+    ctx.add_pre_llm_call_hook(first)
+    assert ctx.pre_llm_call_hook is first
+    ctx.add_pre_llm_call_hook(second)
+    assert isinstance(ctx.pre_llm_call_hook, PreLLMCallHookRunner)
+    state = await ctx.pre_llm_call_hook.pre_llm_call(ctx.state)
+    assert [m["content"] for m in state.messages] == ["first", "second"]
+
+
+async def test_hook_name_defaults_to_class_name() -> None:
+    class Named(PreLLMCallHook):
+        async def pre_llm_call(self, state: State) -> State:
+            return state
+
+    first, second = Named(), Named()
+    assert first.hook_name == "Named"
+    second.hook_name = "second"
+    assert (first.hook_name, second.hook_name) == ("Named", "second")
+    assert first.depends_on == second.depends_on == ()
@@ -0,0 +1,237 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from chat_stubs import build_chunk, stub_completions
+
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.hooks import (
+    HookInterruptException,
+    PostToolCallHook,
+    PreToolCallHook,
+)
+from arkitect.core.component.context.model import State, ToolChunk
+from arkitect.core.component.context.tool_executor import ToolCallExecutor
+
+os.environ["ARK_API_KEY"] = "-"
+
+SLEEP_SECONDS = 0.5
+
+
+async def slow_echo(name: str, seconds: float) -> str:
+    """Sleep and echo the name back
+    Args:
+        name (str): value to echo
+        seconds (float): seconds to sleep
+    Returns:
+        str: the echoed name
+    """
+    await asyncio.sleep(seconds)
+    return name
+
+
+def build_tool_call_message(calls: list[tuple[str, float]]) -> dict:
+    return {
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [
+            {
+                "id": f"call_{name}",
+                "type": "function",
+                "function": {
+                    "name": "slow_echo",
+                    "arguments": json.dumps({"name": name, "seconds": seconds}),
+                },
+            }
+            for name, seconds in calls
+        ],
+    }
+
+
+async def build_context(
+    calls: list[tuple[str, float]],
+    tool_executor: ToolCallExecutor | None = None,
+) -> Context:
+    ctx = Context(
+        model="test",
+        tools=[slow_echo],
+        state=State(messages=[build_tool_call_message(calls)]),
+        tool_executor=tool_executor,
+    )
+    await ctx.init()
+    return ctx
+
+
+class RecordingHook(PreToolCallHook, PostToolCallHook):
+    def __init__(self, interrupt_on: str | None = None) -> None:
+        self.records: list[tuple[str, str, int]] = []
+        self.interrupt_on = interrupt_on
+
+    async def pre_tool_call(self, name: str, arguments: str, state: State) -> State:
+        tool_arg = json.loads(arguments)["name"]
+        if tool_arg == self.interrupt_on:
+            raise HookInterruptException(reason="interrupt", state=state)
+        self.records.append(("pre", tool_arg, len(state.messages)))
+        return state
+
+    async def post_tool_call(
+        self,
+        name: str,
+        arguments: str,
+        response,
+        exception,
+        state: State,
+    ) -> State:
+        self.records.append(
+            ("post", json.loads(arguments)["name"], len(state.messages))
+        )
+        return state
+
+
+async def test_tool_calls_run_concurrently_in_order() -> None:
+    calls = [("a", SLEEP_SECONDS), ("b", SLEEP_SECONDS / 5), ("c", SLEEP_SECONDS)]
+    ctx = await build_context(calls)
+
+    start = time.perf_counter()
+    assert await ctx.completions.handle_tool_call()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < SLEEP_SECONDS * 2
+    tool_messages = ctx.state.messages[1:]
+    assert [m["tool_call_id"] for m in tool_messages] == [
+        "call_a",
+        "call_b",
+        "call_c",
+    ]
+
+
+async def test_serial_tools_do_not_overlap() -> None:
+    calls = [("a", SLEEP_SECONDS / 2), ("b", SLEEP_SECONDS / 2)]
+    ctx = await build_context(
+        calls, tool_executor=ToolCallExecutor(serial_tools=["slow_echo"])
+    )
+
+    start = time.perf_counter()
+    assert await ctx.completions.handle_tool_call()
+    assert time.perf_counter() - start >= SLEEP_SECONDS
+
+
+async def test_tool_call_timeout() -> None:
+    ctx = await build_context(
+        [("a", SLEEP_SECONDS)], tool_executor=ToolCallExecutor(timeout=0.05)
+    )
+
+    assert await ctx.completions.handle_tool_call()
+    assert "timed out" in ctx.state.messages[-1]["content"]
+
+
+async def test_hooks_wrap_each_call_in_order() -> None:
+    ctx = await build_context([("a", SLEEP_SECONDS), ("b", SLEEP_SECONDS)])
+    hook = RecordingHook()
+    ctx.set_pre_tool_call_hook(hook)
+    ctx.set_post_tool_call_hook(hook)
+
+    start = time.perf_counter()
+    assert await ctx.completions.handle_tool_call()
+    # the tool of a started right after its pre hook, before the one of b
+    assert time.perf_counter() - start < SLEEP_SECONDS * 1.5
+    # each call goes pre hook, tool, post hook; hooks run in call order and
+    # post hooks see the tool messages of their call and the calls before
+    assert hook.records == [
+        ("pre", "a", 1),
+        ("pre", "b", 1),
+        ("post", "a", 2),
+        ("post", "b", 3),
+    ]
+
+
+async def test_interrupt_still_runs_approved_calls() -> None:
+    ctx = await build_context([("a", 0.01), ("b", 0.01)])
+    ctx.set_pre_tool_call_hook(RecordingHook(interrupt_on="b"))
+
+    with pytest.raises(HookInterruptException):
+        await ctx.completions.handle_tool_call()
+    assert [m.get("tool_call_id") for m in ctx.state.messages[1:]] == ["call_a"]
+
+
+async def test_tool_call_stream_order() -> None:
+    calls = [("a", SLEEP_SECONDS), ("b", SLEEP_SECONDS / 5)]
+    ctx = await build_context(calls)
+
+    start = time.perf_counter()
+    chunks = [
+        c
+        async for c in ctx.completions.create_tool_call_stream()
+        if isinstance(c, ToolChunk) and c.tool_response is not None
+    ]
+    assert time.perf_counter() - start < SLEEP_SECONDS * 1.5
+    assert [c.tool_call_id for c in chunks] == ["call_a", "call_b"]
+    assert [m["tool_call_id"] for m in ctx.state.messages[1:]] == [
+        "call_a",
+        "call_b",
+    ]
+
+
+async def test_streamed_arguments_are_parsed_incrementally(monkeypatch) -> None:
+    arguments = json.dumps({"name": "a", "seconds": 0.01})
+    tool_call_chunks = [
+        build_chunk(
+            {
+                "role": "assistant",
+                "tool_calls": [
+                    {
+                        "index": 0,
+                        "id": "call_a",
+                        "type": "function",
+                        "function": {"name": "slow_echo", "arguments": ""},
+                    }
+                ],
+            }
+        )
+    ] + [
+        build_chunk({"tool_calls": [{"index": 0, "function": {"arguments": c}}]})
+        for c in arguments
+    ]
+    replies = [
+        tool_call_chunks + [build_chunk({}, finish_reason="tool_calls")],
+        [build_chunk({"role": "assistant", "content": "done"}, "stop")],
+    ]
+    partials = []
+
+    def record_partial() -> None:
+        parser = ctx.state.get_tool_arguments("call_a")
+        if parser is not None:
+            partials.append(dict(parser.partial or {}))
+
+    stub_completions(monkeypatch, replies, before_chunk=record_partial)
+    ctx = Context(model="test", tools=[slow_echo])
+    await ctx.init()
+
+    stream = await ctx.completions.create(
+        messages=[{"role": "user", "content": "hi"}], stream=True
+    )
+    tool_chunks = [c async for c in stream if isinstance(c, ToolChunk)]
+
+    assert {"name": "a"} in partials
+    assert tool_chunks[-1].parsed_arguments == {"name": "a", "seconds": 0.01}
+    assert tool_chunks[-1].tool_response is not None
+    assert ctx.state.messages[1]["tool_calls"][0]["function"]["arguments"] == (
+        arguments
+    )
+    assert ctx.state.get_tool_arguments("call_a") is None
@@ -0,0 +1,166 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import random
+
+import pytest
+
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.history import (
+    OMITTED_TOOL_RESULT,
+    DropToolResultsHistoryPolicy,
+    HistoryPolicy,
+    LastNHistoryPolicy,
+    TokenBudgetHistoryPolicy,
+    estimate_tokens,
+)
+from arkitect.core.component.context.model import State
+
+os.environ["ARK_API_KEY"] = "-"
+
+
+def build_history(turns: int, seed: int = 0) -> list[dict]:
+    rand = random.Random(seed)
+    messages: list[dict] = [{"role": "system", "content": "be helpful"}]
+    call = 0
+    for _ in range(turns):
+        messages.append({"role": "user", "content": "q" * rand.randint(1, 200)})
+        for _ in range(rand.randint(0, 2)):
+            ids = [f"call_{call + i}" for i in range(rand.randint(1, 3))]
+            call += len(ids)
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": "",
+                    "tool_calls": [
+                        {
+                            "id": i,
+                            "type": "function",
+                            "function": {"name": "search", "arguments": "{}"},
+                        }
+                        for i in ids
+                    ],
+                }
+            )
+            for i in ids:
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": i,
+                        "content": "r" * rand.randint(1, 2000),
+                    }
+                )
+        messages.append({"role": "assistant", "content": "a" * rand.randint(1, 200)})
+    return messages
+
+
+def assert_pairs_kept(selected: list[dict], history: list[dict]) -> None:
+    issued = {
+        tool_call["id"] for m in selected for tool_call in m.get("tool_calls") or []
+    }
+    answered = {m["tool_call_id"] for m in selected if m["role"] == "tool"}
+    in_history = {m["tool_call_id"] for m in history if m["role"] == "tool"}
+    assert answered <= issued
+    assert issued & in_history <= answered
+    assert selected[0] == history[0]
+    assert selected[-1]["content"] == history[-1]["content"]
+
+
+POLICIES = [
+    lambda: LastNHistoryPolicy(max_messages=7),
+    lambda: TokenBudgetHistoryPolicy(max_tokens=1500),
+    lambda: DropToolResultsHistoryPolicy(max_tokens=1500),
+]
+
+
+@pytest.mark.parametrize("build_policy", POLICIES)
+def test_tool_call_pairs_are_never_split(build_policy) -> None:
+    for seed in range(30):
+        history = build_history(20, seed)
+        policy: HistoryPolicy = build_policy()
+        state = State(messages=[])
+        for message in history:
+            state.messages.append(message)
+            snapshot = copy.deepcopy(list(state.messages))
+            selected = policy.select(state.messages)
+            assert_pairs_kept(selected, state.messages)
+            assert list(state.messages) == snapshot
+
+
+def test_last_n() -> None:
+    history = build_history(20)
+    selected = LastNHistoryPolicy(max_messages=7).select(history)
+    assert len(selected) <= 8
+    assert selected[1:] == history[len(history) - len(selected) + 1 :]
+
+
+def test_token_budget() -> None:
+    history = build_history(50)
+    selected = TokenBudgetHistoryPolicy(max_tokens=2000).select(history)
+    assert sum(estimate_tokens(m) for m in selected) <= 2000
+    assert len(selected) < len(history)
+
+
+def test_drop_tool_results_first() -> None:
+    history = build_history(10)
+    total = sum(estimate_tokens(m) for m in history)
+    policy = DropToolResultsHistoryPolicy(max_tokens=total // 2)
+    selected = policy.select(history)
+
+    # no message is dropped while omitting tool results is enough
+    assert len(selected) == len(history)
+    assert sum(estimate_tokens(m) for m in selected) <= total // 2
+    omitted = [m for m in selected if m.get("content") == OMITTED_TOOL_RESULT]
+    assert omitted and all(m["role"] == "tool" for m in omitted)
+    assert all(m["content"] != OMITTED_TOOL_RESULT for m in history)
+
+
+@pytest.mark.parametrize(
+    "policy_cls", [TokenBudgetHistoryPolicy, DropToolResultsHistoryPolicy]
+)
+def test_token_estimates_are_memoized(policy_cls) -> None:
+    estimated: list[int] = []
+
+    def estimator(message: dict) -> int:
+        estimated.append(id(message))
+        return estimate_tokens(message)
+
+    history = build_history(30)
+    policy = policy_cls(max_tokens=3000, estimator=estimator)
+    messages: list[dict] = []
+    for message in history:
+        messages.append(message)
+        policy.select(messages)
+    placeholders = 1 if policy_cls is DropToolResultsHistoryPolicy else 0
+    assert len(estimated) == len(history) + placeholders
+
+    # rewriting the history only estimates new messages
+    estimated.clear()
+    rewritten = messages[:1] + messages[10:] + [{"role": "user", "content": "x"}]
+    policy.select(rewritten)
+    assert len(estimated) == 1
+
+
+async def test_context_sends_windowed_history() -> None:
+    history = build_history(20)
+    ctx = Context(
+        model="test",
+        state=State(messages=history),
+        history_policy=LastNHistoryPolicy(max_messages=5),
+    )
+    assert len(ctx.get_request_messages()) <= 6
+    assert len(ctx.state.messages) == len(history)
+    assert Context(model="test").get_request_messages() == []
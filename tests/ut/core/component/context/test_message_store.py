@@ -0,0 +1,115 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import time
+
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.model import MessageStore, State
+
+os.environ["ARK_API_KEY"] = "-"
+
+HISTORY_SIZE = 10_000
+
+
+def build_history(size: int) -> list[dict]:
+    messages: list[dict] = [{"role": "system", "content": "system"}]
+    for i in range(size // 3):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {
+                        "id": f"call_{i}",
+                        "type": "function",
+                        "function": {"name": "search", "arguments": "{}"},
+                    }
+                ],
+            }
+        )
+        messages.append({"role": "tool", "tool_call_id": f"call_{i}", "content": ""})
+    return messages
+
+
+def scan_latest(messages: list[dict], role: str) -> dict | None:
+    for message in reversed(messages):
+        if message["role"] == role:
+            return message
+    return None
+
+
+def test_latest_message_by_role() -> None:
+    ctx = Context(model="test", state=State(messages=build_history(9)))
+    assert ctx.get_latest_message()["tool_calls"][0]["id"] == "call_2"
+    assert ctx.get_latest_message(role="user")["content"] == "question 2"
+    assert ctx.get_latest_message(role=None)["role"] == "tool"
+
+    ctx.state.messages.append({"role": "user", "content": "new"})
+    assert ctx.get_latest_message(role="user")["content"] == "new"
+    assert ctx.get_latest_message(role="system")["content"] == "system"
+
+
+def test_indexes_follow_mutations() -> None:
+    store = MessageStore(build_history(9))
+    assert store.tool_call_index("call_1") == 5
+    assert store.get_tool_result("call_1")["tool_call_id"] == "call_1"
+
+    del store[-3:]
+    assert store.latest("assistant")["tool_calls"][0]["id"] == "call_1"
+    assert store.get_tool_result("call_2") is None
+
+    store.insert(0, {"role": "system", "content": "first"})
+    assert store.tool_call_index("call_1") == 6
+    store[-1] = {"role": "user", "content": "replaced"}
+    assert store.get_tool_result("call_1") is None
+    assert store.latest("user")["content"] == "replaced"
+
+    store.clear()
+    assert store.latest() is None and store.latest("user") is None
+
+
+def test_state_keeps_store_on_assignment() -> None:
+    state = State(messages=build_history(9))
+    assert isinstance(state.messages, MessageStore)
+    dumped = state.model_dump_json()
+    assert state.model_dump_json() == dumped
+    assert json.loads(dumped)["messages"] == build_history(9)
+
+    state.messages = [{"role": "user", "content": "hi"}]
+    assert isinstance(state.messages, MessageStore)
+    copied = state.model_copy(update={"messages": [{"role": "user", "content": "x"}]})
+    assert copied.message_store.latest("user")["content"] == "x"
+
+
+def test_latest_message_benchmark() -> None:
+    history = build_history(HISTORY_SIZE)
+    ctx = Context(model="test", state=State(messages=history))
+    lookups = 1_000
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        scan_latest(history, "system")
+    scanned = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        ctx.get_latest_message(role="system")
+    indexed = time.perf_counter() - start
+
+    print(f"{HISTORY_SIZE} messages: scan {scanned:.4f}s, indexed {indexed:.4f}s")
+    assert ctx.get_latest_message(role="system") == scan_latest(history, "system")
+    assert indexed * 10 < scanned
@@ -0,0 +1,177 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+import os
+import time
+import tracemalloc
+
+import httpx
+from volcenginesdkarkruntime import AsyncArk
+
+from arkitect.core.component.context.context import Context
+from arkitect.core.component.context.model import MessageStore, State
+from arkitect.types.llm.model import ArkChatParameters
+from arkitect.utils.json import dump_json_str, dump_json_str_truncate
+
+os.environ["ARK_API_KEY"] = "-"
+
+HISTORY_SIZE = 5_000
+FORKS = 100
+
+
+def build_state(size: int) -> State:
+    return State(
+        context_id="ctx",
+        messages=[
+            {"role": "user" if i % 2 else "assistant", "content": f"message {i}"}
+            for i in range(size)
+        ],
+        parameters=ArkChatParameters(temperature=0.5),
+    )
+
+
+def completion(content: str) -> dict:
+    return {
+        "id": "completion",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "service_tier": "default",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }
+        ],
+    }
+
+
+def test_forks_are_independent() -> None:
+    state = build_state(10)
+    state.messages.append({"role": "tool", "tool_call_id": "call_0", "content": ""})
+    fork = state.fork()
+    state.messages.append({"role": "user", "content": "parent"})
+    fork.messages.append({"role": "user", "content": "child"})
+    fork.parameters.temperature = 1.0
+
+    assert len(state.messages) == len(fork.messages) == 12
+    assert state.messages[-1]["content"] == "parent"
+    assert fork.message_store.latest("user")["content"] == "child"
+    assert fork.message_store.get_tool_result("call_0") is state.messages[10]
+    assert state.parameters.temperature == 0.5
+
+    # rewriting one branch copies its messages and leaves the other intact
+    del fork.messages[:5]
+    fork.messages[0] = {"role": "system", "content": "rewritten"}
+    assert len(fork.messages) == 7
+    assert state.messages[0]["content"] == "message 0"
+    assert state.message_store.latest("system") is None
+    assert fork.message_store.latest("system")["content"] == "rewritten"
+
+
+def test_nested_forks() -> None:
+    store = MessageStore([{"role": "user", "content": "0"}])
+    stores = [store]
+    for i in range(1, 100):
+        store = store.fork()
+        store.append({"role": "user", "content": str(i)})
+        stores.append(store)
+    assert [m["content"] for m in stores[-1]] == [str(i) for i in range(100)]
+    assert stores[-1][-1] == stores[-1].latest("user")
+    assert [len(s) for s in stores[:3]] == [1, 2, 3]
+    assert stores[50][10:12] == [
+        {"role": "user", "content": "10"},
+        {"role": "user", "content": "11"},
+    ]
+    assert copy.copy(store) == store
+
+
+def test_serialization_unchanged() -> None:
+    state = build_state(10)
+    fork = state.fork()
+    fork.messages.append({"role": "user", "content": "more"})
+    plain = [dict(m) for m in fork.messages]
+
+    dumped = json.loads(fork.model_dump_json())
+    assert dumped["messages"] == plain
+    assert fork.model_dump()["messages"] == plain
+    assert isinstance(fork.model_dump()["messages"], list)
+    assert State.model_validate(dumped).messages == plain
+
+
+async def test_request_goes_through_sdk_serialization() -> None:
+    requests: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=completion("hi"))
+
+    client = AsyncArk(
+        api_key="-",
+        base_url="http://test/api/v3",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    state = State(messages=build_state(3).messages).fork()
+    ctx = Context(model="test", client=client, state=state)
+    await ctx.init()
+    response = await ctx.completions.create(
+        messages=[{"role": "user", "content": "hello"}], stream=False
+    )
+    assert response.choices[0].message.content == "hi"
+    assert requests[0]["messages"][-1] == {"role": "user", "content": "hello"}
+    assert len(requests[0]["messages"]) == 4
+
+
+def test_trace_dumps_are_truncated() -> None:
+    state = build_state(3)
+    assert json.loads(dump_json_str_truncate(state.messages, 3)) == [
+        {"role": "ass", "content": "mes"},
+        {"role": "use", "content": "mes"},
+        {"role": "ass", "content": "mes"},
+    ]
+    assert json.loads(dump_json_str(state.messages)) == list(state.messages)
+
+
+def test_fork_memory_benchmark() -> None:
+    state = build_state(HISTORY_SIZE)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    copies = [state.model_copy(deep=True) for _ in range(FORKS // 10)]
+    copy_seconds = (time.perf_counter() - start) * 10
+    copy_bytes = tracemalloc.get_traced_memory()[0] * 10
+    del copies
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    forks = [state.fork() for _ in range(FORKS)]
+    for i, fork in enumerate(forks):
+        fork.messages.append({"role": "user", "content": f"branch {i}"})
+    fork_seconds = time.perf_counter() - start
+    fork_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(
+        f"{FORKS} forks of {HISTORY_SIZE} messages: deep copy "
+        f"{copy_bytes / 2**20:.1f}MB {copy_seconds:.3f}s, fork "
+        f"{fork_bytes / 2**20:.3f}MB {fork_seconds:.4f}s"
+    )
+    assert fork_bytes * 100 < copy_bytes
+    assert fork_seconds * 10 < copy_seconds
+    assert forks[7].messages[-1]["content"] == "branch 7"
+    assert len(state.messages) == HISTORY_SIZE
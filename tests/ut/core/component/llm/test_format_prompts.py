@@ -0,0 +1,173 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import time
+
+import jinja2
+import pytest
+
+from arkitect.core.component.llm import utils
+from arkitect.core.component.llm.utils import (
+    _build_message,
+    _convert_ark_messages,
+    _convert_message_role_to_ark_role,
+    format_ark_prompts,
+)
+from arkitect.core.component.prompts import CustomPromptTemplate
+from arkitect.core.errors import InvalidParameter
+from arkitect.telemetry.trace import task
+from arkitect.types.llm.model import ArkMessage, ChatCompletionMessageToolCallParam
+
+MESSAGES = 500
+
+
+def build_template() -> CustomPromptTemplate:
+    return CustomPromptTemplate(
+        template=jinja2.Template("{{systems|join}} {{chat_history}} {{query}}"),
+        keep_history_questions=True,
+        keep_history_answers=True,
+        chat_history_keep_human=True,
+        chat_history_keep_ai=True,
+    )
+
+
+def tool_call(id: str, name: str = "search") -> dict:
+    return {
+        "id": id,
+        "type": "function",
+        "function": {"name": name, "arguments": '{"q": "x"}'},
+    }
+
+
+def build_history(n: int) -> list[ArkMessage]:
+    messages = [ArkMessage(role="system", content="be brief")]
+    for i in range(n):
+        if i % 5 == 3:
+            messages.append(
+                ArkMessage(
+                    role="assistant",
+                    content=f"calling\nthought {i}",
+                    tool_calls=[tool_call(f"call_{i}")],
+                )
+            )
+            messages.append(
+                ArkMessage(role="tool", content=f"result {i}", tool_call_id=f"call_{i}")
+            )
+        else:
+            role = "user" if i % 2 == 0 else "assistant"
+            messages.append(ArkMessage(role=role, content=f"message {i}"))
+    messages.append(ArkMessage(role="user", content="question"))
+    return messages
+
+
+def reference(messages: list[ArkMessage]) -> list:
+    tool_names = {}
+    converted = []
+    for message in messages:
+        for call in message.tool_calls or []:
+            tool_names[call.id] = call.function.name
+        converted.append(_build_message(message, tool_names.get(message.tool_call_id)))
+    return converted
+
+
+def test_memoized_conversion_matches_fresh_conversion() -> None:
+    messages = build_history(50)
+    first = _convert_ark_messages(messages)
+    assert first == reference(messages)
+    # unchanged messages are converted once
+    second = _convert_ark_messages(messages)
+    assert all(a is b for a, b in zip(first, second))
+
+    # reassigned fields are picked up
+    messages[1].content = "edited"
+    messages[4].tool_calls = [
+        ChatCompletionMessageToolCallParam(**tool_call("call_3", "lookup"))
+    ]
+    messages[5].role = "tool"
+    third = _convert_ark_messages(messages)
+    assert third == reference(messages)
+    assert third[1] is not first[1] and third[1].content == "edited"
+    assert third[5] is not first[5] and third[5].name == "lookup"
+    assert third[2] is first[2]
+
+
+def test_entries_are_released_with_messages() -> None:
+    messages = build_history(10)
+    _convert_ark_messages(messages)
+    keys = {id(message) for message in messages}
+    assert keys <= utils._converted_messages.keys()
+    del messages
+    gc.collect()
+    assert not keys & utils._converted_messages.keys()
+
+
+def test_tool_call_validation() -> None:
+    with pytest.raises(InvalidParameter):
+        _convert_ark_messages(
+            [ArkMessage(role="tool", content="orphan", tool_call_id="missing")]
+        )
+    unanswered = [
+        ArkMessage(role="assistant", content="", tool_calls=[tool_call("call_0")]),
+    ]
+    with pytest.raises(InvalidParameter):
+        _convert_ark_messages(unanswered)
+    # a cached conversion does not skip the validation
+    with pytest.raises(InvalidParameter):
+        _convert_ark_messages(unanswered + [ArkMessage(role="user", content="hi")])
+
+
+def test_format_ark_prompts() -> None:
+    messages = build_history(20)
+    prompts = format_ark_prompts(build_template(), messages)
+    assert prompts[-1].role == "user"
+    assert prompts[-1].content.endswith("question")
+    assert [p.model_dump() for p in prompts] == [
+        ArkMessage(role=p.role, content=p.content).model_dump() for p in prompts
+    ]
+
+
+@task()
+def legacy_format_ark_prompts(
+    template: CustomPromptTemplate, chat_messages: list[ArkMessage]
+) -> list[ArkMessage]:
+    messages = template.format_messages(messages=reference(chat_messages))
+    return [
+        ArkMessage(
+            role=_convert_message_role_to_ark_role(message.type),
+            content=message.content,
+        )
+        for message in messages
+    ]
+
+
+def test_format_benchmark() -> None:
+    template = build_template()
+    messages = build_history(MESSAGES)
+
+    elapsed = {}
+    for format in [legacy_format_ark_prompts, format_ark_prompts]:
+        format(template, messages)
+        start = time.perf_counter()
+        prompts = format(template, messages)
+        elapsed[format] = time.perf_counter() - start
+    legacy, memoized = elapsed.values()
+
+    print(
+        f"format {len(messages)} messages: traced and converted "
+        f"{legacy * 1e3:.1f}ms, memoized {memoized * 1e3:.1f}ms"
+    )
+    expected = legacy_format_ark_prompts(template, messages)
+    assert [p.model_dump() for p in prompts] == [p.model_dump() for p in expected]
+    assert memoized * 3 < legacy
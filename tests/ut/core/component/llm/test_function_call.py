@@ -0,0 +1,199 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+
+from volcenginesdkarkruntime.types.chat import ChatCompletion
+
+from arkitect.core.component.llm.function_call import handle_function_call
+from arkitect.core.component.tool.tool_pool import ToolPool, build_tool_pool
+from arkitect.types.llm.model import ArkChatRequest, ArkMessage, FunctionCallMode
+
+SLEEP_SECONDS = 0.05
+TOOLS = 20
+
+running = 0
+max_running = 0
+
+
+async def slow_echo(text: str, seconds: float = SLEEP_SECONDS) -> str:
+    """Sleep and echo the text back
+    Args:
+        text (str): value to echo
+        seconds (float): how long to sleep
+    Returns:
+        str: the text
+    """
+    global running, max_running
+    running += 1
+    max_running = max(max_running, running)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        running -= 1
+    return text
+
+
+async def fail(text: str) -> str:
+    """Always fail
+    Args:
+        text (str): ignored
+    Returns:
+        str: never
+    """
+    raise RuntimeError("boom")
+
+
+def build_response(calls: list[tuple[str, dict]]) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "completion",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test",
+            "service_tier": "default",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "role": "assistant",
+                        "tool_calls": [
+                            {
+                                "id": f"call_{i}",
+                                "type": "function",
+                                "function": {
+                                    "name": name,
+                                    "arguments": json.dumps(arguments),
+                                },
+                            }
+                            for i, (name, arguments) in enumerate(calls)
+                        ],
+                    },
+                }
+            ],
+        }
+    )
+
+
+async def build_pool() -> ToolPool:
+    tool_pool = build_tool_pool([slow_echo, fail])
+    assert tool_pool is not None
+    await tool_pool.initialize()
+    return tool_pool
+
+
+def build_request() -> ArkChatRequest:
+    return ArkChatRequest(
+        model="test", messages=[ArkMessage(role="user", content="hi")]
+    )
+
+
+def tool_messages(request: ArkChatRequest) -> list[tuple]:
+    return [(m.tool_call_id, m.content) for m in request.messages if m.role == "tool"]
+
+
+async def test_results_keep_call_order() -> None:
+    tool_pool = await build_pool()
+    # later calls finish first
+    calls = [
+        ("slow_echo", {"text": str(i), "seconds": SLEEP_SECONDS * (3 - i)})
+        for i in range(3)
+    ]
+    request = build_request()
+    assert await handle_function_call(
+        request, build_response(calls), tool_pool, FunctionCallMode.PARALLEL
+    )
+    assert request.messages[1].role == "assistant"
+    assert tool_messages(request) == [
+        ("call_0", "0"),
+        ("call_1", "1"),
+        ("call_2", "2"),
+    ]
+
+
+async def test_errors_are_isolated() -> None:
+    tool_pool = await build_pool()
+    calls = [
+        ("slow_echo", {"text": "ok"}),
+        ("fail", {"text": ""}),
+        ("slow_echo", {"text": "late", "seconds": 10}),
+        ("missing", {}),
+    ]
+    request = build_request()
+    assert await handle_function_call(
+        request,
+        build_response(calls),
+        tool_pool,
+        FunctionCallMode.PARALLEL,
+        timeout=SLEEP_SECONDS * 4,
+    )
+    results = tool_messages(request)
+    # unknown tools are skipped like in sequential mode
+    assert [id for id, _ in results] == ["call_0", "call_1", "call_2"]
+    assert results[0][1] == "ok"
+    assert "boom" in results[1][1]
+    assert "timed out" in results[2][1]
+
+
+async def test_concurrency_cap() -> None:
+    global max_running
+    tool_pool = await build_pool()
+    calls = [("slow_echo", {"text": str(i)}) for i in range(10)]
+    max_running = 0
+    await handle_function_call(
+        build_request(),
+        build_response(calls),
+        tool_pool,
+        FunctionCallMode.PARALLEL,
+        max_concurrency=3,
+    )
+    assert max_running == 3
+
+
+async def test_sequential_is_unchanged() -> None:
+    tool_pool = await build_pool()
+    calls = [("slow_echo", {"text": str(i)}) for i in range(3)]
+    sequential, parallel = build_request(), build_request()
+    await handle_function_call(sequential, build_response(calls), tool_pool)
+    await handle_function_call(
+        parallel, build_response(calls), tool_pool, FunctionCallMode.PARALLEL
+    )
+    assert tool_messages(sequential) == tool_messages(parallel)
+
+
+async def test_parallel_benchmark() -> None:
+    tool_pool = await build_pool()
+    calls = [("slow_echo", {"text": str(i)}) for i in range(TOOLS)]
+    elapsed = {}
+    for mode in [FunctionCallMode.SEQUENTIAL, FunctionCallMode.PARALLEL]:
+        start = time.perf_counter()
+        await handle_function_call(
+            build_request(),
+            build_response(calls),
+            tool_pool,
+            mode,
+            max_concurrency=TOOLS,
+        )
+        elapsed[mode] = time.perf_counter() - start
+
+    print(
+        f"{TOOLS} tools of {SLEEP_SECONDS}s: "
+        f"sequential {elapsed[FunctionCallMode.SEQUENTIAL]:.2f}s, "
+        f"parallel {elapsed[FunctionCallMode.PARALLEL]:.2f}s"
+    )
+    assert elapsed[FunctionCallMode.SEQUENTIAL] >= TOOLS * SLEEP_SECONDS
+    assert elapsed[FunctionCallMode.PARALLEL] < 4 * SLEEP_SECONDS
@@ -0,0 +1,241 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AsyncIterator, Iterator, Optional
+
+import pytest
+from chat_stubs import chunk
+from volcenginesdkarkruntime import AsyncArk
+
+from arkitect.core.component.llm import BaseChatLanguageModel, HedgePolicy
+from arkitect.core.component.llm.hedge import hedge
+from arkitect.types.llm.model import ArkMessage
+
+REQUESTS = 100
+CONCURRENCY = 10
+STALL = 1.0
+# every STALL_EVERY-th request stalls
+STALL_EVERY = 20
+
+
+STREAM = (
+    "".join(
+        f"data: {json.dumps(c)}\n\n"
+        for c in [
+            chunk({"role": "assistant", "content": "hello "}),
+            chunk({"role": "assistant", "content": "world"}, "stop"),
+        ]
+    ).encode()
+    + b"data: [DONE]\n\n"
+)
+
+
+class StallServer(ThreadingHTTPServer):
+    """Streams a reply, stalling before it for a few of the requests."""
+
+    daemon_threads = True
+    # hedges open connections while the others are still busy
+    request_queue_size = 64
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.hits = 0
+
+    def stalls(self) -> bool:
+        with self.lock:
+            self.hits += 1
+            return self.hits % STALL_EVERY == 1
+
+
+class StallHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(STREAM)))
+        self.end_headers()
+        self.wfile.flush()
+        # the response started but the first token is late
+        time.sleep(STALL if self.server.stalls() else 0.002)  # type: ignore
+        try:
+            self.wfile.write(STREAM)
+        except ConnectionError:
+            pass
+
+    def log_message(self, *args) -> None:  # type: ignore
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StallServer]:
+    server = StallServer(("127.0.0.1", 0), StallHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def stream_all(server: StallServer, policy: Optional[HedgePolicy]) -> None:
+    model = BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content="hello")],
+        client=AsyncArk(
+            base_url=f"http://127.0.0.1:{server.server_port}/api/v3",
+            api_key="stub",
+        ),
+        hedge_policy=policy,
+    )
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def stream_one() -> None:
+        async with semaphore:
+            chunks = [c async for c in model.astream()]
+            content = "".join(c.choices[0].delta.content for c in chunks)
+            assert content == "hello world"
+
+    await asyncio.gather(*[stream_one() for _ in range(REQUESTS)])
+
+
+async def test_hedging_races_stalled_streams(server: StallServer) -> None:
+    for policy in [
+        HedgePolicy(delay=0.12, budget=0.2),
+        HedgePolicy(initial_delay=0.12, budget=0.2),
+    ]:
+        hits = server.hits
+        await stream_all(server, policy)
+        # hedges are extra upstream requests, unless cancelled before sent
+        assert REQUESTS < server.hits - hits <= REQUESTS + policy.hedges
+        assert 0 < policy.hedges <= REQUESTS * policy.budget + policy.max_burst
+        # stalled requests were answered by their hedge
+        assert policy.hedge_wins > 0
+
+
+class Attempts:
+    """Streams of a fake upstream, each started after the next of ``delays``."""
+
+    def __init__(self, *delays: float, error: Optional[Exception] = None) -> None:
+        self.delays = list(delays)
+        self.error = error
+        self.sent = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    async def send(self) -> AsyncIterator[int]:
+        attempt = self.sent
+        delay = self.delays[attempt]
+        self.sent += 1
+
+        async def stream() -> AsyncIterator[int]:
+            try:
+                await asyncio.sleep(delay)
+                if self.error:
+                    raise self.error
+                for i in range(3):
+                    yield attempt * 10 + i
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            finally:
+                self.closed += 1
+
+        return stream()
+
+
+async def test_the_loser_is_cancelled() -> None:
+    policy = HedgePolicy(delay=0.01, budget=1)
+    attempts = Attempts(1, 0)
+    stream = await hedge(policy, attempts.send)
+    assert [c async for c in stream] == [10, 11, 12]
+    await asyncio.sleep(0)
+    assert attempts.sent == 2
+    assert attempts.cancelled == 1
+    assert attempts.closed == 2
+    assert (policy.requests, policy.hedges, policy.hedge_wins) == (1, 1, 1)
+
+    # a fast request is not hedged
+    attempts = Attempts(0)
+    stream = await hedge(policy, attempts.send)
+    assert [c async for c in stream] == [0, 1, 2]
+    assert attempts.sent == 1
+
+
+async def test_hedge_wins_do_not_shrink_the_delay() -> None:
+    policy = HedgePolicy(initial_delay=0.05, min_samples=5, budget=1)
+    for _ in range(10):
+        # the original stalls, its hedge answers at once
+        attempts = Attempts(1, 0.01)
+        stream = await hedge(policy, attempts.send)
+        assert [c async for c in stream] == [10, 11, 12]
+    assert policy.hedge_wins == 10
+    # the requests waited for the delay and the hedge, not only the hedge
+    assert policy.hedge_delay() >= 0.05
+
+
+async def test_failures() -> None:
+    policy = HedgePolicy(delay=0.01, budget=1)
+    attempts = Attempts(0, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        await hedge(policy, attempts.send)
+    # failing before the hedge delay is not hedged
+    assert attempts.sent == 1
+
+    attempts = Attempts(0.02, 0.02, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        await hedge(policy, attempts.send)
+    assert attempts.sent == 2
+
+    # cancelling the caller cancels both attempts
+    attempts = Attempts(1, 1)
+    caller = asyncio.ensure_future(hedge(policy, attempts.send))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0)
+    assert attempts.cancelled == 2
+
+
+def test_budget() -> None:
+    policy = HedgePolicy(budget=0.1, max_burst=2)
+    assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+    hedged = 0
+    for _ in range(100):
+        policy.on_request()
+        hedged += policy.try_hedge()
+    assert hedged == 10
+
+    # hedges saved up in quiet periods are capped
+    for _ in range(100):
+        policy.on_request()
+    assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+
+
+def test_rolling_delay() -> None:
+    policy = HedgePolicy(initial_delay=2, min_samples=10, window=100)
+    assert policy.hedge_delay() == 2
+    for ttft in range(1, 201):
+        policy.observe(ttft / 100)
+    # p95 of the last 100 samples
+    assert policy.hedge_delay() == 1.95
+    assert HedgePolicy(delay=0.5).hedge_delay() == 0.5
@@ -0,0 +1,260 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+
+import pytest
+from volcenginesdkarkruntime import AsyncArk
+
+from arkitect.core.component.llm import (
+    BaseChatLanguageModel,
+    BaseRateLimiter,
+    InProcessRateLimiter,
+    RedisRateLimiter,
+)
+from arkitect.core.component.llm.rate_limit import estimate_tokens, parse_retry_after
+from arkitect.types.llm.model import ArkMessage
+
+# quota of the stub server, per second with a burst of a tenth of a second
+QUOTA = 50
+REQUESTS = 60
+
+COMPLETION = json.dumps(
+    {
+        "id": "completion",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "hi"},
+                "finish_reason": "stop",
+            }
+        ],
+    }
+).encode()
+
+
+class QuotaServer(ThreadingHTTPServer):
+    """Token bucket quota answering 429 with Retry-After once exhausted."""
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.level = QUOTA / 10
+        self.updated = time.monotonic()
+        self.served = 0
+        self.limited = 0
+
+    def take(self) -> Optional[float]:
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.level + (now - self.updated) * QUOTA, QUOTA / 10)
+            self.updated = now
+            if self.level >= 1:
+                self.level -= 1
+                self.served += 1
+                return None
+            self.limited += 1
+            return (1 - self.level) / QUOTA
+
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        retry_after = self.server.take()  # type: ignore
+        if retry_after is None:
+            status, body = 200, COMPLETION
+        else:
+            status = 429
+            body = json.dumps(
+                {"error": {"code": "RateLimitExceeded", "message": "slow down"}}
+            ).encode()
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", f"{retry_after:.3f}")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:  # type: ignore
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[QuotaServer]:
+    server = QuotaServer(("127.0.0.1", 0), QuotaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def build_model(
+    server: QuotaServer, rate_limiter: Optional[BaseRateLimiter] = None
+) -> BaseChatLanguageModel:
+    return BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content="hello")],
+        client=AsyncArk(
+            base_url=f"http://127.0.0.1:{server.server_port}/api/v3",
+            api_key="stub",
+        ),
+        rate_limiter=rate_limiter,
+    )
+
+
+async def burst(model: BaseChatLanguageModel) -> tuple[int, float]:
+    """Successful requests of a burst and how long it took."""
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[model.arun() for _ in range(REQUESTS)], return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    return sum(not isinstance(r, Exception) for r in results), elapsed
+
+
+async def test_goodput_benchmark(server: QuotaServer) -> None:
+    blind, blind_elapsed = await burst(build_model(server))
+    blind_limited = server.limited
+
+    await asyncio.sleep(0.2)
+    server.limited = 0
+    # configured a little under the quota
+    limiter = InProcessRateLimiter(
+        requests_per_minute=QUOTA * 60 * 0.9, burst_seconds=0.1
+    )
+    paced, paced_elapsed = await burst(build_model(server, limiter))
+
+    print(
+        f"{REQUESTS} requests against {QUOTA} rps: "
+        f"sdk retries {blind} ok, {blind_limited} 429s, "
+        f"{blind / blind_elapsed:.1f} rps goodput; "
+        f"rate limited {paced} ok, {server.limited} 429s, "
+        f"{paced / paced_elapsed:.1f} rps goodput"
+    )
+    assert paced == REQUESTS
+    assert server.limited * 10 < blind_limited
+    assert paced / paced_elapsed > 1.5 * blind / blind_elapsed
+
+
+async def test_adapts_to_quota(server: QuotaServer) -> None:
+    # configured far above the quota, the 429s bring the rate down
+    limiter = InProcessRateLimiter(requests_per_minute=QUOTA * 60 * 4)
+    model = build_model(server, limiter)
+    results = await asyncio.gather(*[model.arun() for _ in range(20)])
+    assert all(r.choices[0].message.content == "hi" for r in results)
+    assert server.limited > 0
+    key = f"{model.client._base_url}test"
+    assert limiter.scale(key) < 1
+
+    # successes bring it back up
+    for _ in range(40):
+        await limiter.on_success(key)
+    assert limiter.scale(key) == 1
+
+
+async def test_token_bucket() -> None:
+    limiter = InProcessRateLimiter(tokens_per_minute=3000)
+    start = time.monotonic()
+    await limiter.acquire("k", 50)
+    assert time.monotonic() - start < 0.05
+    # 50 tokens per second
+    await limiter.acquire("k", 10)
+    assert 0.15 < time.monotonic() - start < 0.4
+
+    # a request above the bucket size waits for a full bucket and leaves it in
+    # debt
+    start = time.monotonic()
+    await limiter.acquire("k", 200)
+    await limiter.acquire("k", 1)
+    assert time.monotonic() - start > 1
+
+
+async def test_retry_after_pauses_the_endpoint() -> None:
+    limiter = InProcessRateLimiter(requests_per_minute=6000, decrease=0.5)
+    await limiter.acquire("k", 1)
+    await limiter.on_rate_limited("k", 0.2)
+    assert limiter.scale("k") == 0.5
+    start = time.monotonic()
+    await limiter.acquire("k", 1)
+    assert time.monotonic() - start >= 0.19
+    # other endpoints are not affected
+    start = time.monotonic()
+    await limiter.acquire("other", 1)
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(100):
+        await limiter.on_rate_limited("k", None)
+    assert limiter.scale("k") == limiter.min_scale
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after({"retry-after": "2"}) == 2
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "9"}) == 1.5
+    assert parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert parse_retry_after({"retry-after": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+
+def test_estimate_tokens() -> None:
+    english = {"messages": [{"role": "user", "content": "hello world " * 100}]}
+    chinese = {"messages": [{"role": "user", "content": "你好世界" * 100}]}
+    # at least 4 characters per token in english and 1 in chinese
+    assert 300 <= estimate_tokens(english) < 600
+    assert 400 <= estimate_tokens(chinese) < 500
+    with_tools = {**english, "tools": [{"type": "function", "function": {"name": "f"}}]}
+    assert estimate_tokens(with_tools) > estimate_tokens(english)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("REDIS_HOST"), reason="needs a redis server in REDIS_HOST"
+)
+async def test_redis_limiter_is_shared() -> None:
+    def build() -> RedisRateLimiter:
+        return RedisRateLimiter(
+            os.environ["REDIS_HOST"],
+            os.environ.get("REDIS_USERNAME", ""),
+            os.environ.get("REDIS_PASSWORD", ""),
+            requests_per_minute=600,
+            prefix=f"test:{uuid.uuid4()}:",
+        )
+
+    # two processes sharing 10 requests per second
+    first, second = build(), build()
+    start = time.monotonic()
+    for _ in range(10):
+        await first.acquire("k", 1)
+        await second.acquire("k", 1)
+    assert time.monotonic() - start > 0.9
+
+    await first.on_rate_limited("k", 0.3)
+    start = time.monotonic()
+    await second.acquire("k", 1)
+    assert time.monotonic() - start >= 0.25
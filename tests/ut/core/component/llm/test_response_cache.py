@@ -0,0 +1,296 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Optional
+
+import pytest
+from chat_stubs import chunk
+from volcenginesdkarkruntime import AsyncArk
+from volcenginesdkarkruntime.types.chat import ChatCompletionChunk
+
+from arkitect.core.component.llm import (
+    BaseChatLanguageModel,
+    InMemoryResponseCache,
+    RedisResponseCache,
+)
+from arkitect.core.component.llm.cache import compact_chunks, make_cache_key
+from arkitect.types.llm.model import ArkChatParameters, ArkMessage
+
+RUNS = 5
+
+USAGE = {"prompt_tokens": 3, "completion_tokens": 4, "total_tokens": 7}
+
+
+def completion() -> dict:
+    return {
+        "id": "completion",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "hello world"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": USAGE,
+    }
+
+
+STREAM = [
+    chunk({"role": "assistant", "reasoning_content": "think "}),
+    chunk({"reasoning_content": "hard"}),
+    chunk({"content": "hello "}),
+    chunk({"content": "world"}),
+    chunk({}, "stop"),
+    {**chunk({}), "choices": [], "usage": USAGE},
+]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    hits = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.hits += 1  # type: ignore
+        if body.get("stream"):
+            content_type = "text/event-stream"
+            payload = "".join(f"data: {json.dumps(c)}\n\n" for c in STREAM)
+            payload += "data: [DONE]\n\n"
+        else:
+            content_type = "application/json"
+            payload = json.dumps(completion())
+        data = payload.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:  # type: ignore
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def build_model(server: StubServer, **kwargs: Any) -> BaseChatLanguageModel:
+    return BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content="hello")],
+        client=AsyncArk(
+            base_url=f"http://127.0.0.1:{server.server_port}/api/v3",
+            api_key="stub",
+        ),
+        parameters=ArkChatParameters(temperature=0),
+        **kwargs,
+    )
+
+
+async def collect(model: BaseChatLanguageModel) -> list:
+    return [c async for c in model.astream()]
+
+
+async def test_arun_is_served_from_cache(server: StubServer) -> None:
+    cache = InMemoryResponseCache()
+    model = build_model(server, response_cache=cache)
+    responses = [await model.arun() for _ in range(RUNS)]
+    assert server.hits == 1
+    assert all(r == responses[0] for r in responses)
+    assert responses[0].choices[0].message.content == "hello world"
+    assert responses[0].usage.total_tokens == 7
+
+    # a model without a cache always goes upstream
+    uncached = build_model(server)
+    for _ in range(RUNS):
+        await uncached.arun()
+    assert server.hits == 1 + RUNS
+
+
+async def test_astream_is_replayed(server: StubServer) -> None:
+    model = build_model(server, response_cache=InMemoryResponseCache())
+    upstream = await collect(model)
+    replays = [await collect(model) for _ in range(RUNS)]
+    assert server.hits == 1
+
+    def summary(chunks: list) -> tuple:
+        content = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+        reasoning = "".join(
+            c.choices[0].delta.reasoning_content or "" for c in chunks if c.choices
+        )
+        finish = [c.choices[0].finish_reason for c in chunks if c.choices]
+        usage = [c.usage.model_dump(exclude_none=True) for c in chunks if c.usage]
+        return content, reasoning, finish[-1], usage
+
+    expected = ("hello world", "think hard", "stop", [USAGE])
+    assert summary(upstream) == expected
+    for replay in replays:
+        # one folded chunk and the usage chunk
+        assert len(replay) == 2
+        assert summary(replay) == expected
+
+
+async def test_requests_are_keyed_by_content(server: StubServer) -> None:
+    cache = InMemoryResponseCache()
+    model = build_model(server, response_cache=cache)
+    await model.arun()
+    await model.astream().__anext__()
+    assert server.hits == 2
+
+    model.parameters = ArkChatParameters(temperature=0, max_tokens=10)
+    await model.arun()
+    model.messages = [ArkMessage(role="user", content="bye")]
+    await model.arun()
+    await model.arun(extra_query={"q": "1"})
+    assert server.hits == 5
+    assert len(cache) == 4
+
+    # another endpoint is another entry
+    other = build_model(server, response_cache=cache)
+    other.client = AsyncArk(
+        base_url=f"http://localhost:{server.server_port}/api/v3", api_key="stub"
+    )
+    await other.arun()
+    assert server.hits == 6
+
+
+async def test_sampled_requests_go_upstream(server: StubServer) -> None:
+    cache = InMemoryResponseCache()
+    model = build_model(server, response_cache=cache)
+    model.parameters = ArkChatParameters(temperature=0.7)
+    for _ in range(RUNS):
+        await model.arun()
+        await collect(model)
+    assert server.hits == 2 * RUNS
+    assert len(cache) == 0
+
+    # a fixed seed makes the response reproducible again
+    for _ in range(RUNS):
+        await model.arun(extra_body={"seed": 1})
+    assert server.hits == 2 * RUNS + 1
+
+
+def test_cache_key_is_canonical() -> None:
+    params = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    reordered = {"messages": [{"content": "hi", "role": "user"}], "model": "m"}
+    assert make_cache_key("e", params) == make_cache_key("e", reordered)
+    assert make_cache_key("e", params) != make_cache_key("f", params)
+    assert make_cache_key("e", params) != make_cache_key("e", {**params, "seed": 1})
+
+
+async def test_in_memory_limits(monkeypatch) -> None:
+    cache = InMemoryResponseCache(max_entries=2, max_bytes=10)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+    # the least recently used entry is evicted
+    assert [await cache.get(k) for k in "abc"] == ["1", None, "3"]
+
+    await cache.set("d", "x" * 9)
+    assert cache.size <= 10 and await cache.get("d") == "x" * 9
+    await cache.set("e", "x" * 11)
+    assert await cache.get("e") is None
+    # the size is counted in bytes, not characters
+    await cache.set("f", "好" * 4)
+    assert await cache.get("f") is None
+
+    now = [0.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+    cache = InMemoryResponseCache(ttl=10)
+    await cache.set("a", "1")
+    now[0] = 9
+    assert await cache.get("a") == "1"
+    now[0] = 10
+    assert await cache.get("a") is None
+    assert cache.size == 0
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict = {}
+        self.expiry: dict = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, px: Optional[int] = None) -> None:
+        self.values[key] = value.encode()
+        self.expiry[key] = px
+
+
+class BrokenRedis:
+    async def get(self, key: str) -> None:
+        raise ConnectionError("down")
+
+    async def set(self, key: str, value: str, px: Optional[int] = None) -> None:
+        raise ConnectionError("down")
+
+
+async def test_redis_backend(server: StubServer) -> None:
+    cache = RedisResponseCache(host="localhost", username="", password="", ttl=60)
+    fake = FakeRedis()
+    cache.redis_client.client = fake  # type: ignore
+    model = build_model(server, response_cache=cache)
+    first = await model.arun()
+    assert await model.arun() == first
+    assert [c.usage for c in await collect(model) if c.usage]
+    assert len(await collect(model)) == 2
+    assert server.hits == 2
+    assert all(k.startswith("arkitect:llm_cache:") for k in fake.values)
+    assert set(fake.expiry.values()) == {60_000}
+
+    # a failing backend only disables caching
+    cache.redis_client.client = BrokenRedis()  # type: ignore
+    assert await model.arun() == first
+    assert server.hits == 3
+
+
+def test_tool_calls_are_folded() -> None:
+    call = {"index": 0, "id": "call_0", "type": "function"}
+    chunks = [
+        chunk({"role": "assistant", "content": ""}),
+        chunk({"tool_calls": [{**call, "function": {"name": "f", "arguments": ""}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '{"a"'}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": ": 1}"}}]}),
+        chunk({}, "tool_calls"),
+    ]
+    folded = compact_chunks([ChatCompletionChunk.model_validate(c) for c in chunks])
+    assert len(folded) == 1
+    choice = ChatCompletionChunk.model_validate(folded[0]).choices[0]
+    assert choice.finish_reason == "tool_calls"
+    assert choice.delta.tool_calls[0].id == "call_0"
+    assert choice.delta.tool_calls[0].function.name == "f"
+    assert choice.delta.tool_calls[0].function.arguments == '{"a": 1}'
+
+    # an interrupted stream is not cached
+    unfinished = [ChatCompletionChunk.model_validate(c) for c in chunks[:-1]]
+    assert compact_chunks(unfinished) == []
@@ -0,0 +1,364 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gc
+import json
+import weakref
+from collections import Counter
+from typing import Any, AsyncIterator, Optional
+
+import pytest
+from chat_stubs import chunk
+from volcenginesdkarkruntime import AsyncArk
+from volcenginesdkarkruntime.resources.chat.completions import AsyncCompletions
+from volcenginesdkarkruntime.types.chat import ChatCompletion, ChatCompletionChunk
+
+from arkitect.core.component.llm import BaseChatLanguageModel, SingleFlight
+from arkitect.types.llm.model import ArkMessage
+
+USERS = 20
+DELAY = 0.01
+
+
+class Upstream:
+    """Fake upstream counting calls, streaming ``chunks`` then failing if set."""
+
+    def __init__(self, chunks: int = 5, error: Optional[Exception] = None) -> None:
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+        self.closed = 0
+        self.cancelled = 0
+
+    async def call(self) -> dict:
+        self.calls += 1
+        try:
+            await asyncio.sleep(DELAY)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return {"value": self.calls}
+
+    async def stream(self) -> AsyncIterator[int]:
+        self.calls += 1
+
+        async def iterator() -> AsyncIterator[int]:
+            try:
+                for i in range(self.chunks):
+                    await asyncio.sleep(DELAY)
+                    yield i
+                if self.error:
+                    raise self.error
+            finally:
+                self.closed += 1
+
+        return iterator()
+
+
+async def consume(group: SingleFlight, upstream: Upstream, key: str = "k") -> list:
+    return [chunk async for chunk in await group.stream(key, upstream.stream)]
+
+
+async def test_concurrent_calls_share_one_upstream() -> None:
+    group, upstream = SingleFlight(), Upstream()
+    results = await asyncio.gather(
+        *[group.call("k", upstream.call) for _ in range(USERS)]
+    )
+    assert upstream.calls == 1
+    assert all(r == {"value": 1} for r in results)
+    # followers get their own copy
+    assert len({id(r) for r in results}) == USERS
+    assert len(group) == 0
+
+    # only in-flight calls are shared
+    assert await group.call("k", upstream.call) == {"value": 2}
+    await asyncio.gather(group.call("a", upstream.call), group.call("b", upstream.call))
+    assert upstream.calls == 4
+
+
+async def test_call_errors_reach_every_caller() -> None:
+    group, upstream = SingleFlight(), Upstream(error=ValueError("boom"))
+    results = await asyncio.gather(
+        *[group.call("k", upstream.call) for _ in range(3)], return_exceptions=True
+    )
+    assert upstream.calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(group) == 0
+
+
+async def test_call_cancellation() -> None:
+    group, upstream = SingleFlight(), Upstream()
+    first = asyncio.ensure_future(group.call("k", upstream.call))
+    second = asyncio.ensure_future(group.call("k", upstream.call))
+    await asyncio.sleep(0)
+    first.cancel()
+    # the other caller still gets the result
+    assert await second == {"value": 1}
+    assert upstream.cancelled == 0
+
+    # the upstream call is cancelled once nobody waits for it
+    callers = [asyncio.ensure_future(group.call("k", upstream.call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert upstream.cancelled == 1
+    assert len(group) == 0
+
+
+async def test_stream_fans_out_to_every_subscriber() -> None:
+    group, upstream = SingleFlight(), Upstream()
+
+    async def late() -> list:
+        await asyncio.sleep(DELAY * 2.5)
+        return await consume(group, upstream)
+
+    results = await asyncio.gather(
+        *[consume(group, upstream) for _ in range(5)], late()
+    )
+    assert upstream.calls == 1
+    # a late subscriber still reads the stream from the start
+    assert all(r == list(range(5)) for r in results)
+    assert upstream.closed == 1
+    assert len(group) == 0
+
+
+async def test_stream_subscriber_cancellation() -> None:
+    group, upstream = SingleFlight(), Upstream()
+    seen: list = []
+
+    async def slow() -> None:
+        async for c in await group.stream("k", upstream.stream):
+            seen.append(c)
+
+    cancelled = asyncio.ensure_future(slow())
+    others = asyncio.gather(*[consume(group, upstream) for _ in range(3)])
+    await asyncio.sleep(DELAY * 2.5)
+    cancelled.cancel()
+    assert await others == [list(range(5))] * 3
+    assert 0 < len(seen) < 5
+    assert upstream.calls == 1
+
+    # the upstream stream is closed once every subscriber left
+    upstream = Upstream(chunks=100)
+    subscribers = [asyncio.ensure_future(consume(group, upstream)) for _ in range(3)]
+    await asyncio.sleep(DELAY * 2.5)
+    for subscriber in subscribers:
+        subscriber.cancel()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert upstream.closed == 1
+    assert len(group) == 0
+
+
+async def test_unread_subscription_is_released() -> None:
+    group, upstream = SingleFlight(), Upstream(chunks=100)
+    subscription = await group.stream("k", upstream.stream)
+    unread = await group.stream("k", upstream.stream)
+    assert group._streams["k"].subscribers == 2
+    del unread
+    gc.collect()
+    assert group._streams["k"].subscribers == 1
+
+    # the upstream stream is closed even though nobody ever read it
+    await subscription.aclose()
+    await asyncio.sleep(0)
+    assert upstream.closed == 1
+    assert len(group) == 0
+
+
+async def test_stream_errors_reach_every_subscriber() -> None:
+    group, upstream = SingleFlight(), Upstream(chunks=3, error=ValueError("boom"))
+    seen: list[list] = [[] for _ in range(3)]
+
+    async def subscriber(index: int) -> None:
+        async for c in await group.stream("k", upstream.stream):
+            seen[index].append(c)
+
+    results = await asyncio.gather(
+        *[subscriber(i) for i in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    # the chunks before the failure were delivered first
+    assert seen == [[0, 1, 2]] * 3
+    assert upstream.calls == 1
+
+    # failures to start the stream are raised by stream() itself
+    async def refused() -> AsyncIterator[int]:
+        raise ConnectionError("refused")
+
+    with pytest.raises(ConnectionError):
+        await group.stream("k", refused)
+    assert len(group) == 0
+
+
+async def test_memory_is_released() -> None:
+    group, upstream = SingleFlight(), Upstream(chunks=50)
+    subscription = await group.stream("k", upstream.stream)
+    flight = weakref.ref(group._streams["k"])
+    assert [chunk async for chunk in subscription] == list(range(50))
+    await asyncio.sleep(0)
+    assert len(group) == 0
+    del subscription
+    gc.collect()
+    assert flight() is None
+
+
+def completion() -> dict:
+    return {
+        "id": "completion",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "service_tier": "default",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "faq answer"},
+            }
+        ],
+    }
+
+
+looked_up: list[str] = []
+
+
+def lookup(topic: str) -> str:
+    """Look up a topic
+    Args:
+        topic (str): what to look up
+    Returns:
+        str: the answer
+    """
+    looked_up.append(topic)
+    return f"about {topic}"
+
+
+TOOL_CALL = {"index": 0, "id": "call_0", "type": "function"}
+
+USAGE_CHUNK = {
+    **chunk({}),
+    "choices": [],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+}
+
+REPLIES = {
+    "faq": [
+        chunk({"role": "assistant", "content": "faq "}),
+        chunk({"content": "answer"}, "stop"),
+        USAGE_CHUNK,
+    ],
+    "tool": [
+        chunk(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {**TOOL_CALL, "function": {"name": "lookup", "arguments": '{"to'}}
+                ],
+            }
+        ),
+        chunk(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [{"index": 0, "function": {"arguments": 'pic": "x"}'}}],
+            }
+        ),
+        chunk({"role": "assistant", "content": ""}, "tool_calls"),
+        USAGE_CHUNK,
+    ],
+}
+
+
+@pytest.fixture
+def hits(monkeypatch) -> Counter:
+    hits: Counter = Counter()
+
+    async def fake_create(self, *args, **kwargs):  # type: ignore
+        messages = kwargs["messages"]
+        reply = "tool" if messages[-1]["content"] == "tool" else "faq"
+        hits[reply] += 1
+        await asyncio.sleep(DELAY)
+        if not kwargs.get("stream"):
+            return ChatCompletion.model_validate(completion())
+
+        async def iterator():  # type: ignore
+            for c in REPLIES[reply]:
+                # usage comes a while after the end of the reply
+                await asyncio.sleep(DELAY * 5 if "usage" in c else DELAY)
+                yield ChatCompletionChunk.model_validate(json.loads(json.dumps(c)))
+
+        return iterator()
+
+    monkeypatch.setattr(AsyncCompletions, "create", fake_create)
+    return hits
+
+
+def build_model(
+    group: Optional[SingleFlight], content: str = "faq"
+) -> BaseChatLanguageModel:
+    return BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content=content)],
+        client=AsyncArk(api_key="-"),
+        single_flight=group,
+    )
+
+
+async def collect(model: BaseChatLanguageModel, **kwargs: Any) -> tuple:
+    chunks = [c async for c in model.astream(**kwargs)]
+    content = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    usage = [c.usage.total_tokens for c in chunks if c.usage]
+    return content, usage
+
+
+async def test_faq_burst_is_one_upstream_call(hits: Counter) -> None:
+    group = SingleFlight()
+    responses = await asyncio.gather(*[build_model(group).arun() for _ in range(USERS)])
+    assert hits["faq"] == 1
+    assert all(r.choices[0].message.content == "faq answer" for r in responses)
+
+    streams = await asyncio.gather(*[collect(build_model(group)) for _ in range(USERS)])
+    assert hits["faq"] == 2
+    assert streams == [("faq answer", [3])] * USERS
+
+    # without a group every user goes upstream
+    await asyncio.gather(*[build_model(None).arun() for _ in range(USERS)])
+    assert hits["faq"] == 2 + USERS
+    assert len(group) == 0
+
+
+async def test_shared_tool_call_stream(hits: Counter) -> None:
+    group = SingleFlight()
+
+    looked_up.clear()
+
+    async def user(late: bool) -> tuple:
+        # the late user joins after the others handled the tool call
+        while late and not looked_up:
+            await asyncio.sleep(DELAY / 10)
+        return await collect(build_model(group, content="tool"), functions=[lookup])
+
+    results = await asyncio.gather(*[user(False) for _ in range(4)], user(True))
+    # every user parsed the whole arguments and ran the same tool call
+    assert hits["tool"] == 1
+    assert hits["faq"] == 1
+    assert results == [("faq answer", [6])] * 5
+    assert looked_up == ["x"] * 5
@@ -0,0 +1,140 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+from volcenginesdkarkruntime import AsyncArk
+
+from arkitect.core.client import ArkClientPool, get_ark_client_pool
+from arkitect.core.component.llm import BaseChatLanguageModel
+from arkitect.types.llm.model import ArkMessage
+
+os.environ["ARK_API_KEY"] = "-"
+
+CALLS = 100
+
+COMPLETION = json.dumps(
+    {
+        "id": "completion",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "hi"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+).encode()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    accepted = 0
+
+    def get_request(self):  # type: ignore
+        request = super().get_request()
+        self.accepted += 1
+        return request
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, *args) -> None:  # type: ignore
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def build_model(server: StubServer) -> BaseChatLanguageModel:
+    return BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content="hello")],
+        client=AsyncArk(
+            base_url=f"http://127.0.0.1:{server.server_port}/api/v3",
+            api_key="stub",
+        ),
+    )
+
+
+def test_sync_run_reuses_connection(server: StubServer) -> None:
+    model = build_model(server)
+    for _ in range(CALLS):
+        assert model.run().choices[0].message.content == "hi"
+    assert server.accepted == 1
+
+
+def test_connection_shared_across_threads(server: StubServer) -> None:
+    model = build_model(server)
+    model.run()
+    for _ in range(4):
+        thread = threading.Thread(target=lambda: [model.run() for _ in range(10)])
+        thread.start()
+        thread.join()
+    assert server.accepted == 1
+
+
+def test_clients_are_keyed_by_config(server: StubServer) -> None:
+    pool = ArkClientPool()
+    base_url = f"http://127.0.0.1:{server.server_port}/api/v3"
+    client = pool.get_client(base_url=base_url, api_key="a")
+    assert pool.get_client(base_url=base_url, api_key="a") is client
+    assert pool.get_client(base_url=base_url, api_key="b") is not client
+    assert pool.get_client(base_url=base_url, api_key="a", timeout=5) is not client
+
+    other: list = []
+    thread = threading.Thread(
+        target=lambda: other.append(pool.get_client(base_url=base_url, api_key="a"))
+    )
+    thread.start()
+    thread.join()
+    # one client per thread on top of the shared connections
+    assert other[0] is not client
+    assert other[0]._client is client._client
+
+    pool.close()
+    assert client._client.is_closed
+    reopened = pool.get_client(base_url=base_url, api_key="a")
+    assert not reopened._client.is_closed
+    pool.close()
+
+
+def test_process_wide_pool() -> None:
+    assert get_ark_client_pool() is get_ark_client_pool()
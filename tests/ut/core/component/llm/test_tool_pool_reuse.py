@@ -0,0 +1,204 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from collections import Counter
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from volcenginesdkarkruntime import AsyncArk
+from volcenginesdkarkruntime.resources.chat.completions import AsyncCompletions
+from volcenginesdkarkruntime.types.chat import ChatCompletion, ChatCompletionChunk
+
+from arkitect.core.component.llm import BaseChatLanguageModel
+from arkitect.core.component.tool import tool_pool as tool_pool_module
+from arkitect.core.component.tool.mcp_client import MCPClient
+from arkitect.core.component.tool.tool_pool import build_tool_pool
+from arkitect.types.llm.model import ArkMessage
+
+RUNS = 5
+
+DYNAMIC_SERVER = os.path.join(
+    os.path.dirname(__file__), "..", "tool", "dummy_mcp_server_dynamic.py"
+)
+
+
+def adder(a: int, b: int) -> int:
+    """Add two integer numbers
+    Args:
+        a (int): first number
+        b (int): second number
+    Returns:
+        int: sum result
+    """
+    return a + b
+
+
+def greeting(name: str) -> str:
+    """Greet a person
+    Args:
+        name (str): name of the person
+    Returns:
+        str: greeting message
+    """
+    return f"Hello, {name}!"
+
+
+COMPLETION = {
+    "id": "completion",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "test",
+    "service_tier": "default",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "hi"},
+        }
+    ],
+}
+
+
+@pytest.fixture
+def calls(monkeypatch) -> Counter:
+    """Count tool conversions, tool listings and the tools sent per request."""
+    calls: Counter = Counter()
+    convert = tool_pool_module.mcp_to_chat_completion_tool
+    list_tools = FastMCP.list_tools
+
+    def counting_convert(tool):  # type: ignore
+        calls["convert"] += 1
+        return convert(tool)
+
+    async def counting_list_tools(self):  # type: ignore
+        calls["list_tools"] += 1
+        return await list_tools(self)
+
+    async def fake_create(self, *args, **kwargs):  # type: ignore
+        calls[tuple(t["function"]["name"] for t in kwargs.get("tools", []))] += 1
+        if not kwargs.get("stream"):
+            return ChatCompletion.model_validate(COMPLETION)
+
+        async def iterator():  # type: ignore
+            yield ChatCompletionChunk.model_validate(
+                {
+                    **COMPLETION,
+                    "object": "chat.completion.chunk",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "delta": {"role": "assistant", "content": "hi"},
+                        }
+                    ],
+                }
+            )
+
+        return iterator()
+
+    monkeypatch.setattr(
+        tool_pool_module, "mcp_to_chat_completion_tool", counting_convert
+    )
+    monkeypatch.setattr(FastMCP, "list_tools", counting_list_tools)
+    monkeypatch.setattr(AsyncCompletions, "create", fake_create)
+    return calls
+
+
+def build_model(**kwargs) -> BaseChatLanguageModel:  # type: ignore
+    return BaseChatLanguageModel(
+        model="test",
+        messages=[ArkMessage(role="user", content="hello")],
+        client=AsyncArk(api_key="-"),
+        **kwargs,
+    )
+
+
+async def test_pool_is_built_once_per_model(calls: Counter) -> None:
+    model = build_model()
+    for _ in range(RUNS):
+        await model.arun(functions=[adder, greeting])
+        async for _ in model.astream(functions=[adder, greeting]):
+            pass
+
+    assert calls[("adder", "greeting")] == 2 * RUNS
+    assert calls["convert"] == 2
+    assert calls["list_tools"] == 1
+
+
+async def test_pool_is_rebuilt_when_functions_change(calls: Counter) -> None:
+    model = build_model()
+    functions = [adder]
+    await model.arun(functions=functions)
+    first = model.get_tool_pool(functions)
+    # an equal list keeps the pool
+    assert model.get_tool_pool([adder]) is first
+
+    functions.append(greeting)
+    await model.arun(functions=functions)
+    assert model.get_tool_pool(functions) is not first
+    await model.arun()
+
+    assert calls[("adder",)] == 1
+    assert calls[("adder", "greeting")] == 1
+    assert calls[()] == 1
+    assert calls["convert"] == 3
+
+
+async def test_injected_pool_is_shared(calls: Counter) -> None:
+    shared = build_tool_pool([adder, greeting])
+    models = [build_model(tool_pool=shared) for _ in range(10)]
+    for model in models:
+        await model.arun()
+        assert model.get_tool_pool() is shared
+
+    assert calls[("adder", "greeting")] == len(models)
+    assert calls["convert"] == 2
+    assert calls["list_tools"] == 1
+
+    # tools added to the pool are listed again once
+    shared.add_tool(lambda: "pong", name="ping", description="ping")  # type: ignore
+    for model in models:
+        await model.arun()
+    assert calls[("adder", "greeting", "ping")] == len(models)
+    assert calls["list_tools"] == 2
+
+
+async def test_mcp_tools_are_listed_once(calls: Counter) -> None:
+    client = MCPClient(command="python", arguments=[DYNAMIC_SERVER])
+    await client.connect_to_server()
+    round_trips = [0]
+    list_tools = client.session.list_tools
+
+    async def counting_list_tools(*args, **kwargs):  # type: ignore
+        round_trips[0] += 1
+        return await list_tools(*args, **kwargs)
+
+    client.session.list_tools = counting_list_tools  # type: ignore
+    model = build_model()
+    try:
+        for _ in range(RUNS):
+            await model.arun(functions=[client, greeting])
+        assert calls[("greeting", "adder", "register_multiplier")] == RUNS
+        assert round_trips[0] == 0
+
+        # tools/list_changed from the server refreshes the shared pool once
+        tool_pool = model.get_tool_pool([client, greeting])
+        await tool_pool.execute_tool("register_multiplier", {})  # type: ignore
+        for _ in range(RUNS):
+            await model.arun(functions=[client, greeting])
+        assert calls[("greeting", "adder", "register_multiplier", "multiplier")] == RUNS
+        assert round_trips[0] == 1
+    finally:
+        await client.cleanup()
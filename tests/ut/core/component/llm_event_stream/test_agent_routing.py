@@ -0,0 +1,183 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import json
+import os
+import weakref
+from typing import Any, AsyncIterable
+
+from chat_stubs import build_chunk, stub_completions
+
+# the agent package has to be imported before llm_event_stream
+from arkitect.core.component.agent import DefaultAgent  # noqa: F401
+from arkitect.core.component.agent.base_agent import BaseAgent
+from arkitect.core.component.llm_event_stream import llm_event_stream
+from arkitect.core.component.llm_event_stream.llm_event_stream import (
+    LLMEventStream,
+    build_handoff,
+    get_routing_table,
+)
+from arkitect.core.component.llm_event_stream.model import State
+from arkitect.core.component.tool.tool_pool import build_tool_pool
+from arkitect.types.llm.model import Message
+from arkitect.types.responses.event import BaseEvent, StateUpdateEvent
+
+os.environ["ARK_API_KEY"] = "-"
+
+AGENTS = 200
+
+
+class EchoAgent(BaseAgent):
+    async def _astream(self, state: State, **kwargs: Any) -> AsyncIterable[BaseEvent]:
+        yield StateUpdateEvent(
+            message_delta=[Message(role="assistant", content=f"from {self.name}")]
+        )
+
+
+def build_agents(n: int) -> list[BaseAgent]:
+    return [
+        EchoAgent(name=f"agent_{i}", description=f"handles topic {i}", model="test")
+        for i in range(n)
+    ]
+
+
+def echo(text: str) -> str:
+    """Echo the text back
+    Args:
+        text (str): value to echo
+    Returns:
+        str: the text
+    """
+    return text
+
+
+async def legacy_handoff_schema(agents: list[BaseAgent]) -> dict:
+    tool_pool = build_tool_pool([build_handoff(agents)])
+    await tool_pool.refresh_tool_list()  # type: ignore
+    return (await tool_pool.list_tool_schemas())[0]  # type: ignore
+
+
+async def test_routing_table() -> None:
+    agents = build_agents(AGENTS)
+    table = get_routing_table(agents)
+    assert table is not None
+    for agent in agents:
+        assert table.get_agent(agent.name) is agent
+        assert table.is_agent_call(agent.name)
+    assert table.get_agent("missing") is None
+    assert table.is_agent_call("handoff")
+    assert not table.is_agent_call("echo")
+    assert get_routing_table([]) is None
+
+    # the serialized handoff tool is the one the tool pool used to build
+    assert list(table.tool_schemas) == [await legacy_handoff_schema(agents)]
+
+
+def test_routing_table_is_rebuilt_when_agents_change() -> None:
+    agents = build_agents(3)
+    stream = LLMEventStream(model="test", agent_name="main", sub_agents=agents)
+    table = stream.routing
+    stream.sub_agents = list(agents)
+    assert stream.routing is table
+
+    agents.append(EchoAgent(name="late", model="test"))
+    stream.sub_agents = agents
+    assert stream.routing is not table
+    assert stream.routing.get_agent("late") is agents[-1]  # type: ignore
+
+    table = stream.routing
+    agents[0].description = "renamed"
+    stream.sub_agents = agents
+    assert stream.routing is not table
+
+    stream.sub_agents = None
+    assert stream.routing is None
+
+
+def test_routing_table_does_not_outlive_the_stream() -> None:
+    agents = build_agents(3)
+    stream = LLMEventStream(model="test", agent_name="main", sub_agents=agents)
+    refs = [weakref.ref(agent) for agent in agents]
+    del stream, agents
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+async def test_handoff(monkeypatch) -> None:
+    agents = build_agents(AGENTS)
+    replies = [
+        [
+            build_chunk(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "index": 0,
+                            "id": "call_0",
+                            "type": "function",
+                            "function": {
+                                "name": "handoff",
+                                "arguments": json.dumps({"agent_name": "agent_150"}),
+                            },
+                        }
+                    ],
+                },
+                "tool_calls",
+            )
+        ],
+        [build_chunk({"role": "assistant", "content": "done"}, "stop")],
+    ]
+
+    requests = stub_completions(monkeypatch, replies)
+    stream = LLMEventStream(
+        model="test", agent_name="main", tools=[echo], sub_agents=agents
+    )
+    await stream.init()
+    contents = []
+    async for e in await stream.completions.create(messages=[]):
+        if isinstance(e, StateUpdateEvent) and e.message_delta:
+            stream.state.events.append(e)
+            contents.extend(m.content for m in e.message_delta)
+
+    assert [t["function"]["name"] for t in requests[0]["tools"]] == ["handoff", "echo"]
+    assert contents[-3:] == ["切换到agent_150", "from agent_150", "done"]
+
+
+async def test_handoff_is_serialized_once(monkeypatch) -> None:
+    serialized = [0]
+    convert = llm_event_stream.mcp_to_chat_completion_tool
+
+    def counting_convert(tool):  # type: ignore
+        serialized[0] += 1
+        return convert(tool)
+
+    monkeypatch.setattr(
+        llm_event_stream, "mcp_to_chat_completion_tool", counting_convert
+    )
+    requests = stub_completions(
+        monkeypatch, [[build_chunk({"role": "assistant", "content": "done"}, "stop")]]
+    )
+    stream = LLMEventStream(
+        model="test", agent_name="main", sub_agents=build_agents(AGENTS)
+    )
+    turns = 20
+    for _ in range(turns):
+        # runners hand the same agents to the stream on every turn
+        stream.sub_agents = list(stream.sub_agents)  # type: ignore
+        async for _ in await stream.completions.create(messages=[]):
+            pass
+    assert len(requests) == turns
+    assert all(r["tools"][0]["function"]["name"] == "handoff" for r in requests)
+    assert serialized[0] == 1
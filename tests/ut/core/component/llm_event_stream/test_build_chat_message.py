@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+# the agent package has to be imported before llm_event_stream
+from arkitect.core.component.agent import DefaultAgent  # noqa: F401
+from arkitect.core.component.llm_event_stream import llm_event_stream
+from arkitect.core.component.llm_event_stream.llm_event_stream import (
+    LLMEventStream,
+    build_messages,
+)
+from arkitect.core.component.llm_event_stream.model import State
+from arkitect.types.llm.model import Message
+from arkitect.types.responses.event import StateUpdateEvent
+
+os.environ["ARK_API_KEY"] = "-"
+
+HISTORY_SIZE = 2_000
+
+
+def build_event(i: int) -> StateUpdateEvent:
+    author = "agent" if i % 3 else "other"
+    role = "user" if i % 2 else "assistant"
+    return StateUpdateEvent(
+        author=author, message_delta=[Message(role=role, content=f"message {i}")]
+    )
+
+
+def build_stream(events: int) -> LLMEventStream:
+    return LLMEventStream(
+        model="test",
+        agent_name="agent",
+        state=State(events=[build_event(i) for i in range(events)]),
+        instruction="be helpful",
+    )
+
+
+def rebuild(stream: LLMEventStream) -> list:
+    messages = [{"role": "system", "content": stream.instruction}]
+    for event in stream.state.events:
+        messages.extend(build_messages(event, stream.agent_name) or [])
+    return messages
+
+
+def count_conversions(monkeypatch) -> list:
+    converted: list = []
+
+    def counting_build_messages(event, agent_name):
+        converted.append(event)
+        return build_messages(event, agent_name)
+
+    monkeypatch.setattr(llm_event_stream, "build_messages", counting_build_messages)
+    return converted
+
+
+def test_only_new_events_are_converted(monkeypatch) -> None:
+    converted = count_conversions(monkeypatch)
+    stream = build_stream(10)
+
+    assert stream.build_chat_message() == rebuild(stream)
+    assert len(converted) == 10
+
+    stream.state.events.append(build_event(10))
+    assert stream.build_chat_message() == rebuild(stream)
+    assert len(converted) == 11
+
+    # a new stream over the same state, e.g. the next run, reuses the cache
+    other = LLMEventStream(model="test", agent_name="agent", state=stream.state)
+    assert other.build_chat_message() == rebuild(stream)[1:]
+    assert len(converted) == 11
+
+
+def test_cache_invalidation(monkeypatch) -> None:
+    converted = count_conversions(monkeypatch)
+    stream = build_stream(10)
+    stream.build_chat_message()
+
+    del stream.state.events[-3:]
+    stream.state.events.append(build_event(42))
+    assert stream.build_chat_message() == rebuild(stream)
+
+    stream.state.events = [build_event(i) for i in range(5)]
+    assert stream.build_chat_message() == rebuild(stream)
+
+    converted.clear()
+    stream.state.events[0].message_delta[0].content = "edited"
+    stream.state.invalidate_message_cache()
+    assert stream.build_chat_message() == rebuild(stream)
+    assert len(converted) == 5
+
+    # messages are converted per agent
+    other = LLMEventStream(model="test", agent_name="other", state=stream.state)
+    assert other.build_chat_message() == [
+        m for e in stream.state.events for m in build_messages(e, "other") or []
+    ]
+
+
+def test_per_turn_cost_does_not_grow(monkeypatch) -> None:
+    converted = count_conversions(monkeypatch)
+    stream = build_stream(HISTORY_SIZE)
+    stream.build_chat_message()
+    converted.clear()
+    turns = 20
+    for i in range(turns):
+        stream.state.events.append(build_event(HISTORY_SIZE + i))
+        stream.build_chat_message()
+    # one conversion per new event, whatever the size of the history
+    assert len(converted) == turns
+
+
+def test_returned_messages_can_be_edited() -> None:
+    stream = build_stream(10)
+    messages = stream.build_chat_message()
+    expected = rebuild(stream)
+    for message in messages:
+        message["content"] = "edited"
+    assert stream.build_chat_message() == expected
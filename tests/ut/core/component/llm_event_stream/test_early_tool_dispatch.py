@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from chat_stubs import build_chunk, stub_completions
+from volcenginesdkarkruntime.types.chat import ChatCompletionChunk
+
+# the agent package has to be imported before llm_event_stream
+from arkitect.core.component.agent import DefaultAgent  # noqa: F401
+from arkitect.core.component.context.tool_executor import ToolCallExecutor
+from arkitect.core.component.llm_event_stream.llm_event_stream import LLMEventStream
+from arkitect.types.responses.event import (
+    StateUpdateEvent,
+    ToolCallEvent,
+    ToolCompletedEvent,
+)
+
+os.environ["ARK_API_KEY"] = "-"
+
+SLEEP_SECONDS = 0.3
+started: list[tuple[str, float]] = []
+
+
+async def slow_echo(name: str) -> str:
+    """Sleep and echo the name back
+    Args:
+        name (str): value to echo
+    Returns:
+        str: the echoed name
+    """
+    started.append((name, time.perf_counter()))
+    await asyncio.sleep(SLEEP_SECONDS)
+    return name
+
+
+def tool_call_chunks(index: int, name: str) -> list[ChatCompletionChunk]:
+    arguments = json.dumps({"name": name})
+    return [
+        build_chunk(
+            {
+                "role": "assistant",
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": f"call_{name}",
+                        "type": "function",
+                        "function": {"name": "slow_echo", "arguments": ""},
+                    }
+                ],
+            }
+        ),
+        build_chunk(
+            {"tool_calls": [{"index": index, "function": {"arguments": arguments}}]}
+        ),
+    ]
+
+
+def script_completions(monkeypatch, names: list[str]) -> None:
+    """Stream one tool call per name, SLEEP_SECONDS apart, then answer."""
+    turn: list = []
+    for i, name in enumerate(names):
+        turn += tool_call_chunks(i, name) + [SLEEP_SECONDS]
+    stub_completions(
+        monkeypatch,
+        [
+            turn + [build_chunk({}, "tool_calls")],
+            [build_chunk({"role": "assistant", "content": "done"}, "stop")],
+        ],
+    )
+
+
+async def run_stream(**kwargs) -> tuple[list, float]:
+    stream = LLMEventStream(
+        model="test", agent_name="agent", tools=[slow_echo], **kwargs
+    )
+    await stream.init()
+    start = time.perf_counter()
+    events = []
+    async for e in await stream.completions.create(messages=[]):
+        if isinstance(e, StateUpdateEvent) and e.message_delta:
+            # what the runner does with state updates
+            stream.state.events.append(e)
+        if isinstance(e, (ToolCallEvent, ToolCompletedEvent, StateUpdateEvent)):
+            events.append(e)
+    return events, time.perf_counter() - start
+
+
+def describe(events: list) -> list[tuple]:
+    return [
+        (
+            type(e).__name__,
+            getattr(e, "tool_call_id", None),
+            getattr(e, "tool_response", None),
+        )
+        for e in events
+    ]
+
+
+@pytest.mark.parametrize("early_tool_dispatch", [True, False])
+async def test_event_order_is_deterministic(monkeypatch, early_tool_dispatch) -> None:
+    script_completions(monkeypatch, ["a", "b", "c"])
+    events, _ = await run_stream(early_tool_dispatch=early_tool_dispatch)
+    assert describe(events) == [
+        ("StateUpdateEvent", None, None),
+        ("StateUpdateEvent", None, None),
+        ("ToolCallEvent", "call_a", None),
+        ("ToolCompletedEvent", "call_a", "a"),
+        ("StateUpdateEvent", None, None),
+        ("ToolCallEvent", "call_b", None),
+        ("ToolCompletedEvent", "call_b", "b"),
+        ("StateUpdateEvent", None, None),
+        ("ToolCallEvent", "call_c", None),
+        ("ToolCompletedEvent", "call_c", "c"),
+        ("StateUpdateEvent", None, None),
+        ("StateUpdateEvent", None, None),
+    ]
+
+
+async def test_tools_overlap_with_generation(monkeypatch) -> None:
+    names = ["a", "b", "c"]
+    script_completions(monkeypatch, names)
+    _, sequential = await run_stream(early_tool_dispatch=False)
+    script_completions(monkeypatch, names)
+    started.clear()
+    _, early = await run_stream(early_tool_dispatch=True)
+
+    # a and b run while the model streams b, c and the end of the turn
+    assert early < sequential - 1.5 * SLEEP_SECONDS
+    assert started[1][1] - started[0][1] >= SLEEP_SECONDS * 0.8
+
+
+async def test_serial_tools_are_not_dispatched_early(monkeypatch) -> None:
+    script_completions(monkeypatch, ["a", "b"])
+    started.clear()
+    _, elapsed = await run_stream(
+        early_tool_dispatch=True,
+        tool_executor=ToolCallExecutor(serial_tools=["slow_echo"]),
+    )
+    # streaming, then both tools one after the other
+    assert elapsed >= 3 * SLEEP_SECONDS
@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import time
+
+from chat_stubs import build_chunk, stub_completions
+from volcenginesdkarkruntime.types.chat import ChatCompletionChunk
+
+# the agent package has to be imported before llm_event_stream
+from arkitect.core.component.agent import DefaultAgent  # noqa: F401
+from arkitect.core.component.llm_event_stream.chat_completion import coalesce_chunks
+from arkitect.core.component.llm_event_stream.llm_event_stream import LLMEventStream
+from arkitect.types.responses.event import MessageEvent, StateUpdateEvent
+
+os.environ["ARK_API_KEY"] = "-"
+
+TOKENS = 10_000
+
+
+def build_reply(tokens: int) -> list[ChatCompletionChunk]:
+    chunks = [build_chunk({"role": "assistant", "reasoning_content": "thinking "})]
+    chunks += [build_chunk({"content": f"t{i} "}) for i in range(tokens)]
+    chunks.append(
+        build_chunk(
+            {
+                "tool_calls": [
+                    {
+                        "index": 0,
+                        "id": "call_0",
+                        "type": "function",
+                        "function": {"name": "f", "arguments": "{}"},
+                    }
+                ]
+            }
+        )
+    )
+    chunks.append(build_chunk({}, "tool_calls"))
+    return chunks
+
+
+def script_completions(monkeypatch, chunks: list, delay: float = 0) -> None:
+    reply: list = []
+    for chunk in chunks:
+        reply += [delay, chunk] if delay else [chunk]
+    stub_completions(monkeypatch, [reply])
+
+
+async def run_stream(**kwargs) -> tuple[list, StateUpdateEvent]:
+    stream = LLMEventStream(model="test", agent_name="agent", **kwargs)
+    events = []
+    async for e in await stream.chat_service.completions.create_event_stream(
+        model="test",
+        messages=[],
+        coalesce_ms=stream.coalesce_ms,
+        coalesce_bytes=stream.coalesce_bytes,
+    ):
+        events.append(e)
+    assert isinstance(events[-1], StateUpdateEvent)
+    return events[:-1], events[-1]
+
+
+def text(events: list, field: str = "content") -> str:
+    return "".join(getattr(e.choices[0].delta, field) or "" for e in events)
+
+
+async def test_events_are_unchanged(monkeypatch) -> None:
+    chunks = build_reply(20)
+    script_completions(monkeypatch, chunks)
+    events, update = await run_stream()
+
+    assert len(events) == len(chunks)
+    for event, chunk in zip(events, chunks):
+        assert isinstance(event, MessageEvent)
+        assert event.model_dump(exclude_none=True) == MessageEvent(
+            **chunk.model_dump()
+        ).model_dump(exclude_none=True)
+    message = update.message_delta[0]
+    assert message.content == text(events)
+    assert message.reasoning_content == "thinking "
+    assert message.tool_calls[0].function.arguments == "{}"
+
+
+async def test_coalesced_by_size(monkeypatch) -> None:
+    chunks = build_reply(100)
+    script_completions(monkeypatch, chunks)
+    events, update = await run_stream(coalesce_bytes=64)
+
+    assert len(events) < len(chunks) / 5
+    assert text(events) == update.message_delta[0].content
+    assert text(events, "reasoning_content") == "thinking "
+    # the role starts the first delta, tool calls and finish pass through
+    assert events[0].choices[0].delta.role == "assistant"
+    assert events[-2].choices[0].delta.tool_calls[0].id == "call_0"
+    assert events[-1].choices[0].finish_reason == "tool_calls"
+
+
+async def test_coalesced_by_interval(monkeypatch) -> None:
+    script_completions(monkeypatch, build_reply(20), delay=0.01)
+    events, update = await run_stream(coalesce_ms=35)
+
+    assert 3 <= len(events) <= 12
+    assert text(events) == update.message_delta[0].content
+
+
+async def test_slow_stream_is_flushed_on_interval() -> None:
+    flushed: list[float] = []
+
+    async def slow():
+        yield build_chunk({"content": "a"})
+        await asyncio.sleep(0.2)
+        yield build_chunk({"content": "b"})
+
+    start = time.perf_counter()
+    async for chunk in coalesce_chunks(slow(), interval_ms=20):
+        flushed.append(time.perf_counter() - start)
+    # "a" is not held back until "b" arrives
+    assert len(flushed) == 2
+    assert flushed[0] < 0.1
+
+
+async def test_chunks_are_not_revalidated(monkeypatch) -> None:
+    chunks = build_reply(TOKENS)
+    script_completions(monkeypatch, chunks)
+    validated = [0]
+    init = MessageEvent.__init__
+
+    def counting_init(self, *args, **kwargs) -> None:  # type: ignore
+        validated[0] += 1
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(MessageEvent, "__init__", counting_init)
+    events, _ = await run_stream()
+    assert len(events) == len(chunks)
+    # every event is copied from the chunk validated by the sdk
+    assert validated[0] == 0
+
+    events, _ = await run_stream(coalesce_bytes=256)
+    assert len(events) < len(chunks) / 20
+    assert validated[0] == 0
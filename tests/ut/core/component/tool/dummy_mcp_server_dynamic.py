@@ -0,0 +1,55 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mcp.server.fastmcp import Context, FastMCP
+
+server = FastMCP()
+
+
+async def multiplier(a: int, b: int) -> int:
+    """Multiply two integer numbers
+    Args:
+        a (int): first number
+        b (int): second number
+    Returns:
+        int: product result
+    """
+    return a * b
+
+
+@server.tool()
+async def adder(a: int, b: int) -> int:
+    """Add two integer numbers
+    Args:
+        a (int): first number
+        b (int): second number
+    Returns:
+        int: sum result
+    """
+    return a + b
+
+
+@server.tool()
+async def register_multiplier(ctx: Context) -> str:
+    """Register the multiplier tool and notify the client
+    Returns:
+        str: registration result
+    """
+    server.add_tool(multiplier)
+    await ctx.session.send_tool_list_changed()
+    return "registered"
+
+
+if __name__ == "__main__":
+    server.run()
@@ -0,0 +1,52 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP()
+
+running = 0
+
+
+@server.tool()
+async def sleep(seconds: float) -> int:
+    """Sleep for a while
+    Args:
+        seconds (float): how long to sleep
+    Returns:
+        int: most calls running at once in this server during the sleep
+    """
+    global running
+    running += 1
+    most = running
+    try:
+        for _ in range(10):
+            await asyncio.sleep(seconds / 10)
+            most = max(most, running)
+        return most
+    finally:
+        running -= 1
+
+
+@server.tool()
+async def pid() -> int:
+    """Process id of the server"""
+    return os.getpid()
+
+
+if __name__ == "__main__":
+    server.run()
@@ -14,8 +14,15 @@
 
 from arkitect.core.component.tool import MCPClient
 
+import asyncio
 import multiprocessing
+import os
+import signal
 import time
+import pytest
+from mcp.shared.exceptions import McpError
+from arkitect.core.component.tool import ConnectionState
+from arkitect.core.component.tool.mcp_client import CONNECTION_CLOSED
 from utils import check_server_working, _start_server, _start_http_streamable_server
 
 
@@ -77,6 +84,148 @@ async def test_connect_to_http_streamable_client():
     server_process.kill()
 
 
+def slow_server_client(**kwargs) -> MCPClient:
+    return MCPClient(
+        command="python",
+        arguments=[os.path.join(os.path.dirname(__file__), "dummy_mcp_server_slow.py")],
+        **kwargs,
+    )
+
+
+async def sleep_concurrently(client: MCPClient, calls: int, seconds: float):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[client.execute_tool("sleep", {"seconds": seconds}) for _ in range(calls)]
+    )
+    running = [int(r.content[0].text) for r in results]
+    return time.perf_counter() - start, running
+
+
+async def test_concurrent_calls_share_the_session():
+    client = slow_server_client()
+    opened = [0]
+    open_session = client._open_session
+
+    async def counting_open_session(*args):
+        opened[0] += 1
+        return await open_session(*args)
+
+    client._open_session = counting_open_session
+    # connects on first use
+    elapsed, running = await sleep_concurrently(client, 10, 0.5)
+    assert opened[0] == 1
+    assert elapsed < 2
+    assert max(running) == 10
+    await client.cleanup()
+
+
+async def test_max_in_flight():
+    client = slow_server_client(max_in_flight=2)
+    await client.connect_to_server()
+    elapsed, running = await sleep_concurrently(client, 6, 0.3)
+    assert elapsed >= 0.85
+    assert max(running) == 2
+    await client.cleanup()
+
+
+async def test_session_pool():
+    client = slow_server_client(session_pool_size=3)
+    await client.connect_to_server()
+    assert len(await client.list_tools(use_cache=False)) == 2
+    elapsed, running = await sleep_concurrently(client, 6, 0.3)
+    # each server process serves one call at a time
+    assert running == [1] * 6
+    assert 0.55 <= elapsed < 1.5
+    await client.cleanup()
+
+
+async def server_pid(client: MCPClient) -> int:
+    return int((await client.execute_tool("pid", {})).content[0].text)
+
+
+async def test_reconnect_after_server_crash():
+    client = slow_server_client(reconnect_backoff=0.2, idempotent_tools=["sleep"])
+    await client.connect_to_server()
+    pid = await server_pid(client)
+    calls = asyncio.gather(sleep_concurrently(client, 5, 0.5))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    os.kill(pid, signal.SIGKILL)
+
+    # the calls in flight are replayed on the new server
+    [(_, running)] = await calls
+    assert len(running) == 5
+    assert await server_pid(client) != pid
+    # well within the read timeout of 30s
+    assert time.perf_counter() - start < 2
+    assert client.metrics.state == ConnectionState.CONNECTED
+    assert client.metrics.disconnects == 1
+    assert client.metrics.reconnects == 1
+    assert client.metrics.replayed_calls == 5
+    assert client.metrics.in_flight == 0
+    await client.cleanup()
+    assert client.metrics.state == ConnectionState.CLOSED
+
+
+async def test_calls_in_flight_fail_fast():
+    client = slow_server_client(reconnect_backoff=0.2)
+    await client.connect_to_server()
+    pid = await server_pid(client)
+    call = asyncio.ensure_future(client.execute_tool("sleep", {"seconds": 5}))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    os.kill(pid, signal.SIGKILL)
+    # sleep is not idempotent, it may have had effects before the crash
+    with pytest.raises(McpError) as e:
+        await call
+    assert e.value.error.code == CONNECTION_CLOSED
+    assert time.perf_counter() - start < 1
+    # later calls go to a new server
+    assert await server_pid(client) != pid
+    assert client.metrics.replayed_calls == 0
+    await client.cleanup()
+
+
+async def test_idle_ping_detects_hung_server():
+    client = slow_server_client(ping_interval=0.1, ping_timeout=0.2)
+    await client.connect_to_server()
+    pid = await server_pid(client)
+    os.kill(pid, signal.SIGSTOP)
+    try:
+        start = time.perf_counter()
+        while client.metrics.reconnects == 0 and time.perf_counter() - start < 3:
+            await asyncio.sleep(0.05)
+        assert client.metrics.reconnects == 1
+        assert client.metrics.ping_failures >= 1
+        assert await server_pid(client) != pid
+    finally:
+        os.kill(pid, signal.SIGKILL)
+    await client.cleanup()
+
+
+async def test_reconnect_gives_up():
+    client = slow_server_client(reconnect_attempts=3, reconnect_backoff=0.1)
+    await client.connect_to_server()
+    pid = await server_pid(client)
+    client.arguments = ["-c", "import sys; sys.exit(1)"]
+    os.kill(pid, signal.SIGKILL)
+    start = time.perf_counter()
+    while (
+        client.metrics.state != ConnectionState.DISCONNECTED
+        or client.metrics.reconnect_failures < 3
+    ) and time.perf_counter() - start < 3:
+        await asyncio.sleep(0.01)
+    # backoff of 0.1s then 0.2s, with jitter
+    assert 0.15 <= time.perf_counter() - start < 2
+    assert client.metrics.reconnect_failures == 3
+    # the next call tries again
+    with pytest.raises(ConnectionError):
+        await client.execute_tool("sleep", {"seconds": 0})
+    assert client.metrics.reconnect_failures == 6
+    assert client.metrics.reconnects == 0
+    await client.cleanup()
+
+
 if __name__ == "__main__":
     import asyncio
 
@@ -0,0 +1,179 @@
+# Copyright 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gc
+import json
+import os
+import time
+import weakref
+
+import pytest
+
+from arkitect.core.component.tool import (
+    MCPServerRegistry,
+    build_mcp_clients_from_config,
+    build_tool_pool,
+)
+
+SESSIONS = 200
+# sessions spawning their own server, which take a second or so each
+UNSHARED_SESSIONS = 5
+
+SLOW_SERVER = os.path.join(os.path.dirname(__file__), "dummy_mcp_server_slow.py")
+
+
+@pytest.fixture
+def config_file(tmp_path) -> str:
+    path = tmp_path / "mcp_servers.json"
+    path.write_text(
+        json.dumps(
+            {"mcpServers": {"slow": {"command": "python", "args": [SLOW_SERVER]}}}
+        )
+    )
+    return str(path)
+
+
+async def run_sessions(
+    config_file: str, sessions: int, registry: MCPServerRegistry | None
+) -> tuple[set[int], float]:
+    """
+    Server processes used by the sessions, and their mean setup time: from
+    building their clients to the result of their first tool call.
+    """
+    pids = set()
+    setup = 0.0
+    for _ in range(sessions):
+        start = time.perf_counter()
+        clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+        result = await clients["slow"].execute_tool("pid", {})
+        setup += time.perf_counter() - start
+        pids.add(int(result.content[0].text))
+        await cleanup()
+    return pids, setup / sessions
+
+
+async def test_sessions_share_servers(config_file: str, record_property) -> None:
+    pids, unshared_setup = await run_sessions(config_file, UNSHARED_SESSIONS, None)
+    assert len(pids) == UNSHARED_SESSIONS
+    registry = MCPServerRegistry(idle_ttl=1)
+    pids, shared_setup = await run_sessions(config_file, SESSIONS, registry)
+    assert len(pids) == 1
+    assert registry.spawned == 1
+    # reported in the junit xml, e.g. pytest --junitxml=report.xml
+    record_property("unshared_setup_ms", round(unshared_setup * 1000, 1))
+    record_property("shared_setup_ms", round(shared_setup * 1000, 1))
+    # only the first of the shared sessions waits for the server to start
+    assert shared_setup < unshared_setup
+    await registry.close()
+    assert len(registry) == 0
+
+
+async def test_tool_pools_are_not_kept_alive(config_file: str) -> None:
+    registry = MCPServerRegistry()
+    pools = []
+    for _ in range(SESSIONS):
+        clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+        pool = build_tool_pool(list(clients.values()))
+        pools.append(weakref.ref(pool))
+        del pool
+        await cleanup()
+    gc.collect()
+    assert all(pool() is None for pool in pools)
+
+    # callbacks of the pools gone are dropped as new ones are added
+    clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+    pool = build_tool_pool(list(clients.values()))
+    callbacks = clients["slow"]._tools_changed_callbacks
+    assert [callback() for callback in callbacks] == [pool.invalidate]
+    await cleanup()
+    await registry.close()
+
+
+async def test_idle_ttl(config_file: str) -> None:
+    registry = MCPServerRegistry(idle_ttl=0.2)
+    clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+    again, cleanup_again = build_mcp_clients_from_config(config_file, registry)
+    assert again["slow"] is clients["slow"]
+    await clients["slow"].list_tools()
+
+    await cleanup()
+    await cleanup_again()
+    # acquired again before the ttl ran out
+    await asyncio.sleep(0.1)
+    clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+    assert clients["slow"] is again["slow"]
+    await cleanup()
+    await asyncio.sleep(0.3)
+    assert len(registry) == 0
+    clients, cleanup = build_mcp_clients_from_config(config_file, registry)
+    assert clients["slow"] is not again["slow"]
+    assert registry.spawned == 2
+    await cleanup()
+    await registry.close()
+
+
+async def test_max_processes() -> None:
+    registry = MCPServerRegistry(max_processes=2)
+    first = registry.acquire(name="a", command="python", arguments=[SLOW_SERVER])
+    second = registry.acquire(name="b", command="python", arguments=[SLOW_SERVER])
+    # the same config in another order is the same server
+    assert (
+        registry.acquire(arguments=[SLOW_SERVER], command="python", name="a") is first
+    )
+    # servers by url run no process of ours
+    registry.acquire(name="c", server_url="http://localhost:8000/sse")
+    with pytest.raises(RuntimeError):
+        registry.acquire(name="d", command="python", arguments=[SLOW_SERVER])
+
+    registry.release(first)
+    registry.release(first)
+    # the idle server makes room
+    registry.acquire(name="d", command="python", arguments=[SLOW_SERVER])
+    assert len(registry) == 3
+    again = registry.acquire(name="b", command="python", arguments=[SLOW_SERVER])
+    assert again is second
+    with pytest.raises(ValueError):
+        registry.release(first)
+    await registry.close()
+
+
+def test_failed_build_without_loop(tmp_path) -> None:
+    path = tmp_path / "mcp_servers.json"
+    path.write_text(
+        json.dumps(
+            {
+                "mcpServers": {
+                    name: {"command": "python", "args": [SLOW_SERVER]}
+                    for name in ("a", "b")
+                }
+            }
+        )
+    )
+    registry = MCPServerRegistry(idle_ttl=0, max_processes=1)
+    # the real error, not one of releasing the clients acquired before it
+    with pytest.raises(RuntimeError, match="in use"):
+        build_mcp_clients_from_config(str(path), registry)
+    assert len(registry) == 1
+
+    async def session() -> None:
+        # the client released with no loop running expires once there is one
+        client = registry.acquire(name="c", server_url="http://localhost:8000/sse")
+        await asyncio.sleep(0.01)
+        assert len(registry) == 1
+        registry.release(client)
+        await asyncio.sleep(0.01)
+        assert len(registry) == 0
+
+    asyncio.run(session())
@@ -12,8 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from arkitect.core.component.tool import ToolPool
-from utils import check_server_working
+import asyncio
+import os
+import time
+
+import pytest
+
+from arkitect.core.component.tool import MCPClient, ToolPool, tool_pool
+from arkitect.core.component.tool.utils import (
+    convert_to_chat_completion_content_part_param,
+)
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+from utils import check_server_working, count_list_tools
 
 
 async def test_custom_tool():
@@ -56,3 +67,187 @@ async def test_custom_tool():
             "greeting": {"input": {"name": "John"}, "output": "Hello, John!"},
         },
     )
+
+
+async def test_tool_schemas_are_cached_by_version():
+    client = MCPClient(
+        command="python",
+        arguments=[
+            os.path.join(os.path.dirname(__file__), "dummy_mcp_server_dynamic.py")
+        ],
+    )
+    await client.connect_to_server()
+    round_trips = count_list_tools(client)
+    pool = ToolPool()
+    pool.add_mcp_client(client)
+
+    @pool.tool()
+    async def greeting(name: str) -> str:
+        """Greet a person
+        Args:
+            name (str): name of the person
+        Returns:
+            str: greeting message
+        """
+        return f"Hello, {name}!"
+
+    await pool.initialize()
+    version = pool.version
+    schemas = await pool.list_tool_schemas()
+    for _ in range(50):
+        assert await pool.list_tool_schemas() == schemas
+    assert round_trips[0] == 0
+    assert {s["function"]["name"] for s in schemas} == {
+        "adder",
+        "register_multiplier",
+        "greeting",
+    }
+
+    # tools/list_changed from the server bumps the version and refreshes once
+    await pool.execute_tool("register_multiplier", {})
+    assert pool.version > version
+    schemas = await pool.list_tool_schemas()
+    assert "multiplier" in {s["function"]["name"] for s in schemas}
+    for _ in range(50):
+        await pool.list_tool_schemas()
+    assert round_trips[0] == 1
+    await client.cleanup()
+
+
+SERVERS = 20
+TOOLS_PER_SERVER = 50
+
+
+def build_stub_server(index: int) -> FastMCP:
+    server = FastMCP(name=f"stub_{index}")
+    for j in range(TOOLS_PER_SERVER):
+
+        async def echo(x: int) -> int:
+            """Echo a number
+            Args:
+                x (int): the number
+            Returns:
+                int: the same number
+            """
+            return x
+
+        server.add_tool(echo, name=f"s{index}_t{j}")
+
+    async def slow(seconds: float) -> str:
+        """Sleep for a while
+        Args:
+            seconds (float): how long to sleep
+        Returns:
+            str: done
+        """
+        await asyncio.sleep(seconds)
+        return "done"
+
+    server.add_tool(slow, name=f"s{index}_slow")
+    return server
+
+
+async def connect_in_memory(name: str, server: FastMCP) -> MCPClient:
+    client = MCPClient(name=name)
+    client.session = await client.exit_stack.enter_async_context(
+        create_connected_server_and_client_session(
+            server._mcp_server, message_handler=client._handle_message
+        )
+    )
+    await client._init()
+    return client
+
+
+async def test_tool_routing_index(monkeypatch):
+    servers = [build_stub_server(i) for i in range(SERVERS)]
+    clients = [await connect_in_memory(f"stub_{i}", s) for i, s in enumerate(servers)]
+    round_trips = [count_list_tools(client) for client in clients]
+    duplicate_checks = [0]
+    find_duplicate_tools = tool_pool.find_duplicate_tools
+
+    def counting_find_duplicate_tools(tools):
+        duplicate_checks[0] += 1
+        return find_duplicate_tools(tools)
+
+    monkeypatch.setattr(
+        tool_pool, "find_duplicate_tools", counting_find_duplicate_tools
+    )
+    pool = ToolPool()
+    for client in clients:
+        pool.add_mcp_client(client)
+    await pool.initialize()
+    assert len(await pool.list_tools()) == SERVERS * (TOOLS_PER_SERVER + 1)
+
+    calls = 1000
+    start = time.perf_counter()
+    for k in range(calls):
+        i, j = k % SERVERS, k % TOOLS_PER_SERVER
+        result = await pool.execute_tool(f"s{i}_t{j}", {"x": k})
+        assert convert_to_chat_completion_content_part_param(result) == str(k)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for k in range(calls):
+        await clients[k % SERVERS].execute_tool(f"s{k % SERVERS}_t0", {"x": k})
+    direct = time.perf_counter() - start
+    print(
+        f"{SERVERS} servers x {TOOLS_PER_SERVER} tools: "
+        f"{elapsed / calls * 1e6:.0f}us per routed call, "
+        f"{direct / calls * 1e6:.0f}us per direct call"
+    )
+    # no listing per call, the pool was listed and checked for duplicates once
+    assert sum(r[0] for r in round_trips) == 0
+    assert duplicate_checks[0] == 1
+
+    # a slow call on one server does not hold up routing to the others
+    slow = asyncio.ensure_future(pool.execute_tool("s0_slow", {"seconds": 1}))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await pool.execute_tool(f"s{SERVERS - 1}_t0", {"x": 1})
+    assert time.perf_counter() - start < 0.5
+    assert not slow.done()
+    await slow
+
+    with pytest.raises(ValueError):
+        await pool.execute_tool("missing", {})
+
+    # tools added without a notification are routed once the pool is invalidated
+    servers[3].add_tool(lambda: "late", name="late")
+    await pool.list_tools(use_cache=False)
+    result = await pool.execute_tool("late", {})
+    assert convert_to_chat_completion_content_part_param(result) == "late"
+    assert duplicate_checks[0] == 2
+
+    for client in reversed(clients):
+        await client.cleanup()
+
+
+async def test_duplicate_tools_are_routed_to_the_first_client():
+    first = build_stub_server(0)
+    second = build_stub_server(0)
+    second.add_tool(lambda: "local", name="local")
+    clients = [
+        await connect_in_memory("first", first),
+        await connect_in_memory("second", second),
+    ]
+    pool = ToolPool()
+    pool.add_tool(lambda: "from pool", name="local")
+    for client in clients:
+        pool.add_mcp_client(client)
+
+    executed = []
+    for client in clients:
+        execute_tool = client.execute_tool
+
+        async def counting_execute_tool(*args, _client=client, _execute=execute_tool):
+            executed.append(_client.name)
+            return await _execute(*args)
+
+        client.execute_tool = counting_execute_tool
+
+    await pool.execute_tool("s0_t0", {"x": 1})
+    assert executed == ["first"]
+    # tools of the pool itself come first
+    result = await pool.execute_tool("local", {})
+    assert convert_to_chat_completion_content_part_param(result) == "from pool"
+    for client in reversed(clients):
+        await client.cleanup()
@@ -45,3 +45,16 @@ def _start_server():
 def _start_http_streamable_server():
     """Function to run the http streamable server (executed in a separate process)."""
     http_streamable_server.run(transport="streamable-http")
+
+
+def count_list_tools(client: MCPClient) -> list[int]:
+    """Count list_tools round trips sent by a connected client."""
+    counter = [0]
+    list_tools = client.session.list_tools
+
+    async def counting_list_tools(*args, **kwargs):
+        counter[0] += 1
+        return await list_tools(*args, **kwargs)
+
+    client.session.list_tools = counting_list_tools
+    return counter
@@ -0,0 +1,223 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import random
+import time
+from typing import Any, Callable
+
+import pytest
+
+from arkitect.types.llm.model import ArkChatCompletionChunk, ArkChatResponse
+
+CHUNKS = 50_000
+
+
+def legacy_merge_responses(responses: list) -> ArkChatResponse:
+    merged = ArkChatResponse(**responses[-1].__dict__)
+    for resp in reversed(responses[:-1]):
+        for i, j in zip(merged.choices, resp.choices):
+            if isinstance(i.message.content, str) and isinstance(
+                j.message.content, str
+            ):
+                i.message.content = j.message.content + i.message.content
+            elif isinstance(i.message.content, list) and isinstance(
+                j.message.content, list
+            ):
+                i.message.content = j.message.content + i.message.content
+            elif j.message.content is None:
+                continue
+            else:
+                raise TypeError("no supported merge type")
+
+        if merged.usage and resp.usage:
+            merged.usage.prompt_tokens += resp.usage.prompt_tokens
+            merged.usage.completion_tokens += resp.usage.completion_tokens
+            merged.usage.total_tokens += resp.usage.total_tokens
+    return merged
+
+
+def legacy_merge_chunks(responses: list) -> ArkChatCompletionChunk | None:
+    if len(responses) == 0:
+        return None
+    merged = ArkChatCompletionChunk(**responses[-1].__dict__)
+    for resp in reversed(responses[:-1]):
+        for i, j in zip(merged.choices, resp.choices):
+            if isinstance(i.delta.content, str) and isinstance(j.delta.content, str):
+                i.delta.content = j.delta.content + i.delta.content
+            elif isinstance(i.delta.content, list) and isinstance(
+                j.delta.content, list
+            ):
+                i.delta.content = j.delta.content + i.delta.content
+            else:
+                raise TypeError("no supported merge type")
+
+        if merged.usage and resp.usage:
+            merged.usage.prompt_tokens += resp.usage.prompt_tokens
+            merged.usage.completion_tokens += resp.usage.completion_tokens
+            merged.usage.total_tokens += resp.usage.total_tokens
+    return merged
+
+
+def random_content(rand: random.Random, none_rate: float) -> str | None:
+    if rand.random() < none_rate:
+        return None
+    return "".join(rand.choice("ab字 \n") for _ in range(rand.randint(0, 5)))
+
+
+def random_usage(rand: random.Random) -> dict | None:
+    if rand.random() < 0.5:
+        return None
+    return {
+        "prompt_tokens": rand.randint(0, 9),
+        "completion_tokens": rand.randint(0, 9),
+        "total_tokens": rand.randint(0, 20),
+    }
+
+
+def random_response(rand: random.Random) -> ArkChatResponse:
+    return ArkChatResponse.model_validate(
+        {
+            "id": f"id_{rand.randint(0, 9)}",
+            "object": "chat.completion",
+            "created": rand.randint(0, 9),
+            "model": "test",
+            "choices": [
+                {
+                    "index": i,
+                    "finish_reason": rand.choice(["stop", "length"]),
+                    "message": {
+                        "role": "assistant",
+                        "content": random_content(rand, 0.2),
+                    },
+                }
+                for i in range(rand.randint(0, 3))
+            ],
+            "usage": random_usage(rand),
+        }
+    )
+
+
+def random_chunk(rand: random.Random) -> ArkChatCompletionChunk:
+    return ArkChatCompletionChunk.model_validate(
+        {
+            "id": f"id_{rand.randint(0, 9)}",
+            "object": "chat.completion.chunk",
+            "created": rand.randint(0, 9),
+            "model": "test",
+            "choices": [
+                {
+                    "index": i,
+                    "finish_reason": None,
+                    "delta": {
+                        "role": "assistant",
+                        "content": random_content(rand, 0.02),
+                    },
+                }
+                for i in range(rand.randint(0, 3))
+            ],
+            "usage": random_usage(rand),
+        }
+    )
+
+
+def outcome(merge: Callable, responses: list) -> Any:
+    try:
+        merged = merge(responses)
+    except TypeError as e:
+        return ("TypeError", str(e))
+    return merged.model_dump_json() if merged is not None else None
+
+
+@pytest.mark.parametrize(
+    "build, merge, legacy",
+    [
+        (random_response, ArkChatResponse.merge, legacy_merge_responses),
+        (random_chunk, ArkChatCompletionChunk.merge, legacy_merge_chunks),
+    ],
+)
+def test_merge_equals_legacy(build, merge, legacy) -> None:
+    errors = 0
+    for seed in range(500):
+        rand = random.Random(seed)
+        responses = [build(rand) for _ in range(rand.randint(1, 12))]
+        before = [r.model_dump_json() for r in responses]
+
+        expected = outcome(legacy, copy.deepcopy(responses))
+        assert outcome(merge, responses) == expected, seed
+        # the inputs are left untouched
+        assert [r.model_dump_json() for r in responses] == before
+        errors += isinstance(expected, tuple)
+    # both the merged and the failing cases are covered
+    assert 0 < errors < 400
+
+
+def test_merge_empty() -> None:
+    assert ArkChatCompletionChunk.merge([]) is None
+    with pytest.raises(AssertionError):
+        ArkChatResponse.merge([])
+
+
+def build_stream(n: int) -> list[ArkChatCompletionChunk]:
+    chunk = ArkChatCompletionChunk.model_validate(
+        {
+            "id": "id",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "test",
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}}],
+        }
+    )
+    return [
+        chunk.model_copy(
+            update={
+                "choices": [
+                    chunk.choices[0].model_copy(
+                        update={
+                            "delta": chunk.choices[0].delta.model_copy(
+                                update={"content": f"token {i} "}
+                            )
+                        }
+                    )
+                ]
+            }
+        )
+        for i in range(n)
+    ]
+
+
+def best_of_three(
+    merge: Callable, chunks: list, mutates: bool = False
+) -> tuple[Any, float]:
+    elapsed = []
+    for _ in range(3):
+        inputs = copy.deepcopy(chunks) if mutates else chunks
+        start = time.perf_counter()
+        merged = merge(inputs)
+        elapsed.append(time.perf_counter() - start)
+    return merged, min(elapsed)
+
+
+def test_merge_benchmark() -> None:
+    chunks = build_stream(CHUNKS)
+    merged, linear = best_of_three(ArkChatCompletionChunk.merge, chunks)
+    expected, quadratic = best_of_three(legacy_merge_chunks, chunks, mutates=True)
+
+    print(
+        f"merge {CHUNKS} chunks: legacy {quadratic * 1e3:.0f}ms, "
+        f"joined {linear * 1e3:.0f}ms"
+    )
+    assert merged is not None and expected is not None
+    assert merged.model_dump_json() == expected.model_dump_json()
+    assert linear * 4 < quadratic
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import random
+
+import pytest
+
+from arkitect.utils.json import IncrementalJSONParser
+
+DOCUMENTS = [
+    '{"a": 1, "b": [1, 2.5, -3e2, true, false, null], "c": {"d": "x\\"y"}}',
+    '{"text": "line\\nbreak \\u00e9 \\ud83d\\ude00", "empty": {}, "list": []}',
+    "[[1], [2, [3]], {}]",
+    '  {"k" : "v" }  ',
+    "42",
+    '"plain"',
+]
+
+
+def feed_randomly(document: str, max_size: int = 4) -> IncrementalJSONParser:
+    parser = IncrementalJSONParser()
+    i = 0
+    while i < len(document):
+        size = random.randint(1, max_size)
+        parser.feed(document[i : i + size])
+        i += size
+    return parser
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_matches_json_loads(document: str) -> None:
+    for _ in range(20):
+        parser = feed_randomly(document)
+        assert parser.text == document
+        assert parser.result == json.loads(document)
+
+
+def test_partial_result() -> None:
+    parser = IncrementalJSONParser()
+    parser.feed('{"city": "Beijing", "days": [1, 2')
+    assert not parser.done
+    assert parser.partial == {"city": "Beijing", "days": [1]}
+    parser.feed("]}")
+    assert parser.done
+    assert parser.result == {"city": "Beijing", "days": [1, 2]}
+
+
+@pytest.mark.parametrize("document", ['{"a":}', '{"a": 1', "[1,]", '{"a": 1} x'])
+def test_invalid_document_raises_like_json_loads(document: str) -> None:
+    parser = feed_randomly(document)
+    assert not parser.done
+    with pytest.raises(json.JSONDecodeError):
+        parser.result
+
+
+def test_linear_time_for_single_byte_deltas(monkeypatch) -> None:
+    # 100 KB of arguments in 1-byte deltas, every character is consumed once
+    consumed = [0]
+    consume = IncrementalJSONParser._consume
+
+    def counting_consume(self: IncrementalJSONParser, chunk: str) -> None:
+        consumed[0] += len(chunk)
+        consume(self, chunk)
+
+    monkeypatch.setattr(IncrementalJSONParser, "_consume", counting_consume)
+    size = 100_000
+    document = json.dumps({"payload": "x" * size, "items": list(range(size // 100))})
+    parser = IncrementalJSONParser()
+    for c in document:
+        parser.feed(c)
+    assert parser.result["payload"] == "x" * size
+    assert consumed[0] == len(document)